@@ -10,6 +10,17 @@ INSTANCE_ID="${INSTANCE_ID:-}"
 INSTANCE_TYPE="${INSTANCE_TYPE:-}"
 CLOUD_PROVIDER="${CLOUD_PROVIDER:-}"
 CLOUD_REGION="${CLOUD_REGION:-}"
+CPUS="${CPUS:-}"
+OMP_NUM_THREADS="${OMP_NUM_THREADS:-}"
+CPU_MODE="${CPU_MODE:-}"
+CPUSET="${CPUSET:-}"
+COLO_GROUP="${COLO_GROUP:-}"
+COLO_ROLE="${COLO_ROLE:-}"
+COLO_PEERS="${COLO_PEERS:-}"
+
+BENCH_HARNESS="${BENCH_HARNESS:-python}"   # python | bash
+HARNESS="${HARNESS:-/opt/bench/harness.py}"
+[ -f "$HARNESS" ] || HARNESS="$(dirname "$(readlink -f "$0")")/harness.py"
 
 now_ms() { date +%s%3N; }  # мілісекунди
 arch=$(uname -m)
@@ -39,6 +50,13 @@ emit_json() {
     --arg instance_type "$INSTANCE_TYPE" \
     --arg cloud_provider "$CLOUD_PROVIDER" \
     --arg cloud_region "$CLOUD_REGION" \
+    --arg cpus "$CPUS" \
+    --arg omp_num_threads "$OMP_NUM_THREADS" \
+    --arg cpu_mode "$CPU_MODE" \
+    --arg cpuset "$CPUSET" \
+    --arg colo_group "$COLO_GROUP" \
+    --arg colo_role "$COLO_ROLE" \
+    --arg colo_peers "$COLO_PEERS" \
   '{
       ts_start:$ts_start,
       ts_end:$ts_end,
@@ -64,18 +82,45 @@ emit_json() {
         run_id:$run_id,
         task:$task,
         dataset:$dataset,
-        extra:$extra
+        extra:$extra,
+        cpus:$cpus,
+        omp_num_threads:$omp_num_threads,
+        cpu_mode:$cpu_mode,
+        cpuset:$cpuset,
+        colo_group:$colo_group,
+        colo_role:$colo_role,
+        colo_peers:$colo_peers,
+        harness:"bash"
       }
     }'
 }
 
+# Python harness: direct child, perf_counter_ns wall time, os.wait4 rusage.
+measure_python() {
+  local flags=()
+  [ "${MERGE_STDERR:-0}" = "1" ] && flags+=(--merge-stderr)
+  python3 "$HARNESS" "${flags[@]}" --cmd "$*"
+}
+
 measure() {
+  if [ "$BENCH_HARNESS" = "python" ] && [ -f "$HARNESS" ]; then
+    measure_python "$@"
+    return $?
+  fi
+  measure_bash "$@"
+}
+
+measure_bash() {
   local ts0 ts1 wall cmd exit_code
   cmd="$*"
   ts0=$(now_ms)
   tmp=$(mktemp)
   set +e
-  /usr/bin/time -f 'USER=%U\nSYS=%S\nMAXRSS=%M' -o "$tmp" bash -c "$cmd"
+  if [ "${MERGE_STDERR:-0}" = "1" ]; then
+    /usr/bin/time -f 'USER=%U\nSYS=%S\nMAXRSS=%M' -o "$tmp" bash -c "$cmd" 2>&1
+  else
+    /usr/bin/time -f 'USER=%U\nSYS=%S\nMAXRSS=%M' -o "$tmp" bash -c "$cmd"
+  fi
   exit_code=$?
   set -e
   ts1=$(now_ms)
@@ -88,6 +133,137 @@ measure() {
   return "$exit_code"
 }
 
+# ffmpeg encoder matrix knobs (bench ffmpeg-matrix)
+FFMPEG_CODECS="${FFMPEG_CODECS:-libx264 libx265 libvpx-vp9 libaom-av1}"
+FFMPEG_RESOLUTIONS="${FFMPEG_RESOLUTIONS:-1280x720 1920x1080 3840x2160}"
+FFMPEG_THREADS="${FFMPEG_THREADS:-1 2}"
+FFMPEG_DURATION="${FFMPEG_DURATION:-5}"
+FFMPEG_RATE="${FFMPEG_RATE:-30}"
+FFMPEG_SOURCE="${FFMPEG_SOURCE:-lavfi}"   # lavfi | cache
+FFMPEG_CACHE_DIR="${FFMPEG_CACHE_DIR:-/dev/shm}"
+
+ffmpeg_has_encoder() {
+  ffmpeg -hide_banner -encoders 2>/dev/null | awk '{print $2}' | grep -qx "$1"
+}
+
+# Speed presets per codec: x264/x265 -preset names, VP9/AV1 -cpu-used levels
+ffmpeg_presets() {
+  case "$1" in
+    libx264)    echo "${FFMPEG_PRESETS_X264:-veryfast medium}" ;;
+    libx265)    echo "${FFMPEG_PRESETS_X265:-veryfast medium}" ;;
+    libvpx-vp9) echo "${FFMPEG_PRESETS_VP9:-8 4}" ;;
+    libaom-av1) echo "${FFMPEG_PRESETS_AV1:-8 6}" ;;
+  esac
+}
+
+ffmpeg_encoder_args() {
+  case "$1" in
+    libx264|libx265) echo "-c:v $1 -preset $2 -crf 28" ;;
+    libvpx-vp9)      echo "-c:v $1 -deadline good -cpu-used $2 -row-mt 1 -crf 32 -b:v 0" ;;
+    libaom-av1)      echo "-c:v $1 -cpu-used $2 -row-mt 1 -crf 32 -b:v 0" ;;
+  esac
+}
+
+ffmpeg_cache_file() {
+  echo "${FFMPEG_CACHE_DIR}/testsrc-${1}-${FFMPEG_RATE}-${FFMPEG_DURATION}.y4m"
+}
+
+# Cache mode: render the testsrc clip once per container into a raw y4m file
+# on tmpfs. The render is measured on its own (TASK=ffmpeg-source), so the
+# timed encodes that read it back measure the encoder only.
+ffmpeg_prepare_source() {
+  local size="$1" file need avail
+  [ "$FFMPEG_SOURCE" = "cache" ] || return 0
+  file=$(ffmpeg_cache_file "$size")
+  [ -s "$file" ] && return 0
+  mkdir -p "$FFMPEG_CACHE_DIR"
+  # yuv420p: 1.5 bytes per pixel per frame
+  need=$(( ${size%x*} * ${size#*x} * 3 / 2 * FFMPEG_RATE * FFMPEG_DURATION / 1024 ))
+  avail=$(df -Pk "$FFMPEG_CACHE_DIR" | awk 'NR==2 {print $4}')
+  if [ "$need" -ge "$avail" ]; then
+    echo "ffmpeg: ${size} source needs ${need} KiB, ${FFMPEG_CACHE_DIR} has ${avail} KiB;" \
+      "falling back to lavfi (raise docker --shm-size)" >&2
+    return 0
+  fi
+  MERGE_STDERR=1 TASK="ffmpeg-source" measure "ffmpeg -hide_banner -nostats -benchmark -y \
+-f lavfi -i testsrc=duration=${FFMPEG_DURATION}:size=${size}:rate=${FFMPEG_RATE} \
+-pix_fmt yuv420p -f yuv4mpegpipe ${file}" || rm -f "$file"
+}
+
+ffmpeg_input_args() {
+  local file
+  file=$(ffmpeg_cache_file "$1")
+  if [ "$FFMPEG_SOURCE" = "cache" ] && [ -s "$file" ]; then
+    echo "-f yuv4mpegpipe -i ${file}"
+  else
+    echo "-f lavfi -i testsrc=duration=${FFMPEG_DURATION}:size=${1}:rate=${FFMPEG_RATE}"
+  fi
+}
+
+ffmpeg_matrix() {
+  local codec preset size nthreads rc=0
+  for codec in $FFMPEG_CODECS; do
+    if ! ffmpeg_has_encoder "$codec"; then
+      echo "ffmpeg-matrix: encoder $codec not available, skipping" >&2
+      continue
+    fi
+    for preset in $(ffmpeg_presets "$codec"); do
+      for size in $FFMPEG_RESOLUTIONS; do
+        ffmpeg_prepare_source "$size" || rc=$?
+        for nthreads in $FFMPEG_THREADS; do
+          MERGE_STDERR=1 TASK="ffmpeg-matrix" measure "ffmpeg -hide_banner -nostats -benchmark \
+$(ffmpeg_input_args "$size") \
+$(ffmpeg_encoder_args "$codec" "$preset") -threads ${nthreads} -an -f null -" || rc=$?
+        done
+      done
+    done
+  done
+  return "$rc"
+}
+
+# stress-ng suite knobs (bench stress-suite)
+STRESS_WORKERS="${STRESS_WORKERS:-2}"
+STRESS_TIMEOUT="${STRESS_TIMEOUT:-10s}"
+STRESS_CPU_METHODS="${STRESS_CPU_METHODS:-int64 float64 double matrixprod fft sqrt trig crc16 jenkin prime}"
+STRESS_STRESSORS="${STRESS_STRESSORS:-matrix cache memcpy vm fp crypt}"
+STRESS_YAML="${STRESS_YAML:-0}"
+
+# One measured stress-ng run; with STRESS_YAML=1 the --yaml report is appended
+# to the output so parse_results can fall back to it.
+stress_measure() {
+  local args="$* --metrics-brief --timeout ${STRESS_TIMEOUT}"
+  if [ "$STRESS_YAML" = "1" ]; then
+    local yaml="/tmp/stress-ng-$$.yaml"
+    args="$args --yaml $yaml; rc=\$?; cat $yaml; rm -f $yaml; exit \$rc"
+  fi
+  MERGE_STDERR=1 TASK="stress-ng-suite" measure "stress-ng $args"
+}
+
+stress_suite() {
+  local method stressor rc=0
+  for method in $STRESS_CPU_METHODS; do
+    stress_measure --cpu "$STRESS_WORKERS" --cpu-method "$method" || rc=$?
+  done
+  for stressor in $STRESS_STRESSORS; do
+    stress_measure "--${stressor}" "$STRESS_WORKERS" || rc=$?
+  done
+  return "$rc"
+}
+
+# Null-task calibration (bench calibrate): the fixed costs inside wall_s
+CALIBRATE_REPEATS="${CALIBRATE_REPEATS:-10}"
+
+calibrate() {
+  local i rc=0
+  for i in $(seq 1 "$CALIBRATE_REPEATS"); do
+    TASK="calibrate-noop" measure "true" || rc=$?
+    TASK="calibrate-bash" measure "bash -c true" || rc=$?
+    TASK="calibrate-python" measure "python3 -c pass" || rc=$?
+    TASK="calibrate-numpy" measure "python3 -c 'import numpy'" || rc=$?
+  done
+  return "$rc"
+}
+
 case "${1:-help}" in
   run)
     shift
@@ -97,24 +273,69 @@ case "${1:-help}" in
     shift
     measure "stress-ng $*"
     ;;
+  stress-suite)
+    shift
+    stress_suite
+    ;;
   ffmpeg)
     shift
     measure "ffmpeg $*"
     ;;
+  ffmpeg-matrix)
+    shift
+    ffmpeg_matrix
+    ;;
+  calibrate)
+    shift
+    calibrate
+    ;;
   numpy)
     shift
     sub="${1:-matmul}"; shift || true
     measure "python3 /opt/bench/numpy_tasks.py ${sub} $*"
     ;;
+  io)
+    shift
+    measure "python3 /opt/bench/io_tasks.py --dir ${IO_DIR:-/tmp} $*"
+    ;;
+  cpuset-plan)
+    shift
+    python3 /opt/bench/cpuset_plan.py "$@"
+    ;;
   help|--help|-h)
     cat <<USAGE
 Usage:
   bench run <any command ...>
   bench stress-ng [--cpu 1 --cpu-method all --metrics-brief --cpu-ops 1000 --timeout 60s ...]
+  bench stress-suite    (cpu per method + matrix/cache/memcpy/vm/fp/crypt, TASK=stress-ng-suite)
   bench ffmpeg   [common ffmpeg args ...]
-  bench numpy    [matmul N | elem N [ITER]]
+  bench ffmpeg-matrix   (codec x preset x resolution x -threads, TASK=ffmpeg-matrix)
+  bench numpy    [matmul N | elem N [ITER] | startup SAMPLES |
+                 latency [MAX_KIB [normal|huge|both [ACCESSES]]] |
+                 fft [REPEAT] | sort [N [REPEAT]] | reduce [N [REPEAT]] |
+                 linalg [N [REPEAT]]]
+  bench io       [--size-mb 1024 --block-kb 4,128,1024 --qd 1,8 --runtime 2
+                  --patterns seq,rand --ops read,write
+                  --methods buffered,readinto,mmap,direct]
+  bench calibrate       (no-op, bash -c, python3 -c pass, import numpy; TASK=calibrate-*)
+  bench cpuset-plan [N] (print "MODE CPUSET" for quota / physical / smt pinning of N CPUs)
+  bench cpuset-plan N GROUPS (print "groupI CPUSET": disjoint sets for co-located tasks)
 
-Env meta (optional): RUN_ID, TASK, DATASET, EXTRA
+Matrix env: FFMPEG_CODECS, FFMPEG_RESOLUTIONS, FFMPEG_THREADS, FFMPEG_DURATION,
+  FFMPEG_RATE, FFMPEG_PRESETS_{X264,X265,VP9,AV1},
+  FFMPEG_SOURCE=cache (pre-render y4m to FFMPEG_CACHE_DIR, default /dev/shm;
+  run the container with a large enough --shm-size)
+Suite env: STRESS_WORKERS, STRESS_TIMEOUT, STRESS_CPU_METHODS, STRESS_STRESSORS,
+  STRESS_YAML=1 (append stress-ng --yaml report to the output)
+Calibration env: CALIBRATE_REPEATS
+I/O env: IO_DIR (test file location, default /tmp; bind-mount the volume to test)
+Harness: BENCH_HARNESS=python (default, harness.py) | bash (date + /usr/bin/time)
+Sampling (python harness): BENCH_SAMPLE_MS (busy-CPU MHz / thermal, default 500, 0 = off),
+  BENCH_SAMPLE_RAW=1 (add the raw series to the record)
+Env meta (optional): RUN_ID, TASK, DATASET, EXTRA,
+  CPUS (docker --cpus limit), OMP_NUM_THREADS (BLAS threads),
+  CPU_MODE (quota | physical | smt), CPUSET (docker --cpuset-cpus list),
+  COLO_GROUP, COLO_ROLE (solo | colo), COLO_PEERS (co-located tasks, "+"-joined)
 Output: JSON-string with metrics + stdout/err of the command in plain format
 USAGE
     ;;
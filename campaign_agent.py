@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Crash-safe, resumable benchmark campaign (run by run-and-upload.sh on the host).
+
+The campaign is a fixed list of steps (calibration, startup, latency, I/O,
+REPEATS x the task set, the optional stress-ng suite, ffmpeg encoder
+matrix, scaling sweep, CPU-mode comparison and co-location runs), each one
+`docker run` of the image (or a host harness.py call) whose stdout is
+appended to a JSONL file in --state-dir, as the old `| tee -a` did.
+
+The stress-ng suite (--suite-repeats) and the encoder matrix
+(--matrix-repeats) are whole sweeps per step, so they are off by default.
+With --ffmpeg-source cache the matrix encodes a clip pre-rendered to the
+container's /dev/shm, sized by --shm-size.
+
+Co-location (--colo-repeats): for every set of --colo-sets ("a+b", tasks
+of COLO_TASKS) each task runs alone on its own cpuset (COLO_ROLE=solo,
+the baseline) and then all tasks start at once, one container each
+(COLO_ROLE=colo, COLO_PEERS = the others). The cpusets come from
+bench cpuset-plan (separate physical cores where there are enough), so the
+tasks share only the LLC, memory bandwidth and, on small instances, SMT
+siblings.
+
+Progress is a checkpoint (checkpoint.json in --state-dir, replaced
+atomically and fsynced) with the steps done and the committed size of each
+file. A step's output counts only once the checkpoint says so: on restart
+files are cut back to their committed size, done steps are skipped and the
+rest of the campaign runs.
+
+Between steps (never during a measurement), when --upload-every seconds
+have passed, the bytes committed since the last upload go up as a new
+object <stem>.<seq>.jsonl under --dest; a crash mid-upload re-sends the
+same batch under the same name. DONE is uploaded after the last batch, so
+a prefix without DONE still holds every batch uploaded before the crash.
+
+--dest is s3://bucket/prefix (aws CLI, --endpoint-url for MinIO or moto
+server) or file:///dir for offline runs.
+
+Usage:
+    campaign_agent.py --image IMG --run-id R --dest s3://bucket/runs/... \\
+        [--repeats 20] [--suite-repeats 3] \\
+        [--matrix-repeats 3 --ffmpeg-source cache --shm-size 3g] \\
+        [--scaling-cpus "1 4"] [--cpu-mode-repeats 5] \\
+        [--colo-repeats 5 --colo-sets "ffmpeg+numpy-elem stress-ng-cache+ffmpeg"]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+FFMPEG_ARGS = (
+    "-f lavfi -i testsrc=duration=10:size=1920x1080:rate=30 "
+    "-c:v libx264 -preset medium -crf 28 -an -f null -"
+).split()
+NUMPY_KERNELS = ["fft", "sort", "reduce", "linalg"]
+CALIBRATION_CONTAINER_RUNS = 10
+
+
+def stress_args(cpus) -> list[str]:
+    return (
+        f"stress-ng --cpu {cpus} --cpu-method all --metrics-brief "
+        "--cpu-ops 1000 --timeout 20s"
+    ).split()
+
+
+# Co-location tasks, sized to run for 10-30 s so partners overlap
+COLO_TASKS = {
+    "ffmpeg": lambda cpus: ["ffmpeg"] + FFMPEG_ARGS,
+    "numpy-elem": lambda cpus: ["numpy", "elem", "1000000", "500"],
+    "numpy-matmul": lambda cpus: ["numpy", "matmul", "4000"],
+    "stress-ng-cpu": lambda cpus: (
+        f"stress-ng --cpu {cpus} --cpu-method all --metrics-brief --timeout 20s"
+    ).split(),
+    "stress-ng-cache": lambda cpus: (
+        f"stress-ng --cache {cpus} --metrics-brief --timeout 20s"
+    ).split(),
+}
+
+
+class Campaign:
+    """Builds the step list; a step is {key, file, argv, env}."""
+
+    def __init__(self, args, cpu_modes: list[list[str]], colo_cpusets: list[str]):
+        self.args = args
+        self.cpu_modes = cpu_modes
+        self.colo_cpusets = colo_cpusets
+        self.steps = []
+
+    def meta(self, task, dataset="default", cpus="2", **extra) -> dict:
+        env = {
+            "RUN_ID": self.args.run_id,
+            "TASK": task,
+            "DATASET": dataset,
+            "INSTANCE_ID": self.args.instance_id,
+            "INSTANCE_TYPE": self.args.instance_type,
+            "CLOUD_PROVIDER": "AWS",
+            "CLOUD_REGION": self.args.region,
+            "CPUS": str(cpus),
+        }
+        env.update({k: str(v) for k, v in extra.items()})
+        return env
+
+    def docker_argv(self, bench_args, env, limit=None, volumes=()) -> list[str]:
+        argv = ["docker", "run", "--rm"] + (limit or ["--cpus=2"])
+        for volume in volumes:
+            argv += ["-v", volume]
+        for name, value in env.items():
+            argv += ["-e", f"{name}={value}"]
+        return argv + [self.args.image] + bench_args
+
+    def docker(self, key, file, bench_args, env, limit=None, volumes=()):
+        argv = self.docker_argv(bench_args, env, limit, volumes)
+        self.steps.append({"key": key, "file": file, "argv": argv, "env": {}})
+
+    def colocation(self, i: int, tasks: list[str]):
+        """Solo baselines, then all tasks at once; one cpuset per task."""
+        a = self.args
+        name = "+".join(tasks)
+        key = f"colo/r{i:03d}/{name}"
+        members = []
+        for task, cpuset in zip(tasks, self.colo_cpusets):
+            peers = "+".join(t for t in tasks if t != task)
+            members.append((task, cpuset, peers))
+            self.docker(
+                f"{key}/solo-{task}",
+                "colocation.jsonl",
+                COLO_TASKS[task](a.colo_cpus),
+                self.colo_meta(task, cpuset, f"r{i:03d}/{name}", "solo", ""),
+                limit=[f"--cpuset-cpus={cpuset}"],
+            )
+        group = [
+            self.docker_argv(
+                COLO_TASKS[task](a.colo_cpus),
+                self.colo_meta(task, cpuset, f"r{i:03d}/{name}", "colo", peers),
+                limit=[f"--cpuset-cpus={cpuset}"],
+            )
+            for task, cpuset, peers in members
+        ]
+        self.steps.append(
+            {
+                "key": f"{key}/colo",
+                "file": "colocation.jsonl",
+                "group": group,
+                "env": {},
+            }
+        )
+
+    def colo_meta(self, task, cpuset, group, role, peers) -> dict:
+        return self.meta(
+            task,
+            "colocation",
+            self.args.colo_cpus,
+            CPUSET=cpuset,
+            COLO_GROUP=group,
+            COLO_ROLE=role,
+            COLO_PEERS=peers,
+        )
+
+    def build(self) -> list[dict]:
+        a = self.args
+        # Calibration: null tasks inside the container, then container start
+        # as seen from the host
+        self.docker(
+            "calibrate", "calibration.jsonl", ["calibrate"], self.meta("calibrate")
+        )
+        for i in range(1, CALIBRATION_CONTAINER_RUNS + 1):
+            self.steps.append(
+                {
+                    "key": f"calibrate-container/{i}",
+                    "file": "calibration.jsonl",
+                    "argv": [sys.executable, a.harness, "--"]
+                    + f"docker run --rm --cpus=2 --entrypoint true {a.image}".split(),
+                    "env": self.meta("calibrate-container"),
+                }
+            )
+        self.docker(
+            "numpy-startup",
+            "numpy-startup.jsonl",
+            ["numpy", "startup", "30"],
+            self.meta("numpy-startup"),
+        )
+        self.docker(
+            "numpy-latency",
+            "numpy-latency.jsonl",
+            ["numpy", "latency", "262144", "both"],
+            self.meta("numpy-latency"),
+        )
+        Path(a.io_dir).mkdir(parents=True, exist_ok=True)
+        self.docker(
+            "io",
+            "io.jsonl",
+            ["io"],
+            self.meta("io", IO_DIR="/data"),
+            volumes=[f"{a.io_dir}:/data"],
+        )
+
+        for i in range(1, a.repeats + 1):
+            r = f"r{i:03d}"
+            self.docker(
+                f"{r}/stress-ng",
+                "stressng.jsonl",
+                stress_args(2),
+                self.meta("stress-ng"),
+            )
+            self.docker(
+                f"{r}/numpy-matmul",
+                "numpy-matmul.jsonl",
+                ["numpy", "matmul", "2000"],
+                self.meta("numpy-matmul"),
+            )
+            self.docker(
+                f"{r}/numpy-elem",
+                "numpy-elem.jsonl",
+                ["numpy", "elem", "1000000", "50"],
+                self.meta("numpy-elem"),
+            )
+            for sub in NUMPY_KERNELS:
+                self.docker(
+                    f"{r}/numpy-{sub}",
+                    "numpy-kernels.jsonl",
+                    ["numpy", sub],
+                    self.meta(f"numpy-{sub}"),
+                )
+            self.docker(
+                f"{r}/ffmpeg",
+                "ffmpeg.jsonl",
+                ["ffmpeg"] + FFMPEG_ARGS,
+                self.meta("ffmpeg"),
+            )
+
+        # Whole sweeps per step: stress-ng suite, then the encoder matrix
+        for i in range(1, a.suite_repeats + 1):
+            self.docker(
+                f"suite/r{i:03d}/stress-ng-suite",
+                "stressng-suite.jsonl",
+                ["stress-suite"],
+                self.meta("stress-ng-suite"),
+            )
+        matrix_limit = ["--cpus=2"]
+        if a.ffmpeg_source == "cache":
+            matrix_limit.append(f"--shm-size={a.shm_size}")
+        for i in range(1, a.matrix_repeats + 1):
+            self.docker(
+                f"matrix/r{i:03d}/ffmpeg-matrix",
+                "ffmpeg-matrix.jsonl",
+                ["ffmpeg-matrix"],
+                self.meta("ffmpeg-matrix", FFMPEG_SOURCE=a.ffmpeg_source),
+                limit=matrix_limit,
+            )
+
+        # Scaling sweep: the same stress-ng / matmul tasks at other CPU limits
+        for c in a.scaling_cpus.split():
+            for i in range(1, a.repeats + 1):
+                key = f"scaling/cpus{c}/r{i:03d}"
+                self.docker(
+                    f"{key}/stress-ng",
+                    "stressng-scaling.jsonl",
+                    stress_args(c),
+                    self.meta("stress-ng", "scaling", c),
+                    limit=[f"--cpus={c}"],
+                )
+                self.docker(
+                    f"{key}/numpy-matmul",
+                    "numpy-matmul-scaling.jsonl",
+                    ["numpy", "matmul", "2000"],
+                    self.meta("numpy-matmul", "scaling", c, OMP_NUM_THREADS=c),
+                    limit=[f"--cpus={c}"],
+                )
+
+        # CPU modes, interleaved within each repeat; "-" = not possible here
+        for i in range(1, a.cpu_mode_repeats + 1):
+            for mode, cpuset in self.cpu_modes:
+                if mode == "quota":
+                    limit, cpuset = ["--cpus=2"], ""
+                elif cpuset != "-":
+                    limit = [f"--cpuset-cpus={cpuset}"]
+                else:
+                    continue
+                key = f"cpumode/r{i:03d}/{mode}"
+                modes = {"CPU_MODE": mode, "CPUSET": cpuset}
+                self.docker(
+                    f"{key}/stress-ng",
+                    "stressng-cpumode.jsonl",
+                    stress_args(2),
+                    self.meta("stress-ng", "cpumode", **modes),
+                    limit=limit,
+                )
+                self.docker(
+                    f"{key}/numpy-matmul",
+                    "numpy-matmul-cpumode.jsonl",
+                    ["numpy", "matmul", "2000"],
+                    self.meta("numpy-matmul", "cpumode", OMP_NUM_THREADS=2, **modes),
+                    limit=limit,
+                )
+
+        # Co-location; skipped where the host has too few CPUs for the sets
+        sets = [s.split("+") for s in a.colo_sets.split()]
+        for i in range(1, a.colo_repeats + 1):
+            for tasks in sets:
+                if len(tasks) <= len(self.colo_cpusets):
+                    self.colocation(i, tasks)
+        return self.steps
+
+
+class Checkpoint:
+    def __init__(self, path: Path):
+        self.path = path
+        self.data = {
+            "done": [],
+            "sizes": {},  # file -> committed bytes
+            "uploaded": {},  # file -> bytes already uploaded
+            "batches": {},  # file -> next batch number
+            "cpu_modes": None,
+            "colo_cpusets": None,
+            "finished": False,
+        }
+        if path.is_file():
+            self.data.update(json.loads(path.read_text()))
+        self.done = set(self.data["done"])
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.data, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        dir_fd = os.open(self.path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def commit(self, key: str, file: str, size: int) -> None:
+        self.data["done"].append(key)
+        self.done.add(key)
+        self.data["sizes"][file] = size
+        self.save()
+
+
+class Uploader:
+    def __init__(self, dest: str, endpoint_url: str | None = None):
+        self.dest = dest.rstrip("/")
+        self.endpoint_url = endpoint_url
+
+    def put(self, name: str, data: bytes, tmp_dir: Path) -> bool:
+        if self.dest.startswith("file://"):
+            target = Path(self.dest[len("file://") :]) / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(target.name + ".part")
+            tmp.write_bytes(data)
+            os.replace(tmp, target)
+            return True
+        tmp = tmp_dir / f".upload-{name}"
+        tmp.write_bytes(data)
+        cmd = ["aws", "s3", "cp", "--only-show-errors", str(tmp), f"{self.dest}/{name}"]
+        if self.endpoint_url:
+            cmd += ["--endpoint-url", self.endpoint_url]
+        try:
+            return subprocess.run(cmd).returncode == 0
+        finally:
+            tmp.unlink(missing_ok=True)
+
+
+def restore(state: Checkpoint, state_dir: Path, files: set[str]) -> None:
+    """Cut every output file back to what the checkpoint committed."""
+    for file in files:
+        path = state_dir / file
+        committed = state.data["sizes"].get(file, 0)
+        if path.is_file() and path.stat().st_size > committed:
+            print(f"campaign: dropping uncommitted output of {file}", file=sys.stderr)
+            os.truncate(path, committed)
+
+
+def run_step(step: dict, state_dir: Path) -> int:
+    env = dict(os.environ, **step["env"])
+    # A co-location step starts all its commands at once; output goes to
+    # files so no command ever blocks on a full pipe
+    procs = []
+    for argv in step.get("group") or [step["argv"]]:
+        out = tempfile.TemporaryFile()
+        procs.append((subprocess.Popen(argv, stdout=out, env=env), out))
+    output = b""
+    for proc, out in procs:
+        if proc.wait() != 0:
+            print(
+                f"campaign: {step['key']} exited with {proc.returncode}",
+                file=sys.stderr,
+            )
+        out.seek(0)
+        output += out.read()
+        out.close()
+    sys.stdout.buffer.write(output)
+    sys.stdout.flush()
+    with open(state_dir / step["file"], "ab") as f:
+        f.write(output)
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def upload_pending(state: Checkpoint, uploader: Uploader, state_dir: Path) -> bool:
+    """Upload committed bytes not yet uploaded, one new object per file."""
+    ok = True
+    for file, size in sorted(state.data["sizes"].items()):
+        sent = state.data["uploaded"].get(file, 0)
+        if size <= sent:
+            continue
+        with open(state_dir / file, "rb") as f:
+            f.seek(sent)
+            data = f.read(size - sent)
+        seq = state.data["batches"].get(file, 0)
+        name = f"{Path(file).stem}.{seq:05d}.jsonl"
+        if not uploader.put(name, data, state_dir):
+            print(f"campaign: upload of {name} failed, retrying later", file=sys.stderr)
+            ok = False
+            continue
+        state.data["uploaded"][file] = size
+        state.data["batches"][file] = seq + 1
+        state.save()
+    return ok
+
+
+def cpu_mode_plan(image: str, *plan_args) -> list[list[str]]:
+    out = subprocess.run(
+        ["docker", "run", "--rm", image, "cpuset-plan", *map(str, plan_args)],
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    ).stdout
+    return [line.split() for line in out.splitlines() if len(line.split()) == 2]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Run the benchmark campaign with checkpoints and batch uploads."
+    )
+    parser.add_argument("--image", required=True, help="Benchmark image")
+    parser.add_argument("--run-id", required=True, help="RUN_ID of the campaign")
+    parser.add_argument(
+        "--dest", required=True, help="s3://bucket/prefix or file:///dir"
+    )
+    parser.add_argument("--endpoint-url", default=None, help="S3-compatible endpoint")
+    parser.add_argument("--instance-id", default="i-unknown")
+    parser.add_argument("--instance-type", default="t-unknown")
+    parser.add_argument("--region", default="")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument(
+        "--suite-repeats", type=int, default=0, help="Runs of bench stress-suite"
+    )
+    parser.add_argument(
+        "--matrix-repeats", type=int, default=0, help="Runs of bench ffmpeg-matrix"
+    )
+    parser.add_argument(
+        "--ffmpeg-source",
+        choices=["lavfi", "cache"],
+        default="lavfi",
+        help="Encoder matrix input: generated per encode or pre-rendered y4m",
+    )
+    parser.add_argument(
+        "--shm-size",
+        default="3g",
+        help="docker --shm-size of matrix steps with --ffmpeg-source cache",
+    )
+    parser.add_argument(
+        "--scaling-cpus", default="", help='CPU limits of the sweep, e.g. "1 4"'
+    )
+    parser.add_argument("--cpu-mode-repeats", type=int, default=0)
+    parser.add_argument("--colo-repeats", type=int, default=0)
+    parser.add_argument(
+        "--colo-sets",
+        default="ffmpeg+numpy-elem stress-ng-cache+numpy-elem stress-ng-cache+ffmpeg",
+        help=f"Space-separated sets of tasks run together ({', '.join(COLO_TASKS)})",
+    )
+    parser.add_argument(
+        "--colo-cpus", type=int, default=1, help="CPUs of each co-located task"
+    )
+    parser.add_argument(
+        "--state-dir", default="/var/log/bench", help="Output files and checkpoint"
+    )
+    parser.add_argument("--io-dir", default="/var/lib/bench-io")
+    parser.add_argument(
+        "--harness",
+        default=str(Path(__file__).resolve().with_name("harness.py")),
+        help="harness.py on the host (container start calibration)",
+    )
+    parser.add_argument(
+        "--upload-every",
+        type=float,
+        default=60,
+        help="Seconds between batch uploads (checked between steps)",
+    )
+    args = parser.parse_args()
+    unknown = set("+".join(args.colo_sets.split()).split("+")) - set(COLO_TASKS)
+    if args.colo_repeats > 0 and unknown:
+        parser.error(f"unknown co-location tasks: {', '.join(sorted(unknown))}")
+
+    state_dir = Path(args.state_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    state = Checkpoint(state_dir / "checkpoint.json")
+    uploader = Uploader(args.dest, args.endpoint_url)
+
+    if not state.data["finished"]:
+        # Keep the CPU sets of the first start, so resumed repeats match
+        if args.cpu_mode_repeats > 0 and state.data["cpu_modes"] is None:
+            state.data["cpu_modes"] = cpu_mode_plan(args.image, 2)
+            state.save()
+        if args.colo_repeats > 0 and state.data["colo_cpusets"] is None:
+            most = max(len(s.split("+")) for s in args.colo_sets.split())
+            plan = cpu_mode_plan(args.image, args.colo_cpus, most)
+            state.data["colo_cpusets"] = [cpus for _, cpus in plan if cpus != "-"]
+            state.save()
+        steps = Campaign(
+            args, state.data["cpu_modes"] or [], state.data["colo_cpusets"] or []
+        ).build()
+        restore(state, state_dir, {step["file"] for step in steps})
+
+        todo = [step for step in steps if step["key"] not in state.done]
+        if len(todo) < len(steps):
+            print(f"campaign: resuming, {len(steps) - len(todo)} steps already done")
+        last_upload = time.monotonic()
+        for n, step in enumerate(todo, len(steps) - len(todo) + 1):
+            print(f"campaign: [{n}/{len(steps)}] {step['key']}", flush=True)
+            state.commit(step["key"], step["file"], run_step(step, state_dir))
+            if time.monotonic() - last_upload >= args.upload_every:
+                upload_pending(state, uploader, state_dir)
+                last_upload = time.monotonic()
+        state.data["finished"] = True
+        state.save()
+
+    if not upload_pending(state, uploader, state_dir):
+        return 1
+    if not uploader.put("DONE", b"", state_dir):
+        return 1
+    print("campaign: all steps done and uploaded")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
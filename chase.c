@@ -0,0 +1,29 @@
+/*
+ * Dependent-load walk for numpy_tasks.py latency, built into the image as
+ * /opt/bench/libchase.so and called through ctypes.
+ *
+ * arr holds a cyclic permutation: arr[i] is the index of the next element.
+ * Each load's address comes from the previous load, so the loop runs at
+ * one memory latency per step and cannot be vectorized or reordered.
+ */
+#include <stdint.h>
+#include <time.h>
+
+/*
+ * Follow `steps` links from `start`. Returns the elapsed CLOCK_MONOTONIC
+ * nanoseconds; *end gets the index reached (the next walk's start).
+ */
+int64_t chase(const volatile int64_t *arr, int64_t start, int64_t steps,
+              int64_t *end)
+{
+    struct timespec t0, t1;
+    int64_t i = start;
+
+    clock_gettime(CLOCK_MONOTONIC, &t0);
+    while (steps-- > 0)
+        i = arr[i];
+    clock_gettime(CLOCK_MONOTONIC, &t1);
+
+    *end = i;
+    return (t1.tv_sec - t0.tv_sec) * 1000000000LL + (t1.tv_nsec - t0.tv_nsec);
+}
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+CPU sets for the CPU-mode comparison (bench cpuset-plan).
+
+Reads the core topology from sysfs and prints one "MODE CPUSET" line per
+mode, for N CPUs:
+
+    quota    -        docker --cpus=N, no pinning (CFS quota on all CPUs)
+    physical 2,3      one logical CPU on each of N physical cores
+    smt      2,50     N logical CPUs packed as SMT siblings (N/2 cores)
+
+With GROUPS (co-location, bench cpuset-plan N GROUPS) it prints instead
+one "groupI CPUSET" line per task: disjoint sets of N CPUs, each CPU on its
+own physical core while cores last, then on the remaining SMT siblings
+(c7i.large: the two threads of its one core); all "-" if the CPUs are too
+few.
+
+CPUSET is "-" when the mode does not apply: smt without SMT (Graviton has
+one thread per core), physical with fewer cores than N. The core that
+holds CPU 0 (most host interrupts and housekeeping) is left out when the
+others are enough. sysfs is not namespaced, so run inside a container
+without --cpuset-cpus it sees the whole host.
+
+Usage:
+    cpuset_plan.py [N [GROUPS]]
+"""
+
+import glob
+import os
+import re
+import sys
+
+
+def parse_cpu_list(text: str) -> list[int]:
+    """Kernel CPU list ("0-3,8,10-11") to CPU numbers."""
+    cpus = []
+    for part in text.strip().split(","):
+        if "-" in part:
+            lo, hi = part.split("-")
+            cpus.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+
+def read(path: str, default: str = "") -> str:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+def physical_cores() -> list[list[int]]:
+    """Allowed logical CPUs of each core, cores ordered by package and CPU."""
+    allowed = os.sched_getaffinity(0)
+    cores = {}
+    for topo in glob.glob("/sys/devices/system/cpu/cpu[0-9]*/topology"):
+        cpu = int(re.search(r"cpu(\d+)/topology$", topo).group(1))
+        if cpu not in allowed:
+            continue
+        siblings = parse_cpu_list(read(f"{topo}/thread_siblings_list", str(cpu)))
+        package = int(read(f"{topo}/physical_package_id", "0") or 0)
+        key = (package, min(siblings))
+        cores.setdefault(key, []).append(cpu)
+    if not cores:
+        # No sysfs topology: every allowed CPU counts as a core
+        return [[cpu] for cpu in sorted(allowed)]
+    return [sorted(cores[key]) for key in sorted(cores)]
+
+
+def plan(n: int) -> dict[str, list[int] | None]:
+    cores = physical_cores()
+    spare = [core for core in cores if 0 not in core]
+
+    def usable(needed: int) -> list[list[int]]:
+        # Keep off the core of CPU 0 when there are enough cores without it
+        return spare if len(spare) >= needed else cores
+
+    physical = None
+    if len(cores) >= n:
+        physical = [core[0] for core in usable(n)[:n]]
+
+    smt = None
+    smt_cores = [core for core in usable(-(-n // 2)) if len(core) > 1]
+    packed = [cpu for core in smt_cores for cpu in core][:n]
+    if len(packed) == n:
+        smt = packed
+    return {"quota": None, "physical": physical, "smt": smt}
+
+
+def colocation(n: int, groups: int) -> list[list[int]] | None:
+    """Disjoint CPU sets for co-located tasks, spread over physical cores."""
+    cores = physical_cores()
+    spare = [core for core in cores if 0 not in core]
+    needed = n * groups
+    pool = spare if sum(map(len, spare)) >= needed else cores
+    # First thread of every core, then the siblings
+    order = [core[0] for core in pool] + [cpu for core in pool for cpu in core[1:]]
+    if len(order) < needed:
+        return None
+    return [order[i * n : (i + 1) * n] for i in range(groups)]
+
+
+def main() -> int:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    if len(sys.argv) > 2:
+        groups = int(sys.argv[2])
+        sets = colocation(n, groups) or [None] * groups
+        for i, cpus in enumerate(sets):
+            print(f"group{i}", ",".join(map(str, cpus)) if cpus else "-")
+        return 0
+    for mode, cpus in plan(n).items():
+        print(mode, ",".join(map(str, cpus)) if cpus else "-")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Low-overhead measurement harness used by bench.sh measure().
+
+Starts the command as a direct child via posix_spawn (a wrapper shell is used
+only when the command string needs shell syntax), times it with
+perf_counter_ns, takes user/sys time and max RSS of that child from os.wait4
+and prints the same JSON record as bench.sh emit_json. The harness also
+reports its own overhead, measured on a no-op child.
+
+While the command runs, a background thread samples every BENCH_SAMPLE_MS
+(default 500, 0 turns it off) the current frequency of each CPU the command
+is busy on (cpufreq scaling_cur_freq, else "cpu MHz" of /proc/cpuinfo) and
+the thermal zone temperatures. Their min/mean/max go to metrics, with the
+number of distinct CPUs sampled as cpu_mhz_cpus (None when the host exposes
+neither, e.g. Graviton without cpufreq); with BENCH_SAMPLE_RAW=1 the series
+is added to the record as "samples".
+
+Usage:
+    harness.py [--merge-stderr] --cmd "stress-ng --cpu 2 --timeout 20s"
+    harness.py [--merge-stderr] -- stress-ng --cpu 2 --timeout 20s
+"""
+
+import argparse
+import json
+import os
+import glob
+import shlex
+import sys
+import threading
+import time
+
+SHELL_CHARS = set("|&;<>()$`*?[]{}~#\n")
+CALIBRATION_RUNS = 3
+CPUFREQ = "/sys/devices/system/cpu/cpu{}/cpufreq/scaling_cur_freq"
+THERMAL_ZONES = "/sys/class/thermal/thermal_zone*/temp"
+
+
+def now_ms() -> str:
+    return str(time.time_ns() // 1_000_000)
+
+
+def needs_shell(cmd: str) -> bool:
+    if SHELL_CHARS & set(cmd):
+        return True
+    first = cmd.split(maxsplit=1)[0] if cmd.strip() else ""
+    # VAR=value prefix assignments
+    return "=" in first
+
+
+def spawn_and_wait(argv: list[str], merge_stderr: bool, on_spawn=None):
+    """
+    Run argv as a direct child, calling on_spawn(pid) once it started.
+    Returns (wall_ns, exit_code, rusage).
+    """
+    file_actions = [(os.POSIX_SPAWN_DUP2, 1, 2)] if merge_stderr else []
+    t0 = time.perf_counter_ns()
+    try:
+        pid = os.posix_spawnp(argv[0], argv, os.environ, file_actions=file_actions)
+    except OSError as e:
+        print(f"harness: cannot start {argv[0]}: {e}", file=sys.stderr)
+        return time.perf_counter_ns() - t0, 127, None
+    if on_spawn is not None:
+        on_spawn(pid)
+    _, status, rusage = os.wait4(pid, 0)
+    wall_ns = time.perf_counter_ns() - t0
+
+    exit_code = os.waitstatus_to_exitcode(status)
+    if exit_code < 0:
+        # Killed by a signal: report it the way bash does
+        exit_code = 128 - exit_code
+    return wall_ns, exit_code, rusage
+
+
+def measure_overhead():
+    """
+    Harness cost measured on a no-op child (best of N):
+    - overhead_s: spawn + reap time included in every wall_s
+    - rss_floor_kb: max RSS a child reports even when it allocates nothing.
+      The kernel carries the spawning process's RSS high-water mark over
+      exec, so max_rss_kb values at this floor mean "at most the floor".
+    """
+    walls = []
+    rss = []
+    for _ in range(CALIBRATION_RUNS):
+        wall_ns, exit_code, rusage = spawn_and_wait(["true"], False)
+        if exit_code == 0:
+            walls.append(wall_ns)
+            rss.append(rusage.ru_maxrss)
+    if not walls:
+        return None, None
+    return min(walls) / 1e9, max(rss)
+
+
+def read_number(fd: int):
+    try:
+        return int(os.pread(fd, 32, 0).split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Sampler(threading.Thread):
+    """
+    Samples the frequency (MHz) of the CPUs the measured command is busy on
+    and the thermal zone temperatures (°C) until stopped.
+
+    The CPUs come from the command's own tasks: the child and its
+    descendants (/proc/<pid>/task/<tid>/children), each thread counted
+    when it is running or used CPU time since the previous sample, on the
+    CPU it last ran on (/proc/<pid>/task/<tid>/stat field 39). Under a
+    --cpus quota the affinity mask is the whole host, and averaging its
+    idle cores would hide the busy cores' clock.
+
+    sysfs files are opened once and re-read with pread; /proc/cpuinfo (no
+    cpufreq) is read at most every CPUINFO_INTERVAL_S, as reading it makes
+    the kernel query every CPU. The thread sleeps between samples, so the
+    measured child keeps its CPUs.
+    """
+
+    CPUINFO_INTERVAL_S = 5.0
+
+    def __init__(self, interval_s: float, keep_raw: bool):
+        super().__init__(daemon=True)
+        self.interval_s = interval_s
+        self.keep_raw = keep_raw
+        self.stopped = threading.Event()
+        self.pid = None
+        self.cpufreq = os.path.exists(CPUFREQ.format(min(os.sched_getaffinity(0))))
+        self.freq_fds = {}  # cpu -> scaling_cur_freq fd, opened on first use
+        self.temp_fds = self.open_all(sorted(glob.glob(THERMAL_ZONES)))
+        self.cpuinfo_at = None
+        self.ticks = {}  # tid -> utime + stime at the previous sample
+        self.cpus = set()  # every CPU sampled
+        self.mhz = []  # every per-CPU reading
+        self.temp_c = []  # hottest zone of every sample
+        self.series = []
+
+    @staticmethod
+    def open_all(paths) -> list[int]:
+        fds = []
+        for path in paths:
+            try:
+                fds.append(os.open(path, os.O_RDONLY))
+            except OSError:
+                pass
+        return fds
+
+    def follow(self, pid: int) -> None:
+        """Start sampling the command spawned as pid."""
+        self.pid = pid
+        self.start()
+
+    def busy_cpus(self) -> set[int]:
+        """CPUs of the command's threads that ran since the previous sample."""
+        cpus = set()
+        ticks = {}
+        pending = [self.pid]
+        while pending:
+            pid = pending.pop()
+            try:
+                tids = os.listdir(f"/proc/{pid}/task")
+            except OSError:
+                continue
+            for tid in tids:
+                task = f"/proc/{pid}/task/{tid}"
+                try:
+                    with open(f"{task}/stat") as f:
+                        # comm may contain spaces: fields start after ")"
+                        fields = f.read().rsplit(")", 1)[1].split()
+                    with open(f"{task}/children") as f:
+                        pending += f.read().split()
+                except (OSError, IndexError):
+                    continue
+                used = int(fields[11]) + int(fields[12])
+                ticks[tid] = used
+                if fields[0] == "R" or used > self.ticks.get(tid, used):
+                    cpus.add(int(fields[36]))
+        self.ticks = ticks
+        return cpus
+
+    def freq_fd(self, cpu: int) -> int | None:
+        if cpu not in self.freq_fds:
+            fds = self.open_all([CPUFREQ.format(cpu)])
+            self.freq_fds[cpu] = fds[0] if fds else None
+        return self.freq_fds[cpu]
+
+    def read_mhz(self, cpus: set[int]) -> list[float]:
+        if self.cpufreq:
+            fds = [self.freq_fd(cpu) for cpu in sorted(cpus)]
+            khz = (read_number(fd) for fd in fds if fd is not None)
+            return [v / 1000 for v in khz if v]
+        now = time.perf_counter()
+        if self.cpuinfo_at is not None and (
+            now - self.cpuinfo_at < self.CPUINFO_INTERVAL_S
+        ):
+            return []
+        self.cpuinfo_at = now
+        mhz = []
+        try:
+            with open("/proc/cpuinfo") as f:
+                cpu = None
+                for line in f:
+                    if line.startswith("processor"):
+                        cpu = int(line.split(":", 1)[1])
+                    elif line.startswith("cpu MHz") and cpu in cpus:
+                        mhz.append(float(line.split(":", 1)[1]))
+        except (OSError, ValueError):
+            pass
+        return mhz
+
+    def sample(self, t0: float) -> None:
+        # Once stopped the child is reaped and its pid may be reused
+        cpus = set() if self.stopped.is_set() else self.busy_cpus()
+        mhz = self.read_mhz(cpus) if cpus else []
+        temps = [v / 1000 for v in map(read_number, self.temp_fds) if v is not None]
+        if mhz:
+            self.cpus |= cpus
+        self.mhz.extend(mhz)
+        if temps:
+            self.temp_c.append(max(temps))
+        if self.keep_raw:
+            self.series.append(
+                {
+                    "t_s": round(time.perf_counter() - t0, 3),
+                    "cpus": sorted(cpus),
+                    "mhz": mhz,
+                    "temp_c": temps,
+                }
+            )
+
+    def run(self) -> None:
+        t0 = time.perf_counter()
+        self.sample(t0)
+        while not self.stopped.wait(self.interval_s):
+            self.sample(t0)
+        self.sample(t0)
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.pid is not None:
+            self.join()
+        for fd in [*self.freq_fds.values(), *self.temp_fds]:
+            if fd is not None:
+                os.close(fd)
+
+    def metrics(self) -> dict:
+        def summary(prefix, values):
+            if not values:
+                return {f"{prefix}_{s}": None for s in ("min", "mean", "max")}
+            return {
+                f"{prefix}_min": min(values),
+                f"{prefix}_mean": round(sum(values) / len(values), 3),
+                f"{prefix}_max": max(values),
+            }
+
+        return {
+            **summary("cpu_mhz", self.mhz),
+            "cpu_mhz_cpus": len(self.cpus) if self.mhz else None,
+            **summary("temp_c", self.temp_c),
+        }
+
+
+def host_info() -> dict:
+    cpu_model = ""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith(("model name", "Hardware")):
+                    cpu_model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+
+    mem_kb = 0
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal"):
+                    mem_kb = int(line.split()[1])
+                    break
+    except OSError:
+        pass
+
+    env = os.environ.get
+    return {
+        "arch": os.uname().machine,
+        "cpu_model": cpu_model,
+        "threads": len(os.sched_getaffinity(0)),
+        "mem_kb": mem_kb,
+        "instance_id": env("INSTANCE_ID", ""),
+        "instance_type": env("INSTANCE_TYPE", ""),
+        "cloud_provider": env("CLOUD_PROVIDER", ""),
+        "cloud_region": env("CLOUD_REGION", ""),
+    }
+
+
+def meta_info() -> dict:
+    env = os.environ.get
+    return {
+        "run_id": env("RUN_ID", ""),
+        "task": env("TASK", ""),
+        "dataset": env("DATASET", ""),
+        "extra": env("EXTRA", ""),
+        "cpus": env("CPUS", ""),
+        "omp_num_threads": env("OMP_NUM_THREADS", ""),
+        "cpu_mode": env("CPU_MODE", ""),
+        "cpuset": env("CPUSET", ""),
+        "colo_group": env("COLO_GROUP", ""),
+        "colo_role": env("COLO_ROLE", ""),
+        "colo_peers": env("COLO_PEERS", ""),
+        "harness": "python",
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure one command and print a bench JSON record."
+    )
+    parser.add_argument("--cmd", help="Command string (as passed to bench measure)")
+    parser.add_argument(
+        "--merge-stderr",
+        action="store_true",
+        help="Send the child's stderr to stdout (for ffmpeg / stress-ng reports)",
+    )
+    parser.add_argument("argv", nargs=argparse.REMAINDER, help="Command and args")
+    args = parser.parse_args()
+
+    argv = args.argv[1:] if args.argv[:1] == ["--"] else args.argv
+    if args.cmd is not None:
+        cmd = args.cmd
+        argv = ["bash", "-c", cmd] if needs_shell(cmd) else shlex.split(cmd)
+    else:
+        cmd = " ".join(argv)
+    if not argv:
+        parser.error("no command given")
+
+    overhead_s, rss_floor_kb = measure_overhead()
+
+    sample_ms = int(os.environ.get("BENCH_SAMPLE_MS", "500") or 0)
+    sampler = None
+    if sample_ms > 0:
+        sampler = Sampler(sample_ms / 1000, os.environ.get("BENCH_SAMPLE_RAW") == "1")
+
+    sys.stdout.flush()
+    ts0 = now_ms()
+    wall_ns, exit_code, rusage = spawn_and_wait(
+        argv, args.merge_stderr, sampler.follow if sampler else None
+    )
+    ts1 = now_ms()
+
+    if sampler is not None:
+        sampler.stop()
+
+    record = {
+        "ts_start": ts0,
+        "ts_end": ts1,
+        "cmd": cmd,
+        "exit_code": exit_code,
+        "metrics": {
+            "wall_s": wall_ns / 1e9,
+            "user_s": rusage.ru_utime if rusage else 0.0,
+            "sys_s": rusage.ru_stime if rusage else 0.0,
+            "max_rss_kb": rusage.ru_maxrss if rusage else 0,
+            "harness_overhead_s": overhead_s,
+            "harness_rss_floor_kb": rss_floor_kb,
+        },
+        "host": host_info(),
+        "meta": meta_info(),
+    }
+    if sampler is not None:
+        record["metrics"].update(sampler.metrics())
+        if sampler.keep_raw:
+            record["samples"] = {
+                "interval_ms": sample_ms,
+                "series": sampler.series,
+            }
+    print(json.dumps(record, ensure_ascii=False, separators=(",", ":")), flush=True)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Storage I/O benchmark: sequential / random reads and writes at several block
+sizes and queue depths, comparing access methods:
+
+- buffered: io.BufferedReader / BufferedWriter, seek + read(bs) / write
+- readinto: unbuffered file, seek + readinto(preallocated buffer)
+- mmap:     copy slices out of a shared read-only mapping (page faults)
+- direct:   O_DIRECT preadv / pwritev with a page-aligned buffer
+
+Queue depth is the number of threads issuing I/O at once (the GIL is
+released during the syscalls). Every worker makes a single pass over its
+own slice of the file, so no block is read twice. Reads start from a cold
+page cache (posix_fadvise DONTNEED on the test file); the share of the file
+cached before and after the case (mincore) is recorded, and a case whose
+drop did not take is labelled warm. Write cases end with fsync, which is
+included in their time.
+
+A case ends at --runtime or when the pass is done, whichever comes first;
+--size-mb well above runtime x throughput keeps fast devices busy for the
+whole runtime.
+
+Prints one JSON line per case (task "io"): MB/s, IOPS and per-operation
+latency percentiles. Buffered writes get no percentiles (None): each
+write() only copies into the page cache, the device time all lands in the
+closing fsync, so only their MB/s (fsync included) is meaningful.
+
+Usage:
+    io_tasks.py [--dir /data] [--size-mb 1024] [--block-kb 4,128,1024]
+                [--qd 1,8] [--runtime 2] [--patterns seq,rand]
+                [--methods buffered,readinto,mmap,direct]
+"""
+
+import argparse
+import ctypes
+import json
+import mmap
+import os
+import random
+import threading
+import time
+
+WRITE_METHODS = ("buffered", "direct")
+CHUNK = 8 * 1024 * 1024
+LAT_KEYS = ("lat_p50_us", "lat_p95_us", "lat_p99_us", "lat_max_us")
+LIBC = ctypes.CDLL(None, use_errno=True)
+LIBC.mincore.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p]
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile (q in 0..100) of a sorted list."""
+    pos = (len(values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def create_file(path, size):
+    """Test file filled with incompressible data, synced to the device."""
+    chunk = os.urandom(CHUNK)
+    with open(path, "wb") as f:
+        left = size
+        while left > 0:
+            f.write(chunk[: min(left, CHUNK)])
+            left -= CHUNK
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def cached_pct(path):
+    """Share of the file's pages resident in the page cache (mincore)."""
+    with open(path, "rb") as f:
+        # A private mapping: ctypes needs a writable buffer for its address
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    try:
+        pages = -(-len(m) // mmap.PAGESIZE)
+        vec = (ctypes.c_ubyte * pages)()
+        addr = ctypes.c_char.from_buffer(m)
+        try:
+            rc = LIBC.mincore(ctypes.byref(addr), len(m), vec)
+        finally:
+            del addr
+    finally:
+        m.close()
+    if rc != 0:
+        return None
+    return sum(v & 1 for v in bytes(vec)) / pages * 100
+
+
+def drop_file_cache(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fdatasync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def offsets(pattern, worker, qd, size, bs, seed):
+    """
+    One pass over the worker's own slice of the file, in order (seq) or
+    shuffled (rand). No block is touched twice, so after the cache drop a
+    read is never served by an earlier read of the same block; the case
+    ends early (seconds < --runtime) when every slice is done.
+    """
+    blocks = size // bs
+    per_worker = max(blocks // qd, 1)
+    start = worker * per_worker
+    order = list(range(start, min(start + per_worker, blocks)))
+    if pattern == "rand":
+        random.Random(seed + worker).shuffle(order)
+    for block in order:
+        yield block * bs
+
+
+class Worker:
+    """Opens its own handle and runs one block-sized operation per call."""
+
+    def __init__(self, path, op, pattern, method, bs, shared_map):
+        self.op = op
+        self.method = method
+        self.bs = bs
+        self.buf = mmap.mmap(-1, bs)  # page-aligned, as O_DIRECT requires
+        self.view = memoryview(self.buf)
+        self.map = shared_map
+        self.file = None
+        self.fd = None
+        if method == "direct":
+            flags = os.O_RDONLY if op == "read" else os.O_WRONLY
+            self.fd = os.open(path, flags | os.O_DIRECT)
+        elif method == "buffered":
+            self.file = open(path, "rb" if op == "read" else "r+b")
+        elif method == "readinto":
+            self.file = open(path, "rb", buffering=0)
+        if pattern == "rand" and self.file is not None:
+            # No readahead: it would cache blocks that later reads then hit
+            os.posix_fadvise(self.file.fileno(), 0, 0, os.POSIX_FADV_RANDOM)
+
+    def __call__(self, offset):
+        if self.method == "direct":
+            if self.op == "read":
+                return os.preadv(self.fd, [self.buf], offset)
+            return os.pwritev(self.fd, [self.buf], offset)
+        if self.method == "mmap":
+            self.view[:] = self.map[offset : offset + self.bs]
+            return self.bs
+        self.file.seek(offset)
+        if self.op == "write":
+            return self.file.write(self.view)
+        if self.method == "readinto":
+            return self.file.readinto(self.view)
+        return len(self.file.read(self.bs))
+
+    def sync(self):
+        if self.op != "write":
+            return
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        elif self.fd is not None:
+            os.fsync(self.fd)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        if self.fd is not None:
+            os.close(self.fd)
+        self.view.release()
+        self.buf.close()
+
+
+def run_case(path, size, op, pattern, method, bs, qd, runtime, seed=1):
+    cached_before = None
+    if op == "read":
+        drop_file_cache(path)
+        cached_before = cached_pct(path)
+
+    shared_map = None
+    map_view = None
+    if method == "mmap":
+        with open(path, "rb") as f:
+            shared_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if pattern == "rand":
+            shared_map.madvise(mmap.MADV_RANDOM)
+        map_view = memoryview(shared_map)
+
+    result = {
+        "task": "io",
+        "op": op,
+        "pattern": pattern,
+        "method": method,
+        "block_kb": bs // 1024,
+        "qd": qd,
+    }
+    workers = []
+    try:
+        for _ in range(qd):
+            workers.append(Worker(path, op, pattern, method, bs, map_view))
+    except OSError as e:
+        # e.g. O_DIRECT on tmpfs / overlay: record the case as unsupported
+        errors = [str(e)]
+        workers, qd = [], 0
+    else:
+        errors = []
+    latencies = [[] for _ in range(qd)]
+    done = [0] * qd
+    deadline = time.perf_counter() + runtime
+
+    def loop(i):
+        lat = latencies[i]
+        do = workers[i]
+        try:
+            for offset in offsets(pattern, i, qd, size, bs, seed):
+                t0 = time.perf_counter_ns()
+                n = do(offset)
+                lat.append(time.perf_counter_ns() - t0)
+                done[i] += n
+                if time.perf_counter() >= deadline:
+                    break
+            do.sync()
+        except OSError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=loop, args=(i,)) for i in range(qd)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    for w in workers:
+        w.close()
+    if map_view is not None:
+        map_view.release()
+        shared_map.close()
+
+    if errors:
+        result["error"] = errors[0]
+        return result
+
+    lat = sorted(v for per_worker in latencies for v in per_worker)
+    total = sum(done)
+    cache = None
+    if op == "read":
+        # DONTNEED skips pages it cannot drop (mapped elsewhere, dirty)
+        cache = "cold" if cached_before is not None and cached_before < 1 else "warm"
+    result.update(
+        {
+            "cache": cache,
+            "cached_before_pct": cached_before,
+            "cached_after_pct": cached_pct(path) if op == "read" else None,
+            "bytes": total,
+            "ops": len(lat),
+            "seconds": elapsed,
+            "mb_per_s": total / elapsed / 1e6,
+            "iops": len(lat) / elapsed,
+        }
+    )
+    if op == "write" and method == "buffered":
+        # A buffered write only copies into the page cache; the device time
+        # is all in the final fsync, so per-operation latency says nothing
+        result.update(dict.fromkeys(LAT_KEYS))
+    else:
+        result.update(
+            {
+                "lat_p50_us": percentile(lat, 50) / 1e3,
+                "lat_p95_us": percentile(lat, 95) / 1e3,
+                "lat_p99_us": percentile(lat, 99) / 1e3,
+                "lat_max_us": lat[-1] / 1e3,
+            }
+        )
+    return result
+
+
+def csv_list(value, cast=str):
+    return [cast(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage I/O benchmark.")
+    parser.add_argument("--dir", default="/tmp", help="Directory for the test file")
+    parser.add_argument("--size-mb", type=int, default=1024, help="Test file size")
+    parser.add_argument("--block-kb", default="4,128,1024", help="Block sizes (KiB)")
+    parser.add_argument("--qd", default="1,8", help="Queue depths (threads)")
+    parser.add_argument("--runtime", type=float, default=2.0, help="Seconds per case")
+    parser.add_argument("--patterns", default="seq,rand", help="seq and/or rand")
+    parser.add_argument(
+        "--ops", default="read,write", help="read and/or write (writes overwrite)"
+    )
+    parser.add_argument(
+        "--methods",
+        default="buffered,readinto,mmap,direct",
+        help="Read methods; writes use buffered and direct only",
+    )
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    path = os.path.join(args.dir, f"io_bench.{os.getpid()}.dat")
+    create_file(path, size)
+    try:
+        for op in csv_list(args.ops):
+            for pattern in csv_list(args.patterns):
+                for method in csv_list(args.methods):
+                    if op == "write" and method not in WRITE_METHODS:
+                        continue
+                    for block_kb in csv_list(args.block_kb, int):
+                        for qd in csv_list(args.qd, int):
+                            result = run_case(
+                                path,
+                                size,
+                                op,
+                                pattern,
+                                method,
+                                block_kb * 1024,
+                                qd,
+                                args.runtime,
+                            )
+                            result["size_mb"] = args.size_mb
+                            print(json.dumps(result), flush=True)
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
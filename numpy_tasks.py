@@ -1,4 +1,15 @@
-import sys, time, json, numpy as np
+import ctypes
+import json
+import mmap
+import os
+import subprocess
+import sys
+import time
+
+# numpy is imported in __main__ for the compute tasks only: `startup` measures
+# cold imports in child processes and must not keep numpy's shared libraries
+# mapped (and so pinned in the page cache) in this process.
+np = None
 
 
 def matmul(n=2000):
@@ -19,14 +30,394 @@ def elem(n=1_000_000, it=50):
     print(json.dumps({"task": "numpy.elemwise", "n": n, "iter": it, "seconds": dt}))
 
 
+STARTUP_CHILD = """
+import json, time
+t0 = time.perf_counter()
+import numpy as np
+t1 = time.perf_counter()
+a = np.ones((256, 256))
+t2 = time.perf_counter()
+a @ a
+t3 = time.perf_counter()
+print(json.dumps({"import_numpy": t1 - t0, "first_matmul": t3 - t2}))
+"""
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile (q in 0..100) without numpy."""
+    vals = sorted(values)
+    pos = (len(vals) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(vals) - 1)
+    return vals[lo] + (vals[hi] - vals[lo]) * (pos - lo)
+
+
+def evict_page_cache():
+    """
+    Drop the interpreter's and numpy's files from the page cache.
+    Uses /proc/sys/vm/drop_caches when privileged, otherwise
+    posix_fadvise(DONTNEED) on every file of the stdlib and numpy.
+    """
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("1")
+        return "drop_caches"
+    except OSError:
+        pass
+
+    import importlib.util
+
+    roots = [os.path.dirname(os.__file__), os.path.realpath(sys.executable)]
+    spec = importlib.util.find_spec("numpy")
+    if spec and spec.submodule_search_locations:
+        roots += list(spec.submodule_search_locations)
+        libs = os.path.join(os.path.dirname(roots[-1]), "numpy.libs")
+        if os.path.isdir(libs):
+            roots.append(libs)
+
+    for root in roots:
+        paths = (
+            [root]
+            if os.path.isfile(root)
+            else (os.path.join(d, f) for d, _, files in os.walk(root) for f in files)
+        )
+        for path in paths:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+    return "fadvise"
+
+
+def startup(samples=20):
+    """
+    Cold-start latency of fresh processes, warm and cold page cache:
+    - interpreter: `python -c pass` wall time
+    - import_numpy: `import numpy` inside a fresh process
+    - first_matmul: first 256x256 `@` in that process (BLAS thread pool spin-up)
+    - total: wall time of the whole fresh process
+
+    "cold" is only cold for files this process does not map. numpy is kept
+    out of it, but the interpreter binary, libpython and the extension
+    modules imported here (and by a Python harness) stay mapped, so the
+    eviction cannot drop their pages: the cold `interpreter` phase is close
+    to warm, and the cold numpy phases lack the interpreter's share of the
+    misses a truly fresh host would see.
+    """
+    for cache in ("warm", "cold"):
+        phases = {
+            "interpreter": [],
+            "import_numpy": [],
+            "first_matmul": [],
+            "total": [],
+        }
+        evict = None
+        for _ in range(samples):
+            if cache == "cold":
+                evict = evict_page_cache()
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+            phases["interpreter"].append(time.perf_counter() - t0)
+
+            if cache == "cold":
+                evict_page_cache()
+            t0 = time.perf_counter()
+            out = subprocess.run(
+                [sys.executable, "-c", STARTUP_CHILD],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            phases["total"].append(time.perf_counter() - t0)
+            child = json.loads(out)
+            phases["import_numpy"].append(child["import_numpy"])
+            phases["first_matmul"].append(child["first_matmul"])
+
+        for phase, values in phases.items():
+            print(
+                json.dumps(
+                    {
+                        "task": "numpy.startup",
+                        "phase": phase,
+                        "cache": cache,
+                        "evict": evict,
+                        "samples": len(values),
+                        "p50_s": percentile(values, 50),
+                        "p90_s": percentile(values, 90),
+                        "p99_s": percentile(values, 99),
+                        "mean_s": sum(values) / len(values),
+                        "values_s": values,
+                    }
+                )
+            )
+
+
+def timed(fn, repeat):
+    """Wall times of `repeat` calls of fn, after one untimed warm-up call."""
+    fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def report(task, case, n, times, metric, work):
+    """One kernel result; value = work per second at the median time."""
+    median = percentile(times, 50)
+    print(
+        json.dumps(
+            {
+                "task": task,
+                "case": case,
+                "n": n,
+                "repeat": len(times),
+                "seconds": median,
+                "best_s": min(times),
+                "metric": metric,
+                "value": work / median,
+            }
+        )
+    )
+
+
+# Power-of-two and awkward (smooth non-power-of-two, prime) transform sizes
+FFT_1D = [1 << 20, 1_000_000, 999_983]
+FFT_2D = [1024, 1000, 1021]
+
+
+def fft(repeat=5):
+    """
+    np.fft on complex128 input; GFLOP/s from the conventional 5 N log2 N
+    operation count, so sizes and machines are comparable.
+    """
+    rng = np.random.default_rng(0)
+    for n in FFT_1D:
+        a = rng.random(n) + 1j * rng.random(n)
+        times = timed(lambda: np.fft.fft(a), repeat)
+        report("numpy.fft", f"fft1d-{n}", n, times, "gflops", 5 * n * np.log2(n) / 1e9)
+    for n in FFT_2D:
+        a = rng.random((n, n)) + 1j * rng.random((n, n))
+        times = timed(lambda: np.fft.fft2(a), repeat)
+        size = n * n
+        report(
+            "numpy.fft",
+            f"fft2d-{n}x{n}",
+            size,
+            times,
+            "gflops",
+            5 * size * np.log2(size) / 1e9,
+        )
+
+
+def sort(n=10_000_000, repeat=3):
+    """np.sort / np.argsort on random float64 and int64, in million items/s."""
+    rng = np.random.default_rng(0)
+    floats = rng.random(n)
+    ints = rng.integers(0, 2**62, n)
+    cases = [
+        ("sort-float64", lambda: np.sort(floats)),
+        ("sort-float64-stable", lambda: np.sort(floats, kind="stable")),
+        ("argsort-float64", lambda: np.argsort(floats)),
+        ("sort-int64", lambda: np.sort(ints)),
+        ("argsort-int64", lambda: np.argsort(ints)),
+    ]
+    for case, fn in cases:
+        report("numpy.sort", case, n, timed(fn, repeat), "mitems_per_s", n / 1e6)
+
+
+def reductions(n=50_000_000, repeat=5):
+    """Full-array reductions over float64; GB/s of input read once."""
+    a = np.random.default_rng(0).random(n)
+    gb = a.nbytes / 1e9
+    cases = [
+        ("sum", lambda: a.sum()),
+        ("max", lambda: a.max()),
+        ("argmax", lambda: a.argmax()),
+        ("std", lambda: a.std()),
+        ("dot", lambda: a @ a),
+    ]
+    for case, fn in cases:
+        report("numpy.reduce", case, n, timed(fn, repeat), "gb_per_s", gb)
+
+
+def linalg(n=2000, repeat=3):
+    """
+    np.linalg on an n x n SPD matrix; GFLOP/s from textbook operation counts
+    (solve 2/3 n^3, cholesky 1/3 n^3, singular values only 8/3 n^3,
+    eigh with eigenvectors 9 n^3).
+    """
+    rng = np.random.default_rng(0)
+    m = rng.random((n, n))
+    a = m @ m.T + n * np.eye(n)
+    b = rng.random(n)
+    cases = [
+        ("solve", lambda: np.linalg.solve(a, b), 2 / 3 * n**3),
+        ("cholesky", lambda: np.linalg.cholesky(a), 1 / 3 * n**3),
+        ("svd", lambda: np.linalg.svd(a, compute_uv=False), 8 / 3 * n**3),
+        ("eigh", lambda: np.linalg.eigh(a), 9 * n**3),
+    ]
+    for case, fn, flops in cases:
+        report("numpy.linalg", case, n, timed(fn, repeat), "gflops", flops / 1e9)
+
+
+CACHE_LINE = 64
+HUGE_PAGE = 2 * 1024 * 1024
+# chase.c, compiled in the Dockerfile
+CHASE_LIB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "libchase.so")
+
+
+def thp_mode():
+    try:
+        with open("/sys/kernel/mm/transparent_hugepage/enabled") as f:
+            return f.read().split("[")[1].split("]")[0]
+    except (OSError, IndexError):
+        return None
+
+
+def load_chase():
+    lib = ctypes.CDLL(CHASE_LIB)
+    lib.chase.restype = ctypes.c_int64
+    lib.chase.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_int64,
+        ctypes.c_int64,
+        ctypes.POINTER(ctypes.c_int64),
+    ]
+    return lib.chase
+
+
+def anon_huge_kib(addr):
+    """AnonHugePages of the mapping containing addr, from /proc/self/smaps."""
+    try:
+        with open("/proc/self/smaps") as f:
+            inside = False
+            for line in f:
+                head = line.split(None, 1)[0]
+                if "-" in head and not head.endswith(":"):
+                    lo, hi = (int(x, 16) for x in head.split("-"))
+                    inside = lo <= addr < hi
+                elif inside and head == "AnonHugePages:":
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def chase_buffer(size, pages):
+    """
+    int64 array on its own anonymous mapping, with THP requested or refused.
+    The mapping is one huge page longer than needed and the array starts at
+    its first 2 MiB boundary, so a "huge" buffer can be backed entirely by
+    huge pages.
+    """
+    length = -(-size // HUGE_PAGE) * HUGE_PAGE + HUGE_PAGE
+    buf = mmap.mmap(-1, length, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+    advice = mmap.MADV_HUGEPAGE if pages == "huge" else mmap.MADV_NOHUGEPAGE
+    try:
+        buf.madvise(advice)
+    except (AttributeError, OSError):
+        pass
+    offset = -np.frombuffer(buf, dtype=np.uint8).ctypes.data % HUGE_PAGE
+    return buf, np.frombuffer(buf, dtype=np.int64, count=size // 8, offset=offset)
+
+
+def chase(walk, size, pages, accesses, rng):
+    """
+    Walk a random cyclic permutation of the cache lines of a `size`-byte
+    working set in chase.c; every load depends on the previous one.
+    Returns (seconds, AnonHugePages KiB of the buffer).
+    """
+    lines = size // CACHE_LINE
+    step = CACHE_LINE // 8
+    buf, arr = chase_buffer(size, pages)
+    try:
+        order = rng.permutation(lines) * step
+        arr[order] = np.roll(order, -1)
+        addr = arr.ctypes.data
+        huge_kib = anon_huge_kib(addr)
+
+        end = ctypes.c_int64()
+        walk(addr, int(order[0]), min(lines, accesses), ctypes.byref(end))
+        ns = walk(addr, end.value, accesses, ctypes.byref(end))
+    finally:
+        del arr
+        buf.close()
+    return ns / 1e9, huge_kib
+
+
+def latency(max_kib=262_144, pages="both", accesses=2_000_000):
+    """
+    Memory latency by pointer chasing, working sets from 16 KiB to max_kib
+    (powers of two), normal and/or huge (THP) pages. The walk itself runs
+    in C (chase.c), so ns_per_access is the load-to-use latency alone.
+    """
+    rng = np.random.default_rng(42)
+    walk = load_chase()
+    variants = ["normal", "huge"] if pages == "both" else [pages]
+    sizes = []
+    size = 16 * 1024
+    while size <= max_kib * 1024:
+        sizes.append(size)
+        size *= 2
+
+    for variant in variants:
+        for size in sizes:
+            dt, huge_kib = chase(walk, size, variant, accesses, rng)
+            print(
+                json.dumps(
+                    {
+                        "task": "numpy.latency",
+                        "bytes": size,
+                        "pages": variant,
+                        "thp": thp_mode(),
+                        "anon_huge_kib": huge_kib,
+                        "accesses": accesses,
+                        "seconds": dt,
+                        "ns_per_access": dt / accesses * 1e9,
+                    }
+                )
+            )
+
+
 if __name__ == "__main__":
     sub = sys.argv[1] if len(sys.argv) > 1 else "matmul"
+    if sub != "startup":
+        import numpy as np
+
     if sub == "matmul":
         matmul(int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
     elif sub == "elem":
         n = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
         it = int(sys.argv[3]) if len(sys.argv) > 3 else 50
         elem(n, it)
+    elif sub == "startup":
+        startup(int(sys.argv[2]) if len(sys.argv) > 2 else 20)
+    elif sub == "latency":
+        max_kib = int(sys.argv[2]) if len(sys.argv) > 2 else 262_144
+        pages = sys.argv[3] if len(sys.argv) > 3 else "both"
+        accesses = int(sys.argv[4]) if len(sys.argv) > 4 else 2_000_000
+        latency(max_kib, pages, accesses)
+    elif sub == "fft":
+        fft(int(sys.argv[2]) if len(sys.argv) > 2 else 5)
+    elif sub == "sort":
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000_000
+        repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+        sort(n, repeat)
+    elif sub == "reduce":
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000_000
+        repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+        reductions(n, repeat)
+    elif sub == "linalg":
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+        repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+        linalg(n, repeat)
     else:
         print(json.dumps({"error": "unknown subcommand", "sub": sub}))
         sys.exit(2)
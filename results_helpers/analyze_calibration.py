@@ -0,0 +1,50 @@
+import argparse
+import pandas as pd
+
+from results_db import open_results
+
+parser = argparse.ArgumentParser(
+    description="Summarize null-task calibration runs (bench calibrate, container start)."
+)
+parser.add_argument("--input", default="normalized_results.csv", help="Input CSV file")
+parser.add_argument(
+    "--db", help="Read rows from this SQLite results store instead of --input"
+)
+parser.add_argument(
+    "--output", default="calibration_aggregated.csv", help="Output CSV file"
+)
+args = parser.parse_args()
+
+con = open_results(args.input, args.db)
+calib = pd.read_sql_query("SELECT * FROM results WHERE task_group = 'calibration'", con)
+con.close()
+if calib.empty:
+    print("No calibration runs found (bench calibrate / calibrate-container).")
+
+agg = calib.groupby(
+    ["cloud_provider", "arch", "instance_type", "harness", "task_kind"], as_index=False
+).agg(
+    median_wall_s=("wall_s", "median"),
+    p95_wall_s=("wall_s", lambda s: s.quantile(0.95)),
+    mean_wall_s=("wall_s", "mean"),
+    std_wall_s=("wall_s", "std"),
+    mean_harness_overhead_s=("harness_overhead_s", "mean"),
+    runs=("wall_s", "count"),
+)
+
+agg = agg.sort_values(["arch", "instance_type", "harness", "median_wall_s"])
+
+# Milliseconds are the natural unit here
+ms_cols = [
+    "median_wall_s",
+    "p95_wall_s",
+    "mean_wall_s",
+    "std_wall_s",
+    "mean_harness_overhead_s",
+]
+agg[ms_cols] = (agg[ms_cols] * 1000).round(3)
+agg = agg.rename(columns={c: c[: -len("_s")] + "_ms" for c in ms_cols})
+
+print(agg.to_string(index=False))
+
+agg.to_csv(args.output, index=False)
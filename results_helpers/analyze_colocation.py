@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Co-location interference (DATASET=colocation, campaign_agent.py
+--colo-repeats): every task of a set runs alone on its cpuset (colo_role
+solo) and at the same time as the other tasks of the set, each in its own
+container on its own cpuset (colo_role colo, colo_peers = the others).
+
+Per instance type, task and peers, on throughput (bogo ops/s for
+stress-ng, 1 / wall_s otherwise):
+
+    slowdown = mean solo throughput / mean co-located throughput
+
+1.0 means no interference; 1.3 means 30% less throughput next to those
+peers (shared LLC, memory bandwidth, SMT siblings on small instances).
+overlap is the mean share of a co-located run during which a peer was
+running too; well below 1 the peer finished early and the slowdown
+understates the contention.
+
+Writes the slowdown table, a per-instance-type summary (geometric mean and
+worst slowdown, for instance selection) and one slowdown-matrix heatmap per
+instance type (--plot-dir).
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analyze_scaling import add_throughput
+from plotting import figure, render_all
+
+GROUP_COLS = ["cloud_provider", "arch", "instance_type", "cpus_limit", "task_kind"]
+COLUMNS = GROUP_COLS + [
+    "colo_peers",
+    "solo_runs",
+    "colo_runs",
+    "solo_throughput",
+    "colo_throughput",
+    "slowdown",
+    "throughput_loss_pct",
+    "overlap",
+]
+SUMMARY_COLUMNS = [
+    "cloud_provider",
+    "arch",
+    "instance_type",
+    "pairs",
+    "geomean_slowdown",
+    "max_slowdown",
+    "worst_task",
+    "worst_peers",
+]
+
+
+def add_overlap(colo: pd.DataFrame) -> pd.DataFrame:
+    """Share of each co-located run within the span of its peers' runs."""
+    keys = ["instance_id", "run_id", "colo_group"]
+    runs = colo[keys + ["ts_start", "ts_end"]].rename_axis("row").reset_index()
+    pairs = runs.merge(runs, on=keys, suffixes=("", "_peer"))
+    pairs = pairs[pairs["row"] != pairs["row_peer"]]
+    peers = pairs.groupby("row").agg(
+        peer_start=("ts_start_peer", "min"), peer_end=("ts_end_peer", "max")
+    )
+    colo = colo.join(peers)
+    shared = np.minimum(colo["ts_end"], colo["peer_end"]) - np.maximum(
+        colo["ts_start"], colo["peer_start"]
+    )
+    duration = colo["ts_end"] - colo["ts_start"]
+    colo["overlap"] = shared.clip(lower=0) / duration.where(duration > 0)
+    return colo
+
+
+def slowdown_table(df: pd.DataFrame) -> pd.DataFrame:
+    runs = df[(df["dataset"] == "colocation") & (df["exit_code"] == 0)].copy()
+    if runs.empty or "colo_role" not in runs.columns:
+        return pd.DataFrame(columns=COLUMNS)
+    # Multi-line records (several stressors) count once per run
+    runs = add_throughput(runs.drop_duplicates(["file", "ts_start"]))
+    runs = runs.dropna(subset=["throughput"])
+    runs["cpus_limit"] = runs["cpus_limit"].fillna(0)
+
+    solo = (
+        runs[runs["colo_role"] == "solo"]
+        .groupby(GROUP_COLS)["throughput"]
+        .agg(solo_runs="count", solo_throughput="mean")
+        .reset_index()
+    )
+    colo = add_overlap(runs[runs["colo_role"] == "colo"].copy())
+    colo = (
+        colo.groupby(GROUP_COLS + ["colo_peers"])
+        .agg(
+            colo_runs=("throughput", "count"),
+            colo_throughput=("throughput", "mean"),
+            overlap=("overlap", "mean"),
+        )
+        .reset_index()
+    )
+
+    table = colo.merge(solo, on=GROUP_COLS, how="left")
+    table["slowdown"] = table["solo_throughput"] / table["colo_throughput"]
+    table["throughput_loss_pct"] = (
+        1 - table["colo_throughput"] / table["solo_throughput"]
+    ) * 100
+    table = table.sort_values(["arch", "instance_type", "task_kind", "colo_peers"])
+    return table[COLUMNS]
+
+
+def instance_summary(table: pd.DataFrame) -> pd.DataFrame:
+    """Per instance type: how much co-location costs across all pairs."""
+    rows = []
+    keys = ["cloud_provider", "arch", "instance_type"]
+    for key, sub in table.dropna(subset=["slowdown"]).groupby(keys):
+        worst = sub.loc[sub["slowdown"].idxmax()]
+        rows.append(
+            dict(zip(keys, key))
+            | {
+                "pairs": len(sub),
+                "geomean_slowdown": float(np.exp(np.log(sub["slowdown"]).mean())),
+                "max_slowdown": worst["slowdown"],
+                "worst_task": worst["task_kind"],
+                "worst_peers": worst["colo_peers"],
+            }
+        )
+    summary = pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+    return summary.sort_values("geomean_slowdown")
+
+
+def build_figures(table: pd.DataFrame, output_dir) -> list[dict]:
+    """Slowdown matrix per instance type: task (rows) next to peers (columns)."""
+    specs = []
+    for itype, sub in table.dropna(subset=["slowdown"]).groupby("instance_type"):
+        specs.append(
+            figure(
+                "heatmap",
+                Path(output_dir) / f"colocation_{itype}.png",
+                sub[["task_kind", "colo_peers", "slowdown"]].reset_index(drop=True),
+                title=f"Сповільнення при спільному розміщенні: {itype}",
+                xlabel="Сусідні задачі",
+                ylabel="Задача",
+                row_col="task_kind",
+                col_col="colo_peers",
+                value_col="slowdown",
+                vmin=1.0,
+            )
+        )
+    return specs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Slowdown of co-located tasks against their solo baseline."
+    )
+    parser.add_argument(
+        "--input", default="normalized_results.csv", help="Input CSV file"
+    )
+    parser.add_argument(
+        "--output", default="colocation_slowdown.csv", help="Output CSV file"
+    )
+    parser.add_argument(
+        "--summary-output",
+        default="colocation_by_instance.csv",
+        help="Per-instance-type geometric mean and worst slowdown",
+    )
+    parser.add_argument(
+        "--plot-dir", default=None, help="Write colocation_<instance_type>.png here"
+    )
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input, low_memory=False)
+    table = slowdown_table(df)
+    summary = instance_summary(table)
+
+    if table.empty:
+        print("No co-location runs (DATASET=colocation); nothing to compare.")
+    else:
+        table = table.round(
+            {
+                "solo_throughput": 4,
+                "colo_throughput": 4,
+                "slowdown": 3,
+                "throughput_loss_pct": 2,
+                "overlap": 3,
+            }
+        )
+        summary = summary.round({"geomean_slowdown": 3, "max_slowdown": 3})
+        print(table.to_string(index=False))
+        print()
+        print(summary.to_string(index=False))
+        short = table[table["overlap"] < 0.8]
+        if not short.empty:
+            print(
+                f"⚠️ {len(short)} task/peer pairs overlapped less than 80% of the "
+                "run; their slowdown understates the interference."
+            )
+
+    table.to_csv(args.output, index=False)
+    summary.to_csv(args.summary_output, index=False)
+    print(f"Saved co-location slowdown to {args.output} and {args.summary_output}")
+
+    if args.plot_dir and not table.empty:
+        render_all(build_figures(table, args.plot_dir))
+
+
+if __name__ == "__main__":
+    main()
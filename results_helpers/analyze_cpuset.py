@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Compare CPU modes: the same 2-CPU tasks (DATASET=cpumode) run under the CFS
+quota (docker --cpus), pinned to separate physical cores and pinned to SMT
+siblings (docker --cpuset-cpus, bench cpuset-plan).
+
+Per instance type, task and mode: mean and spread of throughput (bogo ops/s
+for stress-ng, 1 / wall_s otherwise), its low tail (p5) and the wall time
+tail (p95/p99); then each pinned mode relative to the quota run of the same
+instance type (throughput_vs_quota > 1 and p99_vs_quota < 1 mean pinning
+helps).
+"""
+
+import argparse
+
+import pandas as pd
+
+from analyze_scaling import add_throughput
+
+GROUP_COLS = ["cloud_provider", "arch", "instance_type", "task_kind"]
+MODE_ORDER = {"quota": 0, "physical": 1, "smt": 2}
+COLUMNS = GROUP_COLS + [
+    "cpu_mode",
+    "cpuset",
+    "runs",
+    "mean_throughput",
+    "cv_throughput",
+    "p5_throughput",
+    "p50_wall_s",
+    "p95_wall_s",
+    "p99_wall_s",
+    "throughput_vs_quota",
+    "p99_vs_quota",
+]
+
+
+def compare_modes(df: pd.DataFrame) -> pd.DataFrame:
+    runs = df[(df["dataset"] == "cpumode") & (df["exit_code"] == 0)].copy()
+    if runs.empty or "cpu_mode" not in runs.columns:
+        return pd.DataFrame(columns=COLUMNS)
+    runs = add_throughput(runs)
+    runs["cpuset"] = runs["cpuset"].fillna("")
+
+    grouped = runs.groupby(GROUP_COLS + ["cpu_mode"])
+    agg = grouped.agg(
+        # Pinned CPU lists may differ between instances of one type
+        cpuset=("cpuset", lambda s: " ".join(sorted(set(s) - {""}))),
+        runs=("throughput", "count"),
+        mean_throughput=("throughput", "mean"),
+        std_throughput=("throughput", "std"),
+        p50_wall_s=("wall_s", "median"),
+    )
+    agg["cv_throughput"] = agg["std_throughput"] / agg["mean_throughput"]
+    agg["p5_throughput"] = grouped["throughput"].quantile(0.05)
+    agg["p95_wall_s"] = grouped["wall_s"].quantile(0.95)
+    agg["p99_wall_s"] = grouped["wall_s"].quantile(0.99)
+    agg = agg.reset_index()
+
+    quota = agg[agg["cpu_mode"] == "quota"][
+        GROUP_COLS + ["mean_throughput", "p99_wall_s"]
+    ].rename(columns={"mean_throughput": "quota_throughput", "p99_wall_s": "quota_p99"})
+    agg = agg.merge(quota, on=GROUP_COLS, how="left")
+    agg["throughput_vs_quota"] = agg["mean_throughput"] / agg["quota_throughput"]
+    agg["p99_vs_quota"] = agg["p99_wall_s"] / agg["quota_p99"]
+
+    agg["mode_order"] = agg["cpu_mode"].map(MODE_ORDER).fillna(len(MODE_ORDER))
+    agg = agg.sort_values(["task_kind", "arch", "instance_type", "mode_order"])
+    return agg[COLUMNS]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare CFS quota vs cpuset pinning (physical / SMT) runs."
+    )
+    parser.add_argument(
+        "--input", default="normalized_results.csv", help="Input CSV file"
+    )
+    parser.add_argument("--output", default="cpuset_modes.csv", help="Output CSV file")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input)
+    modes = compare_modes(df)
+
+    if modes.empty:
+        print("No CPU-mode runs (DATASET=cpumode); nothing to compare.")
+    else:
+        modes = modes.round(
+            {
+                "mean_throughput": 3,
+                "cv_throughput": 4,
+                "p5_throughput": 3,
+                "p50_wall_s": 3,
+                "p95_wall_s": 3,
+                "p99_wall_s": 3,
+                "throughput_vs_quota": 3,
+                "p99_vs_quota": 3,
+            }
+        )
+        print(modes.to_string(index=False))
+
+    modes.to_csv(args.output, index=False)
+    print(f"Saved CPU-mode comparison to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Warm-up and drift over the repeat index.
+
+run-and-upload.sh runs every task back to back on one instance, so the
+repeats are a time series, not i.i.d. samples: the first runs may pay for
+cold page cache / JIT / frequency ramp-up, and a series may drift as the
+part heats up or a t-series instance runs out of CPU credits.
+
+Per series (one instance, one task variant, CPU limit / mode and, for
+co-location runs, role and peers), runs ordered by ts_start, on throughput
+(bogo ops/s for stress-ng, 1 / wall_s otherwise):
+  - warm-up: MSER truncation point (White 1997), searched over the first
+    half of the series, then cut back to the leading runs whose mean is
+    still more than --z standard errors off the rest
+  - drift: Mann-Kendall trend test and Sen's slope on the steady part;
+    flagged when p < --alpha and the fitted change over the steady part
+    exceeds --min-drift
+Writes drift_summary.csv, optionally the normalized results without the
+warm-up runs (--steady-output, a drop-in --input for the other analyzers)
+and one time-series plot per instance type (--plot-dir).
+"""
+
+import argparse
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analyze_online import GROUP_METRICS
+from analyze_scaling import add_throughput
+from plotting import figure, render_all
+from results_db import open_results
+
+SERIES_COLS = [
+    "cloud_provider",
+    "arch",
+    "instance_type",
+    "instance_id",
+    "task_kind",
+    "dataset",
+    "cpus_limit",
+    "cpu_mode",
+    "colo_role",
+    "colo_peers",
+]
+MIN_RUNS = 8  # below this neither test says much
+COLUMNS = SERIES_COLS + [
+    "variant",
+    "runs",
+    "warmup_runs",
+    "steady_runs",
+    "steady_from_ts",
+    "mk_tau",
+    "mk_p",
+    "sen_slope_pct",
+    "drift_pct",
+    "mean_all",
+    "mean_steady",
+    "warmup_bias_pct",
+    "status",
+]
+
+
+def mser(x: np.ndarray) -> int:
+    """
+    MSER truncation point: the d minimizing the squared standard error of
+    the mean of x[d:], d limited to the first half of the series.
+    """
+    n = len(x)
+    best_d, best = 0, math.inf
+    for d in range(n // 2 + 1):
+        tail = x[d:]
+        stat = ((tail - tail.mean()) ** 2).sum() / len(tail) ** 2
+        if stat < best * (1 - 1e-9):  # ties go to the shorter truncation
+            best_d, best = d, stat
+    return best_d
+
+
+def mann_kendall(x: np.ndarray) -> tuple[float, float]:
+    """Kendall's tau against the run order and the two-sided p-value."""
+    n = len(x)
+    i, j = np.triu_indices(n, k=1)
+    s = np.sign(x[j] - x[i]).sum()
+    _, ties = np.unique(x, return_counts=True)
+    var = (n * (n - 1) * (2 * n + 5) - (ties * (ties - 1) * (2 * ties + 5)).sum()) / 18
+    if var <= 0:
+        return 0.0, 1.0
+    z = (s - np.sign(s)) / math.sqrt(var)
+    return s / (n * (n - 1) / 2), math.erfc(abs(z) / math.sqrt(2))
+
+
+def sen_slope(x: np.ndarray) -> float:
+    """Median of the pairwise slopes, per run."""
+    i, j = np.triu_indices(len(x), k=1)
+    return float(np.median((x[j] - x[i]) / (j - i)))
+
+
+def analyze_series(x: np.ndarray, alpha: float, min_drift: float, z: float) -> dict:
+    n = len(x)
+    result = {
+        "runs": n,
+        "warmup_runs": 0,
+        "mk_tau": np.nan,
+        "mk_p": np.nan,
+        "sen_slope_pct": np.nan,
+        "drift_pct": np.nan,
+        "status": "short",
+    }
+    if n < MIN_RUNS:
+        return result
+
+    d = mser(x)
+    tail = x[d:]
+    # MSER alone over-truncates noisy series: keep only the leading runs
+    # whose mean still differs from the rest
+    for k in range(d):
+        head = x[k:d]
+        if abs(head.mean() - tail.mean()) <= z * tail.std(ddof=1) / math.sqrt(
+            len(head)
+        ):
+            d = k
+            break
+    steady = x[d:]
+    tau, p = mann_kendall(steady)
+    median = float(np.median(steady))
+    slope_pct = sen_slope(steady) / median * 100 if median else np.nan
+    drift_pct = slope_pct * (len(steady) - 1)
+    drifting = p < alpha and abs(drift_pct) > min_drift * 100
+
+    status = "+".join(
+        name for name, hit in (("warmup", d > 0), ("drift", drifting)) if hit
+    )
+    result.update(
+        warmup_runs=d,
+        mk_tau=tau,
+        mk_p=p,
+        sen_slope_pct=slope_pct,
+        drift_pct=drift_pct,
+        status=status or "steady",
+    )
+    return result
+
+
+def add_variant(df: pd.DataFrame) -> pd.DataFrame:
+    """Task parameters that split one task_kind into separate series."""
+    df["variant"] = ""
+    for group, (cols, _) in GROUP_METRICS.items():
+        cols = [c for c in cols if c in df.columns]
+        rows = df["task_group"] == group
+        if not cols or not rows.any():
+            continue
+        df.loc[rows, "variant"] = (
+            df.loc[rows, cols]
+            .astype(str)
+            .replace("nan", "")
+            .fillna("")
+            .agg("/".join, axis=1)
+        )
+    return df
+
+
+def analyze(
+    df: pd.DataFrame, alpha: float, min_drift: float, z: float
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Returns (summary per series, successful runs with repeat / steady flags).
+    """
+    runs = df[df["exit_code"] == 0].copy()
+    for col in SERIES_COLS:
+        if col not in runs.columns:
+            runs[col] = np.nan
+    runs = add_variant(add_throughput(runs))
+    runs = runs.dropna(subset=["throughput", "ts_start"])
+    keys = SERIES_COLS + ["variant"]
+    runs[keys] = runs[keys].fillna("")
+    # Stable sort: equal timestamps keep file order
+    runs = runs.sort_values("ts_start", kind="mergesort")
+    # A run with several rows of one variant is one point of its series
+    run_keys = ["file", "ts_start", "variant"]
+    first = ~runs.duplicated(run_keys)
+    runs["repeat"] = runs[first].groupby(keys, sort=False).cumcount()
+    runs["steady"] = True
+
+    rows = []
+    for key, series in runs[first].groupby(keys, sort=False):
+        x = series["throughput"].to_numpy(dtype=float)
+        result = analyze_series(x, alpha, min_drift, z)
+        d = result["warmup_runs"]
+        runs.loc[series.index[:d], "steady"] = False
+        steady = x[d:]
+        result.update(
+            steady_runs=len(steady),
+            steady_from_ts=series["ts_start"].iloc[d],
+            mean_all=x.mean(),
+            mean_steady=steady.mean(),
+            warmup_bias_pct=(x.mean() / steady.mean() - 1) * 100,
+        )
+        rows.append(dict(zip(keys, key)) | result)
+
+    # The other rows of a run share its repeat index and warm-up flag
+    grouped = runs.groupby(run_keys, sort=False)
+    runs["repeat"] = grouped["repeat"].transform("first").astype(int)
+    runs["steady"] = grouped["steady"].transform("min")
+
+    summary = pd.DataFrame(rows, columns=COLUMNS)
+    summary = summary.sort_values(
+        ["task_kind", "variant", "dataset", "arch", "instance_type", "instance_id"]
+    )
+    return summary, runs
+
+
+def build_figures(runs: pd.DataFrame, output_dir) -> list[dict]:
+    """Per instance type: throughput over the repeat index, one panel per task."""
+    specs = []
+    if runs.empty:
+        return specs
+    data = runs.drop_duplicates(["file", "ts_start", "variant"])
+    keys = SERIES_COLS + ["variant"]
+    # Relative to the series' steady median, so tasks share one scale
+    base = data[data["steady"]].groupby(keys)["throughput"].median()
+    data = data.join(base.rename("base"), on=keys)
+    data["relative"] = data["throughput"] / data["base"]
+    data["panel"] = data["task_kind"] + data["variant"].map(
+        lambda v: f" ({v})" if v.strip("/") else ""
+    )
+    sweep = ~data["dataset"].isin(["", "default"])
+    data.loc[sweep, "panel"] += " [" + data.loc[sweep, "dataset"] + "]"
+    data["series"] = (
+        data["instance_id"]
+        + data["cpus_limit"].map(lambda c: f" cpus={c:g}" if c != "" else "")
+        + data["cpu_mode"].map(lambda m: f" {m}" if m else "")
+        + data["colo_peers"].map(lambda p: f" + {p}" if p else "")
+    )
+    data["warmup"] = ~data["steady"]
+
+    for itype, sub in data.groupby("instance_type"):
+        specs.append(
+            figure(
+                "timeseries",
+                Path(output_dir) / f"drift_{itype}.png",
+                sub[["panel", "series", "repeat", "relative", "warmup"]].reset_index(
+                    drop=True
+                ),
+                title=f"Прогрів і дрейф по повторах: {itype}",
+                xlabel="Номер повтору",
+                ylabel="Продуктивність / медіана стабільної ділянки",
+                panel_col="panel",
+                series_col="series",
+                x_col="repeat",
+                y_col="relative",
+                mark_col="warmup",
+            )
+        )
+    return specs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Detect warm-up transients and drift over repeated runs."
+    )
+    parser.add_argument(
+        "--input", default="normalized_results.csv", help="Input CSV file"
+    )
+    parser.add_argument(
+        "--db", help="Read rows from this SQLite results store instead of --input"
+    )
+    parser.add_argument(
+        "--output", default="drift_summary.csv", help="Per-series summary CSV"
+    )
+    parser.add_argument(
+        "--steady-output",
+        default=None,
+        help="Also write the input rows without warm-up runs to this CSV",
+    )
+    parser.add_argument(
+        "--plot-dir", default=None, help="Write drift_<instance_type>.png here"
+    )
+    parser.add_argument(
+        "--alpha", type=float, default=0.05, help="Mann-Kendall significance level"
+    )
+    parser.add_argument(
+        "--min-drift",
+        type=float,
+        default=0.02,
+        help="Smallest fitted change over the steady part that counts as drift",
+    )
+    parser.add_argument(
+        "--z",
+        type=float,
+        default=2.0,
+        help="Warm-up kept only if its mean is this many standard errors off",
+    )
+    args = parser.parse_args()
+
+    con = open_results(args.input, args.db)
+    df = pd.read_sql_query("SELECT * FROM results", con)
+    con.close()
+    # Store bookkeeping, so --steady-output stays a drop-in --input
+    df = df.drop(columns=["row_key", "loaded_at"], errors="ignore")
+    summary, runs = analyze(df, args.alpha, args.min_drift, args.z)
+
+    summary.round(
+        {
+            "mk_tau": 3,
+            "mk_p": 4,
+            "sen_slope_pct": 3,
+            "drift_pct": 2,
+            "mean_all": 4,
+            "mean_steady": 4,
+            "warmup_bias_pct": 2,
+        }
+    ).to_csv(args.output, index=False)
+    print(f"Saved drift summary ({len(summary)} series) to {args.output}")
+    counts = summary["status"].value_counts()
+    print(", ".join(f"{status}: {n}" for status, n in counts.items()))
+    flagged = summary[summary["status"].str.contains("drift")]
+    if not flagged.empty:
+        print("⚠️ Drifting series (steady part not stationary):")
+        print(
+            flagged[
+                ["instance_type", "instance_id", "task_kind", "variant", "drift_pct"]
+            ].to_string(index=False)
+        )
+
+    if args.steady_output:
+        warmup = runs.index[~runs["steady"]]
+        df.drop(index=warmup).to_csv(args.steady_output, index=False)
+        print(
+            f"Saved {len(df) - len(warmup)} rows without {len(warmup)} "
+            f"warm-up runs to {args.steady_output}"
+        )
+
+    if args.plot_dir:
+        render_all(build_figures(runs, args.plot_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,11 @@
 import argparse
 from pathlib import Path
 
-import matplotlib.pyplot as plt
 import pandas as pd
 
+from plotting import figure, render_all
+from results_db import SIDE_DATASETS
+
 
 def load_prices(path: str) -> pd.DataFrame:
     """Load instance prices (must contain instance_type, price_per_hour_usd, vcpus)."""
@@ -16,23 +18,66 @@ def load_prices(path: str) -> pd.DataFrame:
     return prices[["instance_type", "price_per_hour_usd", "vcpus"]].drop_duplicates()
 
 
-def plot_perf_per_dollar(df: pd.DataFrame, value_col: str, title: str, out_png: str):
+def load_scaling(path) -> pd.DataFrame | None:
+    """Load scaling_model.csv produced by analyze_scaling.py, if present."""
+    if not path or not Path(path).is_file():
+        return None
+    scaling = pd.read_csv(path)
+    if scaling.empty:
+        return None
+    return scaling[["instance_type", "task_kind", "serial_fraction"]]
+
+
+def vcpu_scaling_factor(
+    df: pd.DataFrame, scaling: pd.DataFrame | None, task_kind, vcpus_used: int
+) -> pd.Series:
     """
-    Plot bar chart for performance_per_dollar_* metric by instance type.
+    Factor that scales throughput measured on vcpus_used to the whole instance.
+
+    Without a scaling model this is the linear vcpus / vcpus_used (perfect
+    scaling). Where analyze_scaling.py fitted a serial fraction s for the
+    instance type and task, Amdahl's speedup ratio S(vcpus) / S(vcpus_used)
+    is used instead.
     """
-    labels = df["instance_type"] + " (" + df["arch"] + ")"
-    x = range(len(df))
+    linear = df["vcpus"] / vcpus_used
+    if scaling is None:
+        return linear
+
+    kinds = df["task_kind"] if "task_kind" in df.columns else task_kind
+    keys = pd.DataFrame({"instance_type": df["instance_type"], "task_kind": kinds})
+    s = keys.merge(scaling, on=["instance_type", "task_kind"], how="left")[
+        "serial_fraction"
+    ].to_numpy()
+
+    def speedup(p):
+        return p / (1.0 + s * (p - 1.0))
+
+    amdahl = pd.Series(
+        speedup(df["vcpus"].to_numpy(dtype=float)) / speedup(float(vcpus_used)),
+        index=df.index,
+    )
+    return amdahl.fillna(linear)
+
 
-    plt.figure(figsize=(10, 5))
-    plt.bar(x, df[value_col])
-    plt.xticks(x, labels, rotation=45, ha="right")
-    plt.ylabel("нормалізована продуктивність на долар")
-    plt.xlabel("тип інстансу (архітектура)")
-    plt.title(title)
-    plt.tight_layout()
-    plt.savefig(out_png, dpi=200)
-    plt.close()
-    print(f"Saved plot: {out_png}")
+def plot_perf_per_dollar(df: pd.DataFrame, value_col: str, title: str, out_png: str):
+    """
+    Describe a bar chart for performance_per_dollar_* metric by instance type.
+    The figure is drawn later by plotting.render_all().
+    """
+    data = pd.DataFrame(
+        {
+            "label": df["instance_type"] + " (" + df["arch"] + ")",
+            "value": df[value_col],
+        }
+    ).reset_index(drop=True)
+    return figure(
+        "bar",
+        out_png,
+        data,
+        ylabel="нормалізована продуктивність на долар",
+        xlabel="тип інстансу (архітектура)",
+        title=title,
+    )
 
 
 def analyze_stress(
@@ -42,6 +87,7 @@ def analyze_stress(
     out_png="stressng_perf_per_dollar.png",
     vcpus_used: int = 2,
     output_dir: str = ".",
+    scaling: pd.DataFrame | None = None,
 ):
     print("\n=== Analyzing stress-ng ===")
     df = pd.read_csv(in_path)
@@ -55,9 +101,12 @@ def analyze_stress(
         df["performance_metric"] / df["price_per_hour_usd"]
     )
 
-    # Normalized performance per dollar (scaled by vCPUs_total / vCPUs_used)
+    # Normalized performance per dollar (scaled to all vCPUs of the instance)
+    df["vcpu_scaling_factor"] = vcpu_scaling_factor(
+        df, scaling, "stress-ng", vcpus_used
+    )
     df["performance_per_dollar_norm"] = (
-        df["performance_metric"] / df["price_per_hour_usd"] * (df["vcpus"] / vcpus_used)
+        df["performance_metric"] / df["price_per_hour_usd"] * df["vcpu_scaling_factor"]
     )
 
     df = df.sort_values("performance_per_dollar_norm", ascending=False)
@@ -72,13 +121,14 @@ def analyze_stress(
                 "mean_ops_real",
                 "price_per_hour_usd",
                 "vcpus",
+                "vcpu_scaling_factor",
                 "performance_per_dollar_raw",
                 "performance_per_dollar_norm",
             ]
         ]
     )
 
-    plot_perf_per_dollar(
+    return plot_perf_per_dollar(
         df,
         value_col="performance_per_dollar_norm",
         title="Продуктивність на долар - stress-ng (нормалізовано до 2 vCPU)",
@@ -93,6 +143,7 @@ def analyze_ffmpeg(
     out_png="ffmpeg_perf_per_dollar.png",
     vcpus_used: int = 2,
     output_dir: str = ".",
+    scaling: pd.DataFrame | None = None,
 ):
     print("\n=== Analyzing FFmpeg ===")
     df = pd.read_csv(in_path)
@@ -107,8 +158,9 @@ def analyze_ffmpeg(
     df["performance_per_dollar_raw"] = (
         df["performance_metric"] / df["price_per_hour_usd"]
     )
+    df["vcpu_scaling_factor"] = vcpu_scaling_factor(df, scaling, "ffmpeg", vcpus_used)
     df["performance_per_dollar_norm"] = (
-        df["performance_metric"] / df["price_per_hour_usd"] * (df["vcpus"] / vcpus_used)
+        df["performance_metric"] / df["price_per_hour_usd"] * df["vcpu_scaling_factor"]
     )
 
     df = df.sort_values("performance_per_dollar_norm", ascending=False)
@@ -123,13 +175,14 @@ def analyze_ffmpeg(
                 "mean_wall_s",
                 "price_per_hour_usd",
                 "vcpus",
+                "vcpu_scaling_factor",
                 "performance_per_dollar_raw",
                 "performance_per_dollar_norm",
             ]
         ]
     )
 
-    plot_perf_per_dollar(
+    return plot_perf_per_dollar(
         df,
         value_col="performance_per_dollar_norm",
         title="Продуктивність на долар - FFmpeg (нормалізовано до 2 vCPU)",
@@ -143,6 +196,7 @@ def analyze_numpy(
     out_prefix="numpy",
     vcpus_used: int = 2,
     output_dir: str = ".",
+    scaling: pd.DataFrame | None = None,
 ):
     print("\n=== Analyzing NumPy ===")
     df = pd.read_csv(in_path)
@@ -153,6 +207,7 @@ def analyze_numpy(
             "numpy_aggregated.csv must contain 'task_kind' (e.g. 'matmul', 'elem')."
         )
 
+    figures = []
     for task in sorted(df["task_kind"].unique()):
         sub = df[df["task_kind"] == task].copy()
 
@@ -165,10 +220,11 @@ def analyze_numpy(
         sub["performance_per_dollar_raw"] = (
             sub["performance_metric"] / sub["price_per_hour_usd"]
         )
+        sub["vcpu_scaling_factor"] = vcpu_scaling_factor(sub, scaling, task, vcpus_used)
         sub["performance_per_dollar_norm"] = (
             sub["performance_metric"]
             / sub["price_per_hour_usd"]
-            * (sub["vcpus"] / vcpus_used)
+            * sub["vcpu_scaling_factor"]
         )
 
         sub = sub.sort_values("performance_per_dollar_norm", ascending=False)
@@ -188,23 +244,233 @@ def analyze_numpy(
                     "mean_wall_s",
                     "price_per_hour_usd",
                     "vcpus",
+                    "vcpu_scaling_factor",
                     "performance_per_dollar_raw",
                     "performance_per_dollar_norm",
                 ]
             ]
         )
 
-        plot_perf_per_dollar(
-            sub,
-            value_col="performance_per_dollar_norm",
-            title=f"Продуктивність на долар - NumPy ({task}, нормалізовано до 2 vCPU)",
-            out_png=out_png,
+        figures.append(
+            plot_perf_per_dollar(
+                sub,
+                value_col="performance_per_dollar_norm",
+                title=(
+                    f"Продуктивність на долар - NumPy ({task}, "
+                    "нормалізовано до 2 vCPU)"
+                ),
+                out_png=out_png,
+            )
+        )
+
+    return figures
+
+
+def parse_weights(text: str | None) -> dict[str, float] | None:
+    """Weights from "stress-ng=0.5,ffmpeg=0.3,numpy-matmul=0.2", summing to 1."""
+    if not text:
+        return None
+    weights = {}
+    for item in text.split(","):
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"Bad --weights item (expected name=weight): {item}")
+        weights[name.strip()] = float(value)
+    total = sum(weights.values())
+    if total <= 0:
+        raise SystemExit("--weights must sum to a positive value")
+    return {name: w / total for name, w in weights.items()}
+
+
+def load_workload_throughput(output_dir: str) -> pd.DataFrame:
+    """
+    Whole-instance throughput per workload and instance type, from the
+    *_economy.csv files written above: performance_metric (measured on
+    vcpus_used) times the vCPU scaling factor.
+    """
+    out = Path(output_dir)
+    sources = [("stress-ng", out / "stressng_economy.csv")]
+    sources.append(("ffmpeg", out / "ffmpeg_economy.csv"))
+    for path in sorted(out.glob("numpy_*_economy.csv")):
+        sources.append((path.stem[len("numpy_") : -len("_economy")], path))
+
+    frames = []
+    for workload, path in sources:
+        if not path.is_file():
+            continue
+        df = pd.read_csv(path)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "workload": workload,
+                    "arch": df["arch"],
+                    "instance_type": df["instance_type"],
+                    "price_per_hour_usd": df["price_per_hour_usd"],
+                    "vcpus": df["vcpus"],
+                    "throughput": df["performance_metric"] * df["vcpu_scaling_factor"],
+                }
+            )
         )
+    if not frames:
+        return pd.DataFrame(columns=["workload", "arch", "instance_type", "throughput"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_workload_p95(results_path: Path, workloads) -> pd.DataFrame:
+    """
+    p95 time per unit of work of each workload's reference runs, per
+    instance type: wall_s for ffmpeg / numpy, 1 / bogo ops/s for stress-ng.
+    Measured on the benchmark's vCPUs (a job's latency, not scaled).
+    """
+    df = pd.read_csv(results_path)
+    df = df[~df["dataset"].isin(SIDE_DATASETS) & (df["exit_code"] == 0)]
+    # Multi-line tasks (numpy kernels, suite stressors): one row per run
+    df = df[df["task_kind"].isin(workloads)].drop_duplicates(["file", "ts_start"])
+    latency = df["wall_s"].copy()
+    if "stress_bogo_ops_per_s_real" in df.columns:
+        stress = df["task_kind"] == "stress-ng"
+        latency[stress] = 1.0 / df.loc[stress, "stress_bogo_ops_per_s_real"]
+    df = df.assign(latency=latency)
+    return (
+        df.groupby(["task_kind", "instance_type"])["latency"]
+        .quantile(0.95)
+        .rename("p95")
+        .reset_index()
+        .rename(columns={"task_kind": "workload"})
+    )
+
+
+def pareto_front(df: pd.DataFrame, cost_col: str, value_col: str) -> pd.Series:
+    """True for rows no other row beats on both lower cost and higher value."""
+    order = df.sort_values([cost_col, value_col], ascending=[True, False])
+    front = pd.Series(False, index=df.index)
+    best = float("-inf")
+    for idx, value in order[value_col].items():
+        if pd.notna(order.at[idx, cost_col]) and value > best:
+            front[idx] = True
+            best = value
+    return front
+
+
+def analyze_mix(
+    weights: dict[str, float] | None,
+    output_dir: str = ".",
+    results_path: Path | None = None,
+    out_csv="economy_mix.csv",
+    out_png="economy_mix_pareto.png",
+):
+    """
+    Combined throughput of a workload mix per instance type and its Pareto
+    frontiers vs $/hour and vs p95 latency.
+
+    Each workload's throughput is normalized to the best instance type (1.0).
+    The mix throughput is the weighted harmonic mean of those, i.e. the rate
+    at which an instance gets through a job made of the workloads in the
+    given proportions. The latency index is the weighted mean of each
+    workload's p95 relative to the best type (1.0 = best at everything).
+    """
+    print("\n=== Workload mix ===")
+    tp = load_workload_throughput(output_dir)
+    if tp.empty:
+        print("⚠️ No per-workload economy results, skipping the mix")
+        return None
+
+    available = sorted(tp["workload"].unique())
+    if weights is None:
+        weights = {w: 1 / len(available) for w in available}
+    unknown = set(weights) - set(available)
+    if unknown:
+        raise SystemExit(
+            f"--weights names unknown workloads {sorted(unknown)}; "
+            f"available: {', '.join(available)}"
+        )
+    print("Weights: " + ", ".join(f"{w}={v:.2f}" for w, v in weights.items()))
+
+    tp = tp[tp["workload"].isin(weights)].copy()
+    tp["norm"] = tp["throughput"] / tp.groupby("workload")["throughput"].transform(
+        "max"
+    )
+    wide = tp.pivot_table(index="instance_type", columns="workload", values="norm")
+    incomplete = wide[wide.isna().any(axis=1)].index
+    if len(incomplete):
+        print(f"⚠️ Missing weighted workloads, left out: {', '.join(incomplete)}")
+    wide = wide.dropna()
+    if wide.empty:
+        print("⚠️ No instance type has results for every weighted workload")
+        return None
+
+    w = pd.Series(weights)[wide.columns]
+    mix = (
+        tp.drop_duplicates("instance_type")
+        .set_index("instance_type")[["arch", "price_per_hour_usd", "vcpus"]]
+        .loc[wide.index]
+    )
+    for workload in wide.columns:
+        mix[f"norm_{workload}"] = wide[workload]
+    mix["mix_throughput"] = 1.0 / (w / wide).sum(axis=1)
+    mix["mix_per_dollar"] = mix["mix_throughput"] / mix["price_per_hour_usd"]
+
+    mix["mix_p95_index"] = float("nan")
+    if results_path is not None and results_path.is_file():
+        p95 = load_workload_p95(results_path, list(wide.columns))
+        p95["rel"] = p95["p95"] / p95.groupby("workload")["p95"].transform("min")
+        rel = p95.pivot_table(index="instance_type", columns="workload", values="rel")
+        rel = rel.reindex(index=mix.index, columns=wide.columns)
+        mix["mix_p95_index"] = (rel * w).sum(axis=1, min_count=len(w))
+    else:
+        print(f"⚠️ {results_path} not found, no p95 latency frontier")
+
+    mix = mix.reset_index()
+    mix["pareto_cost"] = pareto_front(mix, "price_per_hour_usd", "mix_throughput")
+    mix["pareto_latency"] = pareto_front(mix, "mix_p95_index", "mix_throughput")
+    mix = mix.sort_values("mix_per_dollar", ascending=False)
+
+    mix.to_csv(f"{output_dir}/{out_csv}", index=False)
+    print(f"Saved workload-mix results to: {output_dir}/{out_csv}")
+    print(
+        mix[
+            [
+                "arch",
+                "instance_type",
+                "price_per_hour_usd",
+                "mix_throughput",
+                "mix_per_dollar",
+                "mix_p95_index",
+                "pareto_cost",
+                "pareto_latency",
+            ]
+        ].to_string(index=False)
+    )
+
+    data = pd.DataFrame(
+        {
+            "label": mix["instance_type"],
+            "value": mix["mix_throughput"],
+            "price": mix["price_per_hour_usd"],
+            "p95": mix["mix_p95_index"],
+            "pareto_cost": mix["pareto_cost"],
+            "pareto_latency": mix["pareto_latency"],
+            "color": ["blue" if a == "aarch64" else "orange" for a in mix["arch"]],
+        }
+    ).reset_index(drop=True)
+    return figure(
+        "pareto",
+        f"{output_dir}/{out_png}",
+        data,
+        panels=[
+            ["price", "pareto_cost", "ціна, $/год"],
+            ["p95", "pareto_latency", "індекс p95 затримки (1 = найкращий)"],
+        ],
+        ylabel="нормалізована продуктивність суміші",
+        title="Суміш навантажень: "
+        + ", ".join(f"{name} {share:.0%}" for name, share in w.items()),
+    )
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Analyze economic efficiency (performance_per_dollar) for different workloads."
+        description="Analyze economic efficiency (performance_per_dollar) "
+        "for different workloads."
     )
     parser.add_argument(
         "--input-dir", default=".", help="Input directory for aggregated CSV files"
@@ -240,6 +506,24 @@ def main():
         default=2,
         help="Number of vCPUs actually used in benchmarks (default: 2)",
     )
+    parser.add_argument(
+        "--scaling",
+        default=None,
+        help="Scaling model from analyze_scaling.py (default: scaling_model.csv); "
+        "without it vCPU normalization assumes perfect linear scaling",
+    )
+    parser.add_argument(
+        "--weights",
+        default=None,
+        help="Workload mix, e.g. stress-ng=0.5,ffmpeg=0.3,numpy-matmul=0.2 "
+        "(default: all workloads found, equal weights)",
+    )
+    parser.add_argument(
+        "--results",
+        default=None,
+        help="Normalized rows for the mix's p95 latency "
+        "(default: normalized_results.csv)",
+    )
 
     args = parser.parse_args()
     input_dir = Path(args.input_dir)
@@ -253,39 +537,67 @@ def main():
         Path(args.ffmpeg) if args.ffmpeg else input_dir / "ffmpeg_aggregated.csv"
     )
     numpy_path = Path(args.numpy) if args.numpy else input_dir / "numpy_aggregated.csv"
+    scaling_path = (
+        Path(args.scaling) if args.scaling else input_dir / "scaling_model.csv"
+    )
+    results_path = (
+        Path(args.results) if args.results else input_dir / "normalized_results.csv"
+    )
 
     prices = load_prices(prices_path)
+    scaling = load_scaling(scaling_path)
+    if scaling is not None:
+        print(f"Using scaling model for vCPU normalization: {scaling_path}")
+
+    figures = []
 
     if Path(stress_path).is_file():
-        analyze_stress(
-            prices,
-            in_path=stress_path,
-            vcpus_used=args.vcpus_used,
-            output_dir=args.output_dir,
+        figures.append(
+            analyze_stress(
+                prices,
+                in_path=stress_path,
+                vcpus_used=args.vcpus_used,
+                output_dir=args.output_dir,
+                scaling=scaling,
+            )
         )
     else:
         print(f"⚠️ stress-ng file not found: {stress_path}")
 
     if Path(ffmpeg_path).is_file():
-        analyze_ffmpeg(
-            prices,
-            in_path=ffmpeg_path,
-            vcpus_used=args.vcpus_used,
-            output_dir=args.output_dir,
+        figures.append(
+            analyze_ffmpeg(
+                prices,
+                in_path=ffmpeg_path,
+                vcpus_used=args.vcpus_used,
+                output_dir=args.output_dir,
+                scaling=scaling,
+            )
         )
     else:
         print(f"⚠️ FFmpeg file not found: {ffmpeg_path}")
 
     if Path(numpy_path).is_file():
-        analyze_numpy(
+        figures += analyze_numpy(
             prices,
             in_path=numpy_path,
             vcpus_used=args.vcpus_used,
             output_dir=args.output_dir,
+            scaling=scaling,
         )
     else:
         print(f"⚠️ NumPy file not found: {numpy_path}")
 
+    mix_figure = analyze_mix(
+        parse_weights(args.weights),
+        output_dir=args.output_dir,
+        results_path=results_path,
+    )
+    if mix_figure is not None:
+        figures.append(mix_figure)
+
+    render_all(figures)
+
 
 if __name__ == "__main__":
     main()
@@ -1,20 +1,58 @@
 import argparse
 import pandas as pd
 
+from results_db import open_results, reference_sql
+
 parser = argparse.ArgumentParser(description="Analyze FFmpeg benchmark results.")
 parser.add_argument("--input", default="normalized_results.csv", help="Input CSV file")
+parser.add_argument(
+    "--db", help="Read rows from this SQLite results store instead of --input"
+)
 parser.add_argument("--output", default="ffmpeg_aggregated.csv", help="Output CSV file")
+parser.add_argument(
+    "--matrix-output",
+    default="ffmpeg_matrix_aggregated.csv",
+    help="Output CSV with per-configuration (codec/preset/resolution/threads) results",
+)
+parser.add_argument(
+    "--net",
+    action="store_true",
+    help="Use wall_s_net (wall_s minus the per-instance calibration baseline)",
+)
 args = parser.parse_args()
 
-df = pd.read_csv(args.input)
+con = open_results(args.input, args.db)
+# Side-campaign runs (co-location) have their own analyzers
+ffmpeg_all = pd.read_sql_query(
+    f"""
+    SELECT * FROM results
+    WHERE task_group = 'ffmpeg' AND {reference_sql()}
+    """,
+    con,
+)
 
-ffmpeg = df[df["task_group"] == "ffmpeg"].copy()
+wall_col = "wall_s"
+if args.net:
+    if "wall_s_net" not in ffmpeg_all.columns:
+        raise SystemExit("--net needs calibration runs (bench calibrate) in the input")
+    wall_col = "wall_s_net"
 
-agg = ffmpeg.groupby(["cloud_provider", "arch", "instance_type"], as_index=False).agg(
-    mean_wall_s=("wall_s", "mean"),
-    std_wall_s=("wall_s", "std"),
-    runs=("wall_s", "count"),
+# The reference workload; matrix runs (TASK=ffmpeg-matrix) are aggregated below
+agg = pd.read_sql_query(
+    f"""
+    SELECT cloud_provider, arch, instance_type,
+           AVG({wall_col}) AS mean_wall_s,
+           stdev({wall_col}) AS std_wall_s,
+           COUNT({wall_col}) AS runs
+    FROM results
+    WHERE task_group = 'ffmpeg' AND task_kind = 'ffmpeg'
+      AND {reference_sql()}
+    GROUP BY cloud_provider, arch, instance_type
+    ORDER BY cloud_provider, arch, instance_type
+    """,
+    con,
 )
+con.close()
 
 agg["relative_speed"] = 10 / agg["mean_wall_s"]
 agg = agg.sort_values(["arch", "instance_type"])
@@ -30,3 +68,56 @@ agg = agg.round(
 print(agg.to_string(index=False))
 
 agg.to_csv(args.output, index=False)
+
+# -----------------------------
+# Per-configuration matrix, from what the encoder itself reported
+# -----------------------------
+# ffmpeg-source rows are the one-off y4m renders of FFMPEG_SOURCE=cache mode,
+# reported separately from the encodes that read them (ffmpeg_source=cache)
+config_cols = [
+    "task_kind",
+    "ffmpeg_source",
+    "ffmpeg_codec",
+    "ffmpeg_preset",
+    "ffmpeg_width",
+    "ffmpeg_height",
+    "ffmpeg_threads",
+]
+for col in config_cols + [
+    "ffmpeg_fps",
+    "ffmpeg_fps_bench",
+    "ffmpeg_speed_x",
+    "ffmpeg_utime_s",
+    "ffmpeg_maxrss_kb",
+]:
+    if col not in ffmpeg_all.columns:
+        ffmpeg_all[col] = float("nan")
+
+matrix = ffmpeg_all.groupby(
+    ["cloud_provider", "arch", "instance_type"] + config_cols,
+    as_index=False,
+    dropna=False,
+).agg(
+    mean_fps=("ffmpeg_fps_bench", "mean"),
+    std_fps=("ffmpeg_fps_bench", "std"),
+    mean_fps_reported=("ffmpeg_fps", "mean"),
+    mean_speed_x=("ffmpeg_speed_x", "mean"),
+    mean_utime_s=("ffmpeg_utime_s", "mean"),
+    max_maxrss_kb=("ffmpeg_maxrss_kb", "max"),
+    mean_wall_s=("wall_s", "mean"),
+    runs=("wall_s", "count"),
+)
+matrix = matrix.sort_values(["arch", "instance_type"] + config_cols)
+matrix = matrix.round(
+    {
+        "mean_fps": 2,
+        "std_fps": 2,
+        "mean_fps_reported": 2,
+        "mean_speed_x": 3,
+        "mean_utime_s": 2,
+        "mean_wall_s": 2,
+    }
+)
+
+matrix.to_csv(args.matrix_output, index=False)
+print(f"Saved {len(matrix)} FFmpeg matrix rows to {args.matrix_output}")
@@ -0,0 +1,80 @@
+import argparse
+import pandas as pd
+
+from results_db import open_results
+
+parser = argparse.ArgumentParser(
+    description="Analyze storage I/O results (io_tasks.py)."
+)
+parser.add_argument("--input", default="normalized_results.csv", help="Input CSV file")
+parser.add_argument(
+    "--db", help="Read rows from this SQLite results store instead of --input"
+)
+parser.add_argument("--output", default="io_aggregated.csv", help="Output CSV file")
+args = parser.parse_args()
+
+GROUP_COLS = ["cloud_provider", "arch", "instance_type"]
+CASE_COLS = ["io_op", "io_pattern", "io_method", "io_block_kb", "io_qd"]
+AGG_COLS = [
+    "mean_mb_per_s",
+    "std_mb_per_s",
+    "mean_iops",
+    "p50_us",
+    "p95_us",
+    "p99_us",
+    "runs",
+]
+
+con = open_results(args.input, args.db)
+io = pd.read_sql_query("SELECT * FROM results WHERE task_group = 'io'", con)
+con.close()
+if "io_op" in io.columns:
+    io = io.dropna(subset=["io_op"])
+else:
+    io = io.iloc[0:0]
+if io.empty:
+    # bench io needs an IO_DIR volume and is often not run: not an error
+    print("No I/O runs found (bench io).")
+    pd.DataFrame(columns=GROUP_COLS + CASE_COLS + AGG_COLS).to_csv(
+        args.output, index=False
+    )
+    raise SystemExit(0)
+
+# Cases the filesystem refused (e.g. O_DIRECT on tmpfs) carry only io_error
+if "io_error" in io.columns:
+    failed = io[io["io_error"].notna()]
+    if not failed.empty:
+        print(f"⚠️ {len(failed)} I/O cases failed, e.g.: {failed['io_error'].iloc[0]}")
+    io = io[io["io_error"].isna()]
+
+# Reads whose cache drop did not take measured the page cache, not the device
+if "io_cache" in io.columns:
+    warm = io[io["io_cache"] == "warm"]
+    if not warm.empty:
+        print(f"⚠️ {len(warm)} read cases started with the file partly cached, skipped")
+    io = io[io["io_cache"] != "warm"]
+
+agg = io.groupby(GROUP_COLS + CASE_COLS, as_index=False).agg(
+    mean_mb_per_s=("io_mb_per_s", "mean"),
+    std_mb_per_s=("io_mb_per_s", "std"),
+    mean_iops=("io_iops", "mean"),
+    p50_us=("io_lat_p50_us", "median"),
+    p95_us=("io_lat_p95_us", "median"),
+    p99_us=("io_lat_p99_us", "median"),
+    runs=("io_mb_per_s", "count"),
+)
+agg = agg.sort_values(CASE_COLS + ["arch", "instance_type"])
+agg = agg.round(
+    {
+        "mean_mb_per_s": 1,
+        "std_mb_per_s": 1,
+        "mean_iops": 0,
+        "p50_us": 1,
+        "p95_us": 1,
+        "p99_us": 1,
+    }
+)
+
+print(agg.to_string(index=False))
+
+agg.to_csv(args.output, index=False)
@@ -0,0 +1,67 @@
+import argparse
+import pandas as pd
+
+from results_db import open_results
+
+parser = argparse.ArgumentParser(
+    description="Analyze memory latency (numpy_tasks.py latency, pointer chasing)."
+)
+parser.add_argument("--input", default="normalized_results.csv", help="Input CSV file")
+parser.add_argument(
+    "--db", help="Read rows from this SQLite results store instead of --input"
+)
+parser.add_argument(
+    "--output", default="latency_aggregated.csv", help="Output CSV file"
+)
+parser.add_argument(
+    "--arch-output",
+    default="latency_arch_compare.csv",
+    help="Output CSV with the best instance per architecture for each working set",
+)
+args = parser.parse_args()
+
+GROUP_COLS = ["cloud_provider", "arch", "instance_type", "numpy_pages", "numpy_bytes"]
+AGG_COLS = ["ns_per_access", "anon_huge_kib", "std_ns", "runs", "working_set_kib"]
+
+con = open_results(args.input, args.db)
+latency = pd.read_sql_query("SELECT * FROM results WHERE task_group = 'latency'", con)
+con.close()
+if latency.empty:
+    # Older campaigns and runs without the task: nothing to do, not an error
+    print("No memory latency runs found (bench numpy latency).")
+    pd.DataFrame(columns=GROUP_COLS + AGG_COLS).to_csv(args.output, index=False)
+    pd.DataFrame(columns=["numpy_pages", "working_set_kib"]).to_csv(
+        args.arch_output, index=False
+    )
+    raise SystemExit(0)
+if "numpy_anon_huge_kib" not in latency.columns:  # results from older images
+    latency["numpy_anon_huge_kib"] = float("nan")
+
+agg = latency.groupby(GROUP_COLS, as_index=False).agg(
+    ns_per_access=("numpy_ns_per_access", "median"),
+    anon_huge_kib=("numpy_anon_huge_kib", "median"),
+    std_ns=("numpy_ns_per_access", "std"),
+    runs=("numpy_ns_per_access", "count"),
+)
+agg["working_set_kib"] = (agg["numpy_bytes"] // 1024).astype(int)
+agg = agg.sort_values(["arch", "instance_type", "numpy_pages", "numpy_bytes"])
+agg = agg.round({"ns_per_access": 2, "std_ns": 2})
+
+print(agg.to_string(index=False))
+
+agg.to_csv(args.output, index=False)
+
+# Lowest latency per architecture at each working-set size and page size
+best = agg.loc[
+    agg.groupby(["numpy_pages", "numpy_bytes", "arch"])["ns_per_access"].idxmin()
+]
+compare = best.pivot_table(
+    index=["numpy_pages", "working_set_kib"], columns="arch", values="ns_per_access"
+).reset_index()
+compare.columns.name = None
+if {"aarch64", "x86_64"} <= set(compare.columns):
+    compare["arm_to_x86_ratio"] = (compare["aarch64"] / compare["x86_64"]).round(3)
+
+print("\nBest ns/access per architecture:")
+print(compare.to_string(index=False))
+compare.to_csv(args.arch_output, index=False)
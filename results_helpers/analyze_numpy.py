@@ -1,22 +1,62 @@
 import argparse
 import pandas as pd
 
+from results_db import open_results, reference_sql
+
 parser = argparse.ArgumentParser(description="Analyze NumPy benchmark results.")
 parser.add_argument("--input", default="normalized_results.csv", help="Input CSV file")
+parser.add_argument(
+    "--db", help="Read rows from this SQLite results store instead of --input"
+)
 parser.add_argument("--output", default="numpy_aggregated.csv", help="Output CSV file")
+parser.add_argument(
+    "--kernels-output",
+    default="numpy_kernels_aggregated.csv",
+    help="Output CSV with per-kernel throughput (fft / sort / reduce / linalg)",
+)
+parser.add_argument(
+    "--net",
+    action="store_true",
+    help="Use wall_s_net (wall_s minus the per-instance calibration baseline)",
+)
 args = parser.parse_args()
 
-df = pd.read_csv(args.input)
+con = open_results(args.input, args.db)
+# Side-campaign runs (scaling sweep, CPU modes, co-location) have their own
+# analyzers
+numpy_df = pd.read_sql_query(
+    f"""
+    SELECT * FROM results
+    WHERE task_group = 'numpy' AND {reference_sql()}
+    """,
+    con,
+)
 
-numpy_df = df[df["task_group"] == "numpy"].copy()
+wall_col = "wall_s"
+if args.net:
+    if "wall_s_net" not in numpy_df.columns:
+        raise SystemExit("--net needs calibration runs (bench calibrate) in the input")
+    wall_col = "wall_s_net"
 
-agg = numpy_df.groupby(
-    ["cloud_provider", "arch", "instance_type", "task_kind"], as_index=False
-).agg(
-    mean_wall_s=("wall_s", "mean"),
-    std_wall_s=("wall_s", "std"),
-    runs=("wall_s", "count"),
+# Kernel tasks print one line per case; count each run once for wall time
+agg = pd.read_sql_query(
+    f"""
+    SELECT cloud_provider, arch, instance_type, task_kind,
+           AVG({wall_col}) AS mean_wall_s,
+           stdev({wall_col}) AS std_wall_s,
+           COUNT({wall_col}) AS runs
+    FROM (
+        SELECT DISTINCT file, ts_start, cloud_provider, arch, instance_type,
+               task_kind, {wall_col}
+        FROM results
+        WHERE task_group = 'numpy' AND {reference_sql()}
+    )
+    GROUP BY cloud_provider, arch, instance_type, task_kind
+    ORDER BY cloud_provider, arch, instance_type, task_kind
+    """,
+    con,
 )
+con.close()
 
 agg["relative_speed"] = 1 / agg["mean_wall_s"]
 
@@ -30,3 +70,29 @@ agg = agg.round(
 
 agg.to_csv(args.output, index=False)
 print(agg)
+
+# -----------------------------
+# Per-kernel throughput, as reported by numpy_tasks.py
+# -----------------------------
+if "numpy_case" in numpy_df.columns:
+    kernels = numpy_df.dropna(subset=["numpy_case"])
+    kagg = kernels.groupby(
+        [
+            "cloud_provider",
+            "arch",
+            "instance_type",
+            "numpy_task",
+            "numpy_case",
+            "numpy_metric",
+        ],
+        as_index=False,
+    ).agg(
+        mean_throughput=("numpy_throughput", "mean"),
+        std_throughput=("numpy_throughput", "std"),
+        median_s=("numpy_seconds_reported", "median"),
+        runs=("numpy_throughput", "count"),
+    )
+    kagg = kagg.sort_values(["numpy_task", "numpy_case", "arch", "instance_type"])
+    kagg = kagg.round({"mean_throughput": 3, "std_throughput": 3, "median_s": 5})
+    kagg.to_csv(args.kernels_output, index=False)
+    print(f"Saved {len(kagg)} kernel rows to {args.kernels_output}")
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Live aggregation of a results tree while a campaign is running.
+
+Watches --input_dir for new or grown .jsonl files and folds only the new
+records into running per-group state:
+
+- count, min, max and Welford mean / variance
+- a log-bucket quantile sketch (relative error --alpha) for p50/p95/p99
+
+Both are mergeable, so the state is kept per file and per group and merged
+into the totals. A file that grows is read from where the last complete
+metrics record ended; a file that shrinks or is rewritten (e.g. a re-synced
+upload) is re-read alone and the totals re-merged from the per-file state.
+An update therefore costs time proportional to the new data, not to the
+whole tree. The state is saved to --state so a restart continues where it
+stopped; --once does a single pass and exits.
+
+Calibration-corrected columns (wall_s_net) need every file of an instance
+and are left to parse_results.py / the batch analyzers.
+
+run_pipeline.py runs one --once pass after the fetch, with its state in
+results/, and ships online_aggregated.csv (count, mean, std, p50/p95/p99
+per group) with the other results.
+
+Usage:
+    python analyze_online.py --input_dir data/raw --interval 10
+    python analyze_online.py --input_dir data/raw --once
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from parse_results import segment_rows, split_segments
+
+KEY_COLS = [
+    "task_group",
+    "task_kind",
+    "dataset",
+    "cloud_provider",
+    "arch",
+    "instance_type",
+    "variant",
+]
+# task_group -> (columns that tell the variants apart, metrics besides wall_s)
+GROUP_METRICS = {
+    "synthetic": (
+        ["stress_stressor", "stress_cpu_method"],
+        ["stress_bogo_ops_per_s_real", "stress_bogo_ops_per_s_usr_sys"],
+    ),
+    "ffmpeg": (["ffmpeg_preset", "ffmpeg_crf"], ["ffmpeg_fps", "ffmpeg_fps_bench"]),
+    "numpy": (
+        ["numpy_case", "numpy_n"],
+        ["numpy_seconds_reported", "numpy_throughput"],
+    ),
+    "startup": (["numpy_phase", "numpy_cache"], ["numpy_p50_s", "numpy_p99_s"]),
+    "latency": (["numpy_pages", "numpy_bytes"], ["numpy_ns_per_access"]),
+    "io": (
+        ["io_op", "io_pattern", "io_method", "io_block_kb", "io_qd"],
+        ["io_mb_per_s", "io_iops", "io_lat_p99_us"],
+    ),
+}
+QUANTILES = (50, 95, 99)
+HEAD_BYTES = 4096  # hashed start of a file, to notice rewrites
+
+
+class LogSketch:
+    """
+    Quantile sketch with log-spaced buckets (as DDSketch): a value x > 0
+    goes to bucket ceil(log_gamma(x)), gamma = (1 + alpha) / (1 - alpha),
+    so every quantile is within relative error alpha. Negative values are
+    kept mirrored, zeros counted apart. Sketches with the same alpha merge
+    by adding bucket counts.
+    """
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.log_gamma = math.log((1 + alpha) / (1 - alpha))
+        self.pos = {}
+        self.neg = {}
+        self.zeros = 0
+
+    def add(self, x: float) -> None:
+        if x > 0:
+            i = math.ceil(math.log(x) / self.log_gamma)
+            self.pos[i] = self.pos.get(i, 0) + 1
+        elif x < 0:
+            i = math.ceil(math.log(-x) / self.log_gamma)
+            self.neg[i] = self.neg.get(i, 0) + 1
+        else:
+            self.zeros += 1
+
+    def merge(self, other: "LogSketch") -> None:
+        for mine, theirs in ((self.pos, other.pos), (self.neg, other.neg)):
+            for i, c in theirs.items():
+                mine[i] = mine.get(i, 0) + c
+        self.zeros += other.zeros
+
+    def value(self, i: int) -> float:
+        # Midpoint (in relative terms) of bucket (gamma^(i-1), gamma^i]
+        return 2 * math.exp(i * self.log_gamma) / (1 + math.exp(self.log_gamma))
+
+    def quantile(self, q: float, count: int) -> float | None:
+        """Value at q (0..100) by nearest rank over count values."""
+        if count == 0:
+            return None
+        rank = round((count - 1) * q / 100)
+        seen = 0
+        for i in sorted(self.neg, reverse=True):
+            seen += self.neg[i]
+            if seen > rank:
+                return -self.value(i)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for i in sorted(self.pos):
+            seen += self.pos[i]
+            if seen > rank:
+                return self.value(i)
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "pos": list(self.pos.items()),
+            "neg": list(self.neg.items()),
+            "zeros": self.zeros,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict, alpha: float) -> "LogSketch":
+        sketch = cls(alpha)
+        sketch.pos = {int(i): c for i, c in d["pos"]}
+        sketch.neg = {int(i): c for i, c in d["neg"]}
+        sketch.zeros = d["zeros"]
+        return sketch
+
+
+class RunningStats:
+    """Count, min/max, Welford mean/variance and a quantile sketch."""
+
+    def __init__(self, alpha: float):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = LogSketch(alpha)
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        self.sketch.add(x)
+
+    def merge(self, other: "RunningStats") -> None:
+        """Chan et al. pairwise update of mean and M2."""
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    def std(self) -> float | None:
+        # ddof=1, as pandas .std()
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else None
+
+    def to_dict(self) -> dict:
+        return {
+            "n": self.n,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min,
+            "max": self.max,
+            "sketch": self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict, alpha: float) -> "RunningStats":
+        stats = cls(alpha)
+        stats.n = d["n"]
+        stats.mean = d["mean"]
+        stats.m2 = d["m2"]
+        stats.min = d["min"]
+        stats.max = d["max"]
+        stats.sketch = LogSketch.from_dict(d["sketch"], alpha)
+        return stats
+
+
+def key_str(value) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+def row_metrics(row: dict):
+    """(group key, metric, value) of every metric a normalized row carries."""
+    group = row["task_group"]
+    variant_cols, metrics = GROUP_METRICS.get(group, ([], []))
+    variant = "/".join(key_str(row.get(c)) for c in variant_cols)
+    key = (
+        group,
+        row["task_kind"],
+        key_str(row["dataset"]),
+        key_str(row["cloud_provider"]),
+        key_str(row["arch"]),
+        key_str(row["instance_type"]),
+        variant,
+    )
+    for metric in ["wall_s"] + metrics:
+        value = row.get(metric)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if math.isfinite(value):
+                yield key, metric, float(value)
+
+
+def file_head(path: Path, entry: dict) -> str:
+    """
+    Hash of the start of the part already read: appends leave it as is, a
+    file replaced by different content changes it.
+    """
+    with path.open("rb") as f:
+        return hashlib.sha1(f.read(min(entry["offset"], HEAD_BYTES))).hexdigest()
+
+
+class OnlineAggregator:
+    """Per-file offsets and group state, merged into the totals."""
+
+    def __init__(self, root: Path, alpha: float):
+        self.root = root
+        self.alpha = alpha
+        self.files = {}  # path -> {size, mtime_ns, offset, head, groups}
+        self.totals = {}  # (key, metric) -> RunningStats
+
+    # --- state file ---
+
+    def load(self, path: Path) -> None:
+        with path.open() as f:
+            saved = json.load(f)
+        if saved.get("alpha") != self.alpha:
+            print(f"⚠️ {path} was built with another --alpha, starting over")
+            return
+        for name, entry in saved["files"].items():
+            entry["groups"] = {
+                (tuple(key), metric): RunningStats.from_dict(d, self.alpha)
+                for key, metric, d in entry["groups"]
+            }
+            self.files[name] = entry
+        self.remerge()
+
+    def save(self, path: Path) -> None:
+        files = {
+            name: {
+                **entry,
+                "groups": [
+                    [list(key), metric, stats.to_dict()]
+                    for (key, metric), stats in entry["groups"].items()
+                ],
+            }
+            for name, entry in self.files.items()
+        }
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("w") as f:
+            json.dump({"alpha": self.alpha, "files": files}, f)
+        os.replace(tmp, path)
+
+    # --- updates ---
+
+    def remerge(self) -> None:
+        self.totals = {}
+        for entry in self.files.values():
+            self.merge_into_totals(entry["groups"])
+
+    def merge_into_totals(self, groups: dict) -> None:
+        for gk, stats in groups.items():
+            total = self.totals.get(gk)
+            if total is None:
+                total = self.totals[gk] = RunningStats(self.alpha)
+            total.merge(stats)
+
+    def read_new(self, path: Path, entry: dict, final: bool) -> tuple[int, dict]:
+        """Rows appended since entry["offset"], folded into a delta state."""
+        with path.open("rb") as f:
+            f.seek(entry["offset"])
+            data = f.read()
+        segments, consumed = split_segments(data, final=final)
+        delta = {}
+        rows = 0
+        for row in segment_rows(path, segments):
+            rows += 1
+            for key, metric, value in row_metrics(row):
+                stats = delta.get((key, metric))
+                if stats is None:
+                    stats = delta[(key, metric)] = RunningStats(self.alpha)
+                stats.add(value)
+        entry["offset"] += consumed
+        return rows, delta
+
+    def scan(self) -> dict:
+        """One pass over the tree; returns counts of what changed."""
+        counts = {"rows": 0, "files": 0, "rewritten": 0, "removed": 0}
+        rebuild = False
+        seen = set()
+        done = {}  # instance dir -> has DONE
+        for path in sorted(self.root.rglob("*.jsonl")):
+            name = str(path)
+            seen.add(name)
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            # The upload marks a finished instance with DONE; until then a
+            # last line without a newline may still be being written
+            if path.parent not in done:
+                done[path.parent] = (path.parent / "DONE").exists()
+            final = done[path.parent]
+            entry = self.files.get(name)
+            if (
+                entry is not None
+                and entry["size"] == st.st_size
+                and entry["mtime_ns"] == st.st_mtime_ns
+                # DONE since the last read: flush a held-back last line
+                and (entry.get("final") or not final)
+            ):
+                continue
+
+            if entry is not None and (
+                st.st_size < entry["offset"] or file_head(path, entry) != entry["head"]
+            ):
+                # Truncated or replaced: re-read this file alone
+                entry = None
+                rebuild = True
+                counts["rewritten"] += 1
+            if entry is None:
+                entry = {"offset": 0, "groups": {}}
+                self.files[name] = entry
+
+            rows, delta = self.read_new(path, entry, final)
+            entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns, final=final)
+            entry["head"] = file_head(path, entry)
+            for gk, stats in delta.items():
+                if gk in entry["groups"]:
+                    entry["groups"][gk].merge(stats)
+                else:
+                    entry["groups"][gk] = stats
+            if not rebuild:
+                self.merge_into_totals(delta)
+            counts["rows"] += rows
+            counts["files"] += 1
+
+        for name in set(self.files) - seen:
+            del self.files[name]
+            rebuild = True
+            counts["removed"] += 1
+        if rebuild:
+            self.remerge()
+        return counts
+
+    # --- output ---
+
+    def frame(self) -> pd.DataFrame:
+        records = []
+        for (key, metric), stats in self.totals.items():
+            record = dict(zip(KEY_COLS, key))
+            record.update(
+                metric=metric,
+                count=stats.n,
+                mean=stats.mean,
+                std=stats.std(),
+                min=stats.min,
+                max=stats.max,
+            )
+            for q in QUANTILES:
+                record[f"p{q}"] = stats.sketch.quantile(q, stats.n)
+            records.append(record)
+        df = pd.DataFrame(
+            records,
+            columns=KEY_COLS
+            + ["metric", "count", "mean", "std", "min", "max"]
+            + [f"p{q}" for q in QUANTILES],
+        )
+        return df.sort_values(KEY_COLS + ["metric"]).reset_index(drop=True)
+
+
+def write_csv(df: pd.DataFrame, path: Path) -> None:
+    # Readers polling the file never see it half-written
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    df.to_csv(tmp, index=False, float_format="%.6g")
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Incrementally aggregate benchmark results as they arrive."
+    )
+    parser.add_argument(
+        "--input_dir", required=True, help="Directory with .jsonl files to watch"
+    )
+    parser.add_argument(
+        "--output", default="online_aggregated.csv", help="Output CSV file"
+    )
+    parser.add_argument(
+        "--state",
+        default="online_state.json",
+        help="Running state, reloaded on start (default: online_state.json)",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=10.0, help="Seconds between scans"
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.01,
+        help="Relative error of the percentile sketch (default: 0.01)",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Do one pass and exit (no watching)"
+    )
+    args = parser.parse_args()
+
+    root = Path(args.input_dir)
+    if not root.is_dir():
+        raise SystemExit(f"Input path is not a directory: {root}")
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    state = Path(args.state)
+
+    agg = OnlineAggregator(root, args.alpha)
+    if state.is_file():
+        agg.load(state)
+        print(f"Resumed from {state}: {len(agg.files)} files")
+
+    first = True
+    try:
+        while True:
+            t0 = time.perf_counter()
+            counts = agg.scan()
+            if counts["files"] or counts["removed"] or first:
+                df = agg.frame()
+                write_csv(df, output)
+                agg.save(state)
+                print(
+                    f"[{time.strftime('%H:%M:%S')}] +{counts['rows']} rows from "
+                    f"{counts['files']} files ({counts['rewritten']} rewritten, "
+                    f"{counts['removed']} removed) in "
+                    f"{time.perf_counter() - t0:.2f}s -> {len(df)} groups "
+                    f"in {output}"
+                )
+                first = False
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        agg.save(state)
+
+
+if __name__ == "__main__":
+    main()
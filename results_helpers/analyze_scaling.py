@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Fit Amdahl / Gustafson scaling models per instance type and task.
+
+Whenever results exist at several degrees of parallelism (stress-ng `--cpu N`,
+docker `--cpus`, BLAS threads via OMP_NUM_THREADS), this stage estimates:
+  - serial_fraction (Amdahl) and single-worker throughput from a linear fit
+    of p / X(p) = (1 - s) / X1 + s * p / X1
+  - gustafson_serial_fraction from the scaled speedup S(p) = p - s * (p - 1)
+  - parallel efficiency at the largest measured p and at the full vCPU count
+  - throughput extrapolated to all vCPUs of the instance
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from results_db import SIDE_DATASETS
+
+GROUP_COLS = ["cloud_provider", "arch", "instance_type", "task_kind"]
+PARALLELISM_COLS = ["cpus_limit", "stress_cpu_workers", "omp_num_threads"]
+
+
+def add_parallelism(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Effective parallelism of a run: the tightest of the docker CPU quota,
+    the stress-ng worker count and the BLAS thread count that are known.
+    """
+    cols = [c for c in PARALLELISM_COLS if c in df.columns]
+    if not cols:
+        df["parallelism"] = np.nan
+        return df
+    df["parallelism"] = df[cols].apply(pd.to_numeric, errors="coerce").min(axis=1)
+    return df
+
+
+def add_throughput(df: pd.DataFrame) -> pd.DataFrame:
+    """Throughput per run: bogo ops/s for stress-ng, 1 / wall_s otherwise."""
+    df["throughput"] = 1.0 / df["wall_s"]
+    if "stress_bogo_ops_per_s_real" in df.columns:
+        stress = df["task_group"] == "synthetic"
+        df.loc[stress, "throughput"] = df.loc[stress, "stress_bogo_ops_per_s_real"]
+    return df
+
+
+def amdahl_speedup(p, serial_fraction):
+    return p / (1.0 + serial_fraction * (p - 1.0))
+
+
+def fit_group(points: pd.DataFrame) -> dict | None:
+    """
+    Fit Amdahl and Gustafson models to (parallelism, mean throughput) points.
+    Returns None when fewer than two distinct parallelism levels exist.
+    """
+    p = points["parallelism"].to_numpy(dtype=float)
+    x = points["throughput"].to_numpy(dtype=float)
+    if len(p) < 2:
+        return None
+
+    # Amdahl: p / X(p) is linear in p
+    slope, intercept = np.polyfit(p, p / x, 1)
+    denom = slope + intercept
+    if denom <= 0:
+        return None
+    x1 = 1.0 / denom
+    serial = float(np.clip(slope / denom, 0.0, 1.0))
+
+    predicted = x1 * amdahl_speedup(p, serial)
+    ss_res = float(((x - predicted) ** 2).sum())
+    ss_tot = float(((x - x.mean()) ** 2).sum())
+    r2 = 1.0 - ss_res / ss_tot if ss_tot > 0 else 1.0
+
+    # Gustafson: S(p) - p = -s * (p - 1), least squares through the origin
+    scaled = x / x1
+    mask = p > 1
+    if mask.any():
+        gustafson = float(
+            ((p[mask] - scaled[mask]) * (p[mask] - 1)).sum()
+            / ((p[mask] - 1) ** 2).sum()
+        )
+        gustafson = float(np.clip(gustafson, 0.0, 1.0))
+    else:
+        gustafson = np.nan
+
+    p_max = p.max()
+    return {
+        "points": len(p),
+        "p_min": p.min(),
+        "p_max": p_max,
+        "throughput_1": x1,
+        "serial_fraction": serial,
+        "gustafson_serial_fraction": gustafson,
+        "efficiency_at_p_max": x[p == p_max].mean() / (p_max * x1),
+        "r2": r2,
+    }
+
+
+def load_vcpus(df: pd.DataFrame, prices_path: Path | None) -> pd.DataFrame:
+    """vCPUs per instance type: price CSV if available, otherwise host threads."""
+    if prices_path and prices_path.is_file():
+        prices = pd.read_csv(prices_path)
+        return prices[["instance_type", "vcpus"]].drop_duplicates("instance_type")
+    return (
+        df.groupby("instance_type", as_index=False)["threads"]
+        .max()
+        .rename(columns={"threads": "vcpus"})
+    )
+
+
+def build_scaling_model(df: pd.DataFrame, vcpus: pd.DataFrame) -> pd.DataFrame:
+    # The sweep's own runs and the reference runs are the curve's points; the
+    # other side campaigns (pinned, co-located) are not
+    other = [d for d in SIDE_DATASETS if d != "scaling"]
+    df = df[~df["dataset"].isin(other)]
+    # Multi-line records (several stressors, numpy kernels) count once per run
+    df = df.drop_duplicates(["file", "ts_start"]).copy()
+    df = add_throughput(add_parallelism(df))
+    df = df.dropna(subset=["parallelism", "throughput"])
+    df = df[(df["exit_code"] == 0) & (df["throughput"] > 0)]
+
+    points = df.groupby(GROUP_COLS + ["parallelism"], as_index=False).agg(
+        throughput=("throughput", "mean"),
+        runs=("throughput", "count"),
+    )
+
+    rows = []
+    for keys, grp in points.groupby(GROUP_COLS):
+        fit = fit_group(grp.sort_values("parallelism"))
+        if fit is None:
+            continue
+        rows.append({**dict(zip(GROUP_COLS, keys)), **fit})
+
+    columns = GROUP_COLS + [
+        "points",
+        "p_min",
+        "p_max",
+        "throughput_1",
+        "serial_fraction",
+        "gustafson_serial_fraction",
+        "efficiency_at_p_max",
+        "r2",
+        "vcpus",
+        "speedup_at_vcpus",
+        "efficiency_at_vcpus",
+        "throughput_at_vcpus",
+    ]
+    if not rows:
+        return pd.DataFrame(columns=columns)
+
+    model = pd.DataFrame(rows).merge(vcpus, on="instance_type", how="left")
+    model["speedup_at_vcpus"] = amdahl_speedup(model["vcpus"], model["serial_fraction"])
+    model["efficiency_at_vcpus"] = model["speedup_at_vcpus"] / model["vcpus"]
+    model["throughput_at_vcpus"] = model["throughput_1"] * model["speedup_at_vcpus"]
+    return model[columns].sort_values(["task_kind", "arch", "instance_type"])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fit Amdahl/Gustafson scaling models per instance type and task."
+    )
+    parser.add_argument(
+        "--input", default="normalized_results.csv", help="Input CSV file"
+    )
+    parser.add_argument("--output", default="scaling_model.csv", help="Output CSV file")
+    parser.add_argument(
+        "--prices",
+        default=None,
+        help="CSV with instance vCPUs (default: host threads from the results)",
+    )
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input)
+    vcpus = load_vcpus(df, Path(args.prices) if args.prices else None)
+    model = build_scaling_model(df, vcpus)
+
+    if model.empty:
+        print("No task has results at two or more parallelism levels; nothing to fit.")
+    else:
+        print(model.round(3).to_string(index=False))
+
+    model.to_csv(args.output, index=False)
+    print(f"Saved scaling model to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import pandas as pd
+
+from results_db import open_results
+
+parser = argparse.ArgumentParser(
+    description="Analyze cold-start / import latency (numpy_tasks.py startup)."
+)
+parser.add_argument("--input", default="normalized_results.csv", help="Input CSV file")
+parser.add_argument(
+    "--db", help="Read rows from this SQLite results store instead of --input"
+)
+parser.add_argument(
+    "--output", default="startup_aggregated.csv", help="Output CSV file"
+)
+args = parser.parse_args()
+
+GROUP_COLS = ["cloud_provider", "arch", "instance_type", "numpy_phase", "numpy_cache"]
+COLUMNS = GROUP_COLS + ["p50_ms", "p90_ms", "p99_ms", "mean_ms", "samples", "runs"]
+
+con = open_results(args.input, args.db)
+startup = pd.read_sql_query("SELECT * FROM results WHERE task_group = 'startup'", con)
+con.close()
+if startup.empty:
+    # Older campaigns and runs without the task: nothing to do, not an error
+    print("No startup runs found (bench numpy startup).")
+    pd.DataFrame(columns=COLUMNS).to_csv(args.output, index=False)
+    raise SystemExit(0)
+
+# Every sample of every run, so percentiles are over the pooled samples
+startup["sample_s"] = startup["numpy_values_s"].astype(str).str.split(";")
+samples = startup.explode("sample_s")
+samples["sample_s"] = pd.to_numeric(samples["sample_s"], errors="coerce")
+samples = samples.dropna(subset=["sample_s"])
+
+agg = samples.groupby(GROUP_COLS, as_index=False).agg(
+    p50_s=("sample_s", lambda s: s.quantile(0.50)),
+    p90_s=("sample_s", lambda s: s.quantile(0.90)),
+    p99_s=("sample_s", lambda s: s.quantile(0.99)),
+    mean_s=("sample_s", "mean"),
+    samples=("sample_s", "count"),
+    runs=("file", "nunique"),
+)
+
+ms_cols = ["p50_s", "p90_s", "p99_s", "mean_s"]
+agg[ms_cols] = (agg[ms_cols] * 1000).round(2)
+agg = agg.rename(columns={c: c[: -len("_s")] + "_ms" for c in ms_cols})
+agg = agg.sort_values(["numpy_phase", "numpy_cache", "p50_ms"])
+
+print(agg.to_string(index=False))
+
+agg.to_csv(args.output, index=False)
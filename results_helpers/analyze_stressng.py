@@ -1,26 +1,61 @@
 import argparse
 import pandas as pd
 
+from results_db import SIDE_DATASETS, open_results, reference_sql
+
 parser = argparse.ArgumentParser(description="Analyze synthetic benchmark results.")
 parser.add_argument("--input", default="normalized_results.csv", help="Input CSV file")
+parser.add_argument(
+    "--db", help="Read rows from this SQLite results store instead of --input"
+)
 parser.add_argument(
     "--output", default="stressng_aggregated.csv", help="Output CSV file"
 )
+parser.add_argument(
+    "--stressors-output",
+    default="stressng_stressors_aggregated.csv",
+    help="Output CSV with per-stressor / per-method results",
+)
+parser.add_argument(
+    "--winners-output",
+    default="stressng_arch_winners.csv",
+    help="Output CSV with the best instance per architecture for each stressor",
+)
+parser.add_argument(
+    "--frequency-output",
+    default="stressng_frequency.csv",
+    help="Output CSV with CPU clock, bogo ops/s per GHz and throttled runs",
+)
 args = parser.parse_args()
 
-df = pd.read_csv(args.input)
-
-synthetic = df[df["task_group"] == "synthetic"].copy()
+con = open_results(args.input, args.db)
+synthetic_all = pd.read_sql_query(
+    "SELECT * FROM results WHERE task_group = 'synthetic'", con
+)
+if "stress_stressor" not in synthetic_all.columns:
+    synthetic_all["stress_stressor"] = float("nan")
+if "stress_cpu_method" not in synthetic_all.columns:
+    synthetic_all["stress_cpu_method"] = float("nan")
 
-agg = synthetic.groupby(
-    ["cloud_provider", "arch", "instance_type"], as_index=False
-).agg(
-    mean_ops_real=("stress_bogo_ops_per_s_real", "mean"),
-    std_ops_real=("stress_bogo_ops_per_s_real", "std"),
-    mean_ops_usr_sys=("stress_bogo_ops_per_s_usr_sys", "mean"),
-    std_ops_usr_sys=("stress_bogo_ops_per_s_usr_sys", "std"),
-    runs=("stress_bogo_ops_per_s_real", "count"),
+# The reference workload; suite runs (TASK=stress-ng-suite) are aggregated below.
+# Side-campaign runs (scaling sweep, CPU modes, co-location) have their own
+# analyzers
+agg = pd.read_sql_query(
+    f"""
+    SELECT cloud_provider, arch, instance_type,
+           AVG(stress_bogo_ops_per_s_real) AS mean_ops_real,
+           stdev(stress_bogo_ops_per_s_real) AS std_ops_real,
+           AVG(stress_bogo_ops_per_s_usr_sys) AS mean_ops_usr_sys,
+           stdev(stress_bogo_ops_per_s_usr_sys) AS std_ops_usr_sys,
+           COUNT(stress_bogo_ops_per_s_real) AS runs
+    FROM results
+    WHERE task_group = 'synthetic' AND task_kind = 'stress-ng'
+      AND {reference_sql()}
+    GROUP BY cloud_provider, arch, instance_type
+    """,
+    con,
 )
+con.close()
 
 agg["scaling_coeff"] = agg["mean_ops_usr_sys"] / agg["mean_ops_real"]
 
@@ -36,3 +71,107 @@ agg[cols_to_round] = agg[cols_to_round].round(2)
 print(agg.to_string(index=False))
 
 agg.to_csv(args.output, index=False)
+
+# -----------------------------
+# Per-stressor results (one row per stressor line of every run)
+# -----------------------------
+stressor_cols = ["task_kind", "stress_stressor", "stress_cpu_method"]
+reference = ~synthetic_all["dataset"].isin(SIDE_DATASETS)
+per_stressor = synthetic_all[reference].fillna(
+    {"stress_stressor": "-", "stress_cpu_method": "-"}
+)
+stressors = per_stressor.groupby(
+    ["cloud_provider", "arch", "instance_type"] + stressor_cols, as_index=False
+).agg(
+    mean_ops_real=("stress_bogo_ops_per_s_real", "mean"),
+    std_ops_real=("stress_bogo_ops_per_s_real", "std"),
+    mean_ops_usr_sys=("stress_bogo_ops_per_s_usr_sys", "mean"),
+    runs=("stress_bogo_ops_per_s_real", "count"),
+)
+stressors = stressors.sort_values(stressor_cols + ["arch", "instance_type"])
+stressors[["mean_ops_real", "std_ops_real", "mean_ops_usr_sys"]] = stressors[
+    ["mean_ops_real", "std_ops_real", "mean_ops_usr_sys"]
+].round(2)
+stressors.to_csv(args.stressors_output, index=False)
+print(f"Saved {len(stressors)} per-stressor rows to {args.stressors_output}")
+
+# Best instance of each architecture per micro-workload, and who wins
+best = stressors.dropna(subset=["mean_ops_real"])
+best = best.loc[best.groupby(stressor_cols + ["arch"])["mean_ops_real"].idxmax()]
+winners = best.pivot_table(
+    index=stressor_cols, columns="arch", values="mean_ops_real"
+).reset_index()
+winners.columns.name = None
+if {"aarch64", "x86_64"} <= set(winners.columns):
+    winners["arm_to_x86_ratio"] = (winners["aarch64"] / winners["x86_64"]).round(3)
+    winners["winner"] = winners["arm_to_x86_ratio"].map(
+        lambda r: "aarch64" if r > 1 else ("x86_64" if r < 1 else "tie"),
+        na_action="ignore",
+    )
+
+print("\nBest bogo ops/s (real) per architecture and stressor:")
+print(winners.to_string(index=False))
+winners.to_csv(args.winners_output, index=False)
+
+# -----------------------------
+# CPU clock during the reference runs (harness.py samples, BENCH_SAMPLE_MS)
+# -----------------------------
+# A run is counted as throttled when its mean clock is below this share of
+# the best mean clock its instance reached in the campaign (turbo budget or
+# CPU credits used up, thermal limits)
+THROTTLE_FRACTION = 0.95
+
+# Only clocks of the CPUs stress-ng ran on (cpu_mhz_cpus set): older harness
+# versions averaged every CPU of the affinity mask, the whole host under a
+# --cpus quota, idle cores included
+if "cpu_mhz_cpus" in synthetic_all.columns:
+    freq = synthetic_all[
+        (synthetic_all["task_kind"] == "stress-ng") & reference
+    ].dropna(subset=["cpu_mhz_mean", "cpu_mhz_cpus"])
+else:
+    freq = synthetic_all.iloc[0:0]
+
+if freq.empty:
+    print("\n⚠️ No busy-CPU clock samples in the stress-ng runs (Graviton, old data)")
+else:
+    freq = freq.copy()
+    instance = freq["instance_id"].fillna(freq["instance_type"])
+    peak_mhz = freq.groupby(instance)["cpu_mhz_mean"].transform("max")
+    freq["throttled"] = freq["cpu_mhz_mean"] < THROTTLE_FRACTION * peak_mhz
+    freq["ops_per_ghz"] = freq["stress_bogo_ops_per_s_real"] / (
+        freq["cpu_mhz_mean"] / 1000
+    )
+    if "temp_c_max" not in freq.columns:
+        freq["temp_c_max"] = float("nan")
+
+    clock = freq.groupby(
+        ["cloud_provider", "arch", "instance_type"], as_index=False
+    ).agg(
+        mean_cpu_mhz=("cpu_mhz_mean", "mean"),
+        min_cpu_mhz=("cpu_mhz_min", "min"),
+        max_cpu_mhz=("cpu_mhz_max", "max"),
+        max_temp_c=("temp_c_max", "max"),
+        mean_ops_per_ghz=("ops_per_ghz", "mean"),
+        std_ops_per_ghz=("ops_per_ghz", "std"),
+        throttled_runs=("throttled", "sum"),
+        runs=("cpu_mhz_mean", "count"),
+    )
+    clock = clock.sort_values(["arch", "instance_type"]).round(
+        {
+            "mean_cpu_mhz": 0,
+            "min_cpu_mhz": 0,
+            "max_cpu_mhz": 0,
+            "max_temp_c": 1,
+            "mean_ops_per_ghz": 2,
+            "std_ops_per_ghz": 2,
+        }
+    )
+    print("\nCPU clock and bogo ops/s (real) per GHz:")
+    print(clock.to_string(index=False))
+    throttled = clock[clock["throttled_runs"] > 0]
+    for row in throttled.itertuples():
+        print(
+            f"⚠️ {row.instance_type}: {row.throttled_runs} of {row.runs} runs "
+            f"below {THROTTLE_FRACTION:.0%} of the instance's best clock"
+        )
+    clock.to_csv(args.frequency_output, index=False)
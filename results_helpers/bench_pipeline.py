@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Benchmark the post-processing pipeline itself on synthetic data.
+
+For every fleet size (instances of each type per run) this generates a
+results tree with gen_synthetic.py, then times parse → analyze → economy
+with the run_pipeline.py step instrumentation (wall, CPU, peak RSS, rows).
+The report gives records/s of the parser and the peak memory of every
+step; it is written to --output and appended, with the git revision, to
+--history so versions can be compared.
+
+Usage:
+    python bench_pipeline.py --sizes 1,10,100 --work-dir /tmp/bench-pipeline
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from gen_synthetic import DEFAULT_TYPES, generate
+from run_pipeline import PipelineRunner
+
+
+def git_revision(path: Path):
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=path,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(scale: int, work_dir: Path, args) -> dict:
+    scripts_dir = Path(__file__).resolve().parent
+    data_dir = work_dir / f"x{scale}"
+    results = data_dir / "results"
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+    t0 = time.perf_counter()
+    counts = generate(
+        data_dir,
+        [t.strip() for t in args.instance_types.split(",") if t.strip()],
+        runs=args.runs,
+        instances_per_run=scale,
+        repeats=args.repeats,
+        corrupt_rate=args.corrupt_rate,
+        seed=args.seed,
+    )
+    generate_s = time.perf_counter() - t0
+
+    normalized = str(results / "normalized_results.csv")
+    run_step = PipelineRunner(results, results / "profiles" if args.profile else None)
+    run_step(
+        "Parse results",
+        [
+            "python",
+            str(scripts_dir / "parse_results.py"),
+            "--input_dir",
+            str(data_dir / "runs"),
+            "--output",
+            normalized,
+        ],
+    )
+    run_step(
+        "Analyze stress-ng",
+        [
+            "python",
+            str(scripts_dir / "analyze_stressng.py"),
+            "--input",
+            normalized,
+            "--output",
+            str(results / "stressng_aggregated.csv"),
+            "--stressors-output",
+            str(results / "stressng_stressors_aggregated.csv"),
+            "--winners-output",
+            str(results / "stressng_arch_winners.csv"),
+            "--frequency-output",
+            str(results / "stressng_frequency.csv"),
+        ],
+    )
+    run_step(
+        "Analyze FFmpeg",
+        [
+            "python",
+            str(scripts_dir / "analyze_ffmpeg.py"),
+            "--input",
+            normalized,
+            "--output",
+            str(results / "ffmpeg_aggregated.csv"),
+            "--matrix-output",
+            str(results / "ffmpeg_matrix_aggregated.csv"),
+        ],
+    )
+    run_step(
+        "Analyze NumPy",
+        [
+            "python",
+            str(scripts_dir / "analyze_numpy.py"),
+            "--input",
+            normalized,
+            "--output",
+            str(results / "numpy_aggregated.csv"),
+            "--kernels-output",
+            str(results / "numpy_kernels_aggregated.csv"),
+        ],
+    )
+    run_step(
+        "Economy analysis",
+        [
+            "python",
+            str(scripts_dir / "analyze_economy.py"),
+            "--input-dir",
+            str(results),
+            "--output-dir",
+            str(results),
+            "--prices",
+            str(data_dir / "aws_instance_prices.csv"),
+        ],
+    )
+    summary = run_step.finish()
+
+    steps = summary["steps"]
+    parse_s = steps[0]["wall_s"]
+    result = {
+        "scale": scale,
+        "records": counts["records"],
+        "files": counts["files"],
+        "mbytes": round(counts["bytes"] / 1e6, 2),
+        "generate_s": round(generate_s, 3),
+        "total_wall_s": round(sum(s["wall_s"] for s in steps), 3),
+        "parse_records_per_s": round(counts["records"] / parse_s, 1),
+        "peak_rss_kb": max(s["peak_rss_kb"] for s in steps),
+        "steps": {
+            s["name"]: {
+                "wall_s": s["wall_s"],
+                "cpu_s": round(s["cpu_user_s"] + s["cpu_sys_s"], 3),
+                "peak_rss_kb": s["peak_rss_kb"],
+                "rows_in": s["rows_in"],
+                "rows_out": s["rows_out"],
+            }
+            for s in steps
+        },
+    }
+    if not args.keep:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark parse → analyze → economy on synthetic results."
+    )
+    parser.add_argument(
+        "--sizes",
+        default="1,10,100",
+        help="Fleet sizes: instances of each type per run (default: 1,10,100)",
+    )
+    parser.add_argument(
+        "--work-dir", default="bench_pipeline_work", help="Scratch directory"
+    )
+    parser.add_argument(
+        "--instance-types", default=DEFAULT_TYPES, help="Comma-separated types"
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Campaign runs per size")
+    parser.add_argument("--repeats", type=int, default=5, help="Repeats per instance")
+    parser.add_argument(
+        "--corrupt-rate", type=float, default=0.01, help="Truncated JSON lines"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--profile", action="store_true", help="Dump a cProfile per step"
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the generated data and outputs"
+    )
+    parser.add_argument(
+        "--output", default="bench_pipeline.json", help="Report of this run (JSON)"
+    )
+    parser.add_argument(
+        "--history",
+        default="bench_pipeline_history.jsonl",
+        help="Append the report here to compare versions",
+    )
+    args = parser.parse_args()
+
+    work_dir = Path(args.work_dir)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = {
+        "timestamp": int(time.time()),
+        "revision": git_revision(Path(__file__).resolve().parent),
+        "sizes": [run_size(scale, work_dir, args) for scale in sizes],
+    }
+
+    print("\n=== Pipeline benchmark ===")
+    print(
+        f"{'scale':>6} {'records':>9} {'MB':>7} {'parse rec/s':>12} "
+        f"{'total s':>8} {'peak MiB':>9}"
+    )
+    for r in report["sizes"]:
+        print(
+            f"{r['scale']:>6} {r['records']:>9} {r['mbytes']:>7.1f} "
+            f"{r['parse_records_per_s']:>12.0f} {r['total_wall_s']:>8.2f} "
+            f"{r['peak_rss_kb'] / 1024:>9.0f}"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    with open(args.history, "a") as f:
+        f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    print(f"\nSaved report to {args.output} (history: {args.history})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Fetch finished benchmark results from S3 (replaces `aws s3 sync`).
+
+run-and-upload.sh writes every instance to
+runs/<arch>/<instance_type>/<run_id>/<instance_id>/ and uploads DONE last.
+This walks that tree level by level (ListObjectsV2 with Delimiter), takes
+only instance prefixes that have a DONE object and downloads their files
+into --output_dir under the same keys, on a bounded thread pool.
+
+A local manifest (--manifest) keeps the ETag and size of every fetched
+object and the instance prefixes already fetched complete. A complete
+prefix does not change any more, so later runs neither list nor download it
+again, unless one of its files went missing locally.
+
+Works against any S3-compatible endpoint (MinIO, moto server) with
+--endpoint-url, e.g. for testing:
+    moto_server -p 5000 &
+    fetch_s3.py my-bucket --output_dir data --endpoint-url http://127.0.0.1:5000
+
+Usage:
+    fetch_s3.py my-bench-bucket --output_dir data [--workers 16]
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import boto3
+from botocore.config import Config
+
+ROOT_PREFIX = "runs/"
+# runs/ -> arch/ -> instance_type/ -> run_id/ -> instance_id/
+INSTANCE_DEPTH = 4
+DONE = "DONE"
+
+
+def list_prefixes(s3, bucket: str, prefix: str) -> list[str]:
+    """Direct "sub-directories" of prefix."""
+    found = []
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+        found += [p["Prefix"] for p in page.get("CommonPrefixes", [])]
+    return found
+
+
+def list_objects(s3, bucket: str, prefix: str) -> list[dict]:
+    objects = []
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        objects += page.get("Contents", [])
+    return objects
+
+
+def instance_prefixes(s3, bucket: str, pool: ThreadPoolExecutor) -> list[str]:
+    """All runs/<arch>/<type>/<run_id>/<iid>/ prefixes, one level at a time."""
+    level = [ROOT_PREFIX]
+    for _ in range(INSTANCE_DEPTH):
+        listed = pool.map(lambda p: list_prefixes(s3, bucket, p), level)
+        level = [p for sub in listed for p in sub]
+    return sorted(level)
+
+
+class Manifest:
+    def __init__(self, path: Path):
+        self.path = path
+        self.objects = {}  # key -> {"etag", "size"}
+        self.complete = set()  # instance prefixes fetched with their DONE
+        if path.is_file():
+            saved = json.loads(path.read_text())
+            self.objects = saved.get("objects", {})
+            self.complete = set(saved.get("complete", []))
+
+    def has(self, obj: dict) -> bool:
+        known = self.objects.get(obj["Key"])
+        return (
+            known is not None
+            and known["etag"] == obj["ETag"]
+            and known["size"] == obj["Size"]
+        )
+
+    def intact(self, prefix: str, dest: Path) -> bool:
+        """A complete prefix whose fetched files are all still on disk."""
+        if prefix not in self.complete:
+            return False
+        keys = [k for k in self.objects if k.startswith(prefix)]
+        return bool(keys) and all((dest / k).is_file() for k in keys)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(
+            json.dumps(
+                {"objects": self.objects, "complete": sorted(self.complete)},
+                indent=1,
+                sort_keys=True,
+            )
+        )
+        os.replace(tmp, self.path)
+
+
+def download(s3, bucket: str, obj: dict, dest: Path) -> int:
+    target = dest / obj["Key"]
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".part")
+    s3.download_file(bucket, obj["Key"], str(tmp))
+    os.replace(tmp, target)
+    return obj["Size"]
+
+
+def fetch(
+    bucket: str,
+    dest: Path,
+    manifest_path: Path,
+    workers: int = 16,
+    endpoint_url: str | None = None,
+) -> dict:
+    """Download new objects of complete instance prefixes; returns counts."""
+    s3 = boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        config=Config(max_pool_connections=workers),
+    )
+    manifest = Manifest(manifest_path)
+    counts = {
+        "prefixes": 0,
+        "complete": 0,
+        "incomplete": 0,
+        "skipped": 0,
+        "downloaded": 0,
+        "bytes": 0,
+    }
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        prefixes = instance_prefixes(s3, bucket, pool)
+        counts["prefixes"] = len(prefixes)
+
+        todo = [p for p in prefixes if not manifest.intact(p, dest)]
+        counts["skipped"] = len(prefixes) - len(todo)
+        listings = dict(
+            zip(todo, pool.map(lambda p: list_objects(s3, bucket, p), todo))
+        )
+
+        wanted = []
+        done_prefixes = []
+        # Object key -> its instance prefix; keys may sit in sub-directories
+        owner = {o["Key"]: p for p, objects in listings.items() for o in objects}
+        for prefix, objects in listings.items():
+            if not any(o["Key"] == prefix + DONE for o in objects):
+                # Instance still running or its upload was cut short
+                counts["incomplete"] += 1
+                continue
+            done_prefixes.append(prefix)
+            wanted += [
+                o
+                for o in objects
+                if not (manifest.has(o) and (dest / o["Key"]).is_file())
+            ]
+        counts["complete"] = len(done_prefixes)
+
+        futures = {pool.submit(download, s3, bucket, o, dest): o for o in wanted}
+        # Objects of each prefix not yet downloaded and recorded
+        pending = Counter(owner[o["Key"]] for o in wanted)
+        failed = set()
+        try:
+            for future, obj in futures.items():
+                try:
+                    counts["bytes"] += future.result()
+                except Exception as e:  # keep what the other downloads fetched
+                    print(f"⚠️ Failed to fetch {obj['Key']}: {e}")
+                    failed.add(owner[obj["Key"]])
+                    continue
+                manifest.objects[obj["Key"]] = {
+                    "etag": obj["ETag"],
+                    "size": obj["Size"],
+                }
+                pending[owner[obj["Key"]]] -= 1
+                counts["downloaded"] += 1
+        finally:
+            # Not failed, not cut short by an interrupt: every object is in
+            manifest.complete.update(p for p in done_prefixes if not pending[p])
+            manifest.save()
+
+    if failed:
+        raise SystemExit(f"{len(failed)} instance prefixes were not fetched fully")
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fetch completed benchmark runs (prefixes with DONE) from S3."
+    )
+    parser.add_argument("bucket", help="S3 bucket name without the s3:// prefix")
+    parser.add_argument("--output_dir", default="data", help="Local data directory")
+    parser.add_argument(
+        "--manifest",
+        default=None,
+        help="Manifest of fetched objects (default: <output_dir>/.fetch_manifest.json)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=16, help="Concurrent S3 requests"
+    )
+    parser.add_argument(
+        "--endpoint-url",
+        default=None,
+        help="S3-compatible endpoint (MinIO, moto server) instead of AWS",
+    )
+    args = parser.parse_args()
+
+    dest = Path(args.output_dir)
+    manifest = Path(args.manifest) if args.manifest else dest / ".fetch_manifest.json"
+    t0 = time.perf_counter()
+    counts = fetch(args.bucket, dest, manifest, args.workers, args.endpoint_url)
+    print(
+        f"{counts['prefixes']} instance prefixes: {counts['skipped']} already "
+        f"fetched, {counts['complete']} complete, {counts['incomplete']} without "
+        f"{DONE} (skipped); downloaded {counts['downloaded']} objects "
+        f"({counts['bytes'] / 1e6:.1f} MB) in {time.perf_counter() - t0:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic results tree shaped like the S3 upload of
+run-and-upload.sh, for testing and benchmarking the post-processing code:
+
+    <output-dir>/runs/<arch>/<instance_type>/<run_id>/<instance_id>/
+        calibration.jsonl stressng.jsonl ffmpeg.jsonl
+        numpy-matmul.jsonl numpy-elem.jsonl DONE
+    <output-dir>/aws_instance_prices.csv
+
+Records carry the same fields as bench.sh / harness.py output. stress-ng and
+ffmpeg stdout lines precede their metrics records and --corrupt-rate of the
+JSON lines are truncated, as after an interrupted upload. The first run of
+each task is slower (cold caches) and t-series types throttle to their
+baseline after a burst, for analyze_drift.py to find.
+
+Usage:
+    python gen_synthetic.py --output-dir /tmp/synth --instances-per-run 10
+"""
+
+import argparse
+import json
+import random
+import re
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_TYPES = "c7g.large,c7g.xlarge,m7g.large,c7i.large,c7i.xlarge,m7i.large"
+SIZE_VCPUS = {"medium": 1, "large": 2, "xlarge": 4}
+# USD per vCPU-hour by family letter, roughly on-demand us-east-1;
+# Graviton types are priced about 15% lower
+FAMILY_RATE = {"c": 0.036, "m": 0.042, "r": 0.055, "t": 0.021}
+ARM_DISCOUNT = 0.85
+# Cold first run of a task (page cache, imports); t-series instances drop
+# to their baseline share once the launch CPU credits are spent
+COLD_SLOWDOWN = 1.3
+T_BURST_MS = 300_000
+T_BASELINE = 0.4
+
+FFMPEG_CMD = (
+    "ffmpeg -f lavfi -i testsrc=duration=10:size=1920x1080:rate=30 "
+    "-c:v libx264 -preset medium -crf 28 -an -f null -"
+)
+STRESS_CMD = "stress-ng --cpu 2 --cpu-method all --metrics-brief --timeout 20s"
+
+
+def arch_of(instance_type: str) -> str:
+    """Graviton families carry a `g` after the generation digit (c7g, m6gd)."""
+    family = instance_type.split(".")[0]
+    return "aarch64" if re.search(r"\d[a-z]*g", family) else "x86_64"
+
+
+def vcpus_of(instance_type: str) -> int:
+    size = instance_type.split(".")[1]
+    if size in SIZE_VCPUS:
+        return SIZE_VCPUS[size]
+    m = re.match(r"(\d+)xlarge", size)
+    return 4 * int(m.group(1)) if m else 2
+
+
+class InstanceWriter:
+    """Writes the files of one instance with a per-instance speed factor."""
+
+    def __init__(self, rng, itype, run_id, iid, ts, corrupt_rate):
+        self.rng = rng
+        self.itype = itype
+        self.arch = arch_of(itype)
+        self.run_id = run_id
+        self.iid = iid
+        self.ts = ts
+        self.ts0 = ts
+        self.runs_of = {}
+        self.corrupt_rate = corrupt_rate
+        # Newer / Graviton parts a bit faster, plus instance-to-instance spread
+        base = 1.1 if self.arch == "aarch64" else 1.0
+        self.speed = base * rng.lognormvariate(0, 0.05)
+        # harness.py clock samples: x86 turbo clock; Graviton has no cpufreq
+        self.mhz = 3300 * self.speed if self.arch == "x86_64" else None
+        self.records = 0
+
+    def json_line(self, obj) -> str:
+        line = json.dumps(obj, separators=(",", ":"))
+        if self.rng.random() < self.corrupt_rate:
+            line = line[: self.rng.randrange(1, len(line))]
+        return line + "\n"
+
+    def clock(self) -> dict:
+        if self.mhz is None:
+            return dict.fromkeys(
+                ["cpu_mhz_min", "cpu_mhz_mean", "cpu_mhz_max", "cpu_mhz_cpus"]
+            )
+        mean = self.noisy(self.mhz, 0.01)
+        return {
+            "cpu_mhz_min": round(mean * 0.97, 3),
+            "cpu_mhz_mean": round(mean, 3),
+            "cpu_mhz_max": round(mean * 1.02, 3),
+            "cpu_mhz_cpus": vcpus_of(self.itype),
+        }
+
+    def record(self, task, cmd, wall_s, user_s=None) -> str:
+        start = self.ts
+        self.ts += int(wall_s * 1000) + self.rng.randrange(50, 500)
+        self.records += 1
+        return self.json_line(
+            {
+                "ts_start": str(start),
+                "ts_end": str(start + int(wall_s * 1000)),
+                "cmd": cmd,
+                "exit_code": 0,
+                "metrics": {
+                    "wall_s": round(wall_s, 6),
+                    "user_s": round(user_s if user_s is not None else wall_s, 6),
+                    "sys_s": round(wall_s * 0.02, 6),
+                    "max_rss_kb": self.rng.randrange(20_000, 400_000),
+                    "harness_overhead_s": round(self.rng.uniform(4e-4, 9e-4), 6),
+                    "harness_rss_floor_kb": 11_500,
+                    **self.clock(),
+                },
+                "host": {
+                    "arch": self.arch,
+                    "cpu_model": "Neoverse-V1" if self.arch == "aarch64" else "Xeon",
+                    "threads": vcpus_of(self.itype),
+                    "mem_kb": 4_000_000 * vcpus_of(self.itype),
+                    "instance_id": self.iid,
+                    "instance_type": self.itype,
+                    "cloud_provider": "AWS",
+                    "cloud_region": "eu-central-1",
+                },
+                "meta": {
+                    "run_id": self.run_id,
+                    "task": task,
+                    "dataset": "default",
+                    "extra": "",
+                    "cpus": "2",
+                    "omp_num_threads": "",
+                    "harness": "python",
+                },
+            }
+        )
+
+    def slowdown(self, task, cold=True) -> float:
+        self.runs_of[task] = self.runs_of.get(task, 0) + 1
+        factor = COLD_SLOWDOWN if cold and self.runs_of[task] == 1 else 1.0
+        if self.itype.startswith("t") and self.ts - self.ts0 > T_BURST_MS:
+            factor /= T_BASELINE
+        return factor
+
+    def noisy(self, value, sigma=0.03):
+        return value * self.rng.lognormvariate(0, sigma)
+
+    def calibration(self) -> str:
+        out = []
+        for _ in range(10):
+            for task, cmd, wall in (
+                ("calibrate-noop", "true", 0.0008),
+                ("calibrate-bash", "bash -c true", 0.002),
+                ("calibrate-python", "python3 -c pass", 0.018),
+                ("calibrate-numpy", "python3 -c 'import numpy'", 0.12),
+            ):
+                out.append(self.record(task, cmd, self.noisy(wall, 0.1)))
+        return "".join(out)
+
+    def stress(self) -> str:
+        ops_s = self.noisy(1000 * self.speed) / self.slowdown("stress", cold=False)
+        pid = self.rng.randrange(100, 30000)
+        prefix = f"stress-ng: info:  [{pid}]"
+        return "".join(
+            [
+                f"{prefix} setting to a 20 secs run per stressor\n",
+                f"{prefix} dispatching hogs: 2 cpu\n",
+                f"stress-ng: metrc: [{pid}] stressor       bogo ops real time  "
+                "usr time  sys time   bogo ops/s     bogo ops/s\n",
+                f"stress-ng: metrc: [{pid}] cpu {int(ops_s * 20)} 20.00 "
+                f"{39.9:.2f} 0.02 {ops_s:.2f} {ops_s / 2:.2f}\n",
+                f"{prefix} successful run completed in 20.01 secs\n",
+                self.record("stress-ng", STRESS_CMD, self.noisy(20.01, 0.001), 39.9),
+            ]
+        )
+
+    def ffmpeg(self) -> str:
+        wall = self.noisy(12.0 / self.speed) * self.slowdown("ffmpeg")
+        fps = 300 / wall
+        lines = ["ffmpeg version 6.1.1-3ubuntu5 Copyright (c) 2000-2023\n"]
+        for frame in range(60, 301, 60):
+            lines.append(
+                f"frame={frame:5d} fps={fps:4.0f} q=35.0 size=N/A "
+                f"time=00:00:{frame // 30:02d}.00 bitrate=N/A "
+                f"speed={fps / 30:.2f}x\n"
+            )
+        lines.append(f"bench: utime={wall * 1.9:.3f}s stime=0.150s rtime={wall:.3f}s\n")
+        lines.append(f"bench: maxrss={self.rng.randrange(150_000, 250_000)}KiB\n")
+        lines.append(self.record("ffmpeg", FFMPEG_CMD, wall, wall * 1.9))
+        return "".join(lines)
+
+    def numpy(self, sub) -> str:
+        if sub == "matmul":
+            seconds = self.noisy(0.25 / self.speed) * self.slowdown(sub)
+            extra = {"task": "numpy.matmul", "n": 2000, "seconds": seconds}
+            cmd = "python3 /opt/bench/numpy_tasks.py matmul 2000"
+        else:
+            seconds = self.noisy(1.1 / self.speed) * self.slowdown(sub)
+            extra = {
+                "task": "numpy.elemwise",
+                "n": 1000000,
+                "iter": 50,
+                "seconds": seconds,
+            }
+            cmd = "python3 /opt/bench/numpy_tasks.py elem 1000000 50"
+        return self.json_line(extra) + self.record(f"numpy-{sub}", cmd, seconds + 0.2)
+
+
+def generate(
+    output_dir: Path,
+    instance_types: list[str],
+    runs: int = 3,
+    instances_per_run: int = 1,
+    repeats: int = 5,
+    corrupt_rate: float = 0.01,
+    seed: int = 0,
+) -> dict:
+    """Write the tree and the prices CSV; returns counts of what was written."""
+    rng = random.Random(seed)
+    root = output_dir / "runs"
+    files = records = size = 0
+    ts = 1_760_000_000_000
+    for r in range(runs):
+        run_id = f"synthetic-{r:03d}"
+        for itype in instance_types:
+            for i in range(instances_per_run):
+                iid = f"i-{rng.getrandbits(64):016x}"
+                writer = InstanceWriter(rng, itype, run_id, iid, ts, corrupt_rate)
+                content = {"calibration.jsonl": writer.calibration()}
+                parts = {
+                    name: []
+                    for name in (
+                        "stressng.jsonl",
+                        "numpy-matmul.jsonl",
+                        "numpy-elem.jsonl",
+                        "ffmpeg.jsonl",
+                    )
+                }
+                for _ in range(repeats):
+                    parts["stressng.jsonl"].append(writer.stress())
+                    parts["numpy-matmul.jsonl"].append(writer.numpy("matmul"))
+                    parts["numpy-elem.jsonl"].append(writer.numpy("elem"))
+                    parts["ffmpeg.jsonl"].append(writer.ffmpeg())
+                content.update({name: "".join(p) for name, p in parts.items()})
+
+                inst_dir = root / writer.arch / itype / run_id / iid
+                inst_dir.mkdir(parents=True, exist_ok=True)
+                for name, text in content.items():
+                    (inst_dir / name).write_text(text)
+                    size += len(text)
+                (inst_dir / "DONE").touch()
+                files += len(content)
+                records += writer.records
+        ts += 86_400_000
+
+    prices = pd.DataFrame(
+        {
+            "cloud_provider": "AWS",
+            "region": "eu-central-1",
+            "instance_type": instance_types,
+            "price_per_hour_usd": [
+                round(
+                    vcpus_of(t)
+                    * FAMILY_RATE.get(t[0], 0.04)
+                    * (ARM_DISCOUNT if arch_of(t) == "aarch64" else 1.0),
+                    4,
+                )
+                for t in instance_types
+            ],
+            "vcpus": [vcpus_of(t) for t in instance_types],
+            "currency": "USD",
+        }
+    )
+    output_dir.mkdir(parents=True, exist_ok=True)
+    prices.to_csv(output_dir / "aws_instance_prices.csv", index=False)
+    return {"files": files, "records": records, "bytes": size}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic benchmark results tree (JSONL + prices)."
+    )
+    parser.add_argument("--output-dir", required=True, help="Where to write the tree")
+    parser.add_argument(
+        "--instance-types",
+        default=DEFAULT_TYPES,
+        help=f"Comma-separated instance types (default: {DEFAULT_TYPES})",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Campaign runs (run_id)")
+    parser.add_argument(
+        "--instances-per-run",
+        type=int,
+        default=1,
+        help="Instances of each type per run (fleet size multiplier)",
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Repeats per instance")
+    parser.add_argument(
+        "--corrupt-rate",
+        type=float,
+        default=0.01,
+        help="Fraction of JSON lines written truncated",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    counts = generate(
+        Path(args.output_dir),
+        [t.strip() for t in args.instance_types.split(",") if t.strip()],
+        runs=args.runs,
+        instances_per_run=args.instances_per_run,
+        repeats=args.repeats,
+        corrupt_rate=args.corrupt_rate,
+        seed=args.seed,
+    )
+    print(
+        f"Wrote {counts['records']} records in {counts['files']} files "
+        f"({counts['bytes'] / 1e6:.1f} MB) to {args.output_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
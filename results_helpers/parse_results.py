@@ -2,64 +2,276 @@
 import argparse
 import json
 import re
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 import pandas as pd
 
-
-def read_file(path: Path):
+try:
+    # Optional: several times faster decoding of the JSON lines
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+
+@dataclass(slots=True)
+class Measurement:
+    """One bench.sh / harness.py metrics record, flattened."""
+
+    ts_start: str | None
+    ts_end: str | None
+    cmd: str
+    exit_code: object
+    wall_s: float | None
+    user_s: float | None
+    sys_s: float | None
+    max_rss_kb: int | None
+    harness_overhead_s: float | None
+    harness_rss_floor_kb: int | None
+    cpu_mhz_min: float | None
+    cpu_mhz_mean: float | None
+    cpu_mhz_max: float | None
+    cpu_mhz_cpus: int | None
+    temp_c_min: float | None
+    temp_c_mean: float | None
+    temp_c_max: float | None
+    arch: str | None
+    cpu_model: str | None
+    threads: int | None
+    mem_kb: int | None
+    instance_id: str | None
+    instance_type: str | None
+    cloud_provider: str | None
+    run_id: str
+    task: str
+    dataset: str
+    cpus: str | None
+    omp_num_threads: str | None
+    cpu_mode: str | None
+    cpuset: str | None
+    colo_group: str | None
+    colo_role: str | None
+    colo_peers: str | None
+    harness: str | None
+
+    @classmethod
+    def from_record(cls, rec: dict) -> "Measurement":
+        meta = rec.get("meta") or {}
+        host = rec.get("host") or {}
+        metrics = rec.get("metrics") or {}
+        return cls(
+            rec.get("ts_start"),
+            rec.get("ts_end"),
+            rec.get("cmd", ""),
+            rec.get("exit_code"),
+            metrics.get("wall_s"),
+            metrics.get("user_s"),
+            metrics.get("sys_s"),
+            metrics.get("max_rss_kb"),
+            metrics.get("harness_overhead_s"),
+            metrics.get("harness_rss_floor_kb"),
+            metrics.get("cpu_mhz_min"),
+            metrics.get("cpu_mhz_mean"),
+            metrics.get("cpu_mhz_max"),
+            metrics.get("cpu_mhz_cpus"),
+            metrics.get("temp_c_min"),
+            metrics.get("temp_c_mean"),
+            metrics.get("temp_c_max"),
+            host.get("arch"),
+            host.get("cpu_model"),
+            host.get("threads"),
+            host.get("mem_kb"),
+            host.get("instance_id") or meta.get("instance_id"),
+            host.get("instance_type") or meta.get("instance_type"),
+            host.get("cloud_provider") or meta.get("cloud_provider"),
+            meta.get("run_id", ""),
+            meta.get("task") or "",
+            meta.get("dataset", ""),
+            meta.get("cpus"),
+            meta.get("omp_num_threads"),
+            meta.get("cpu_mode"),
+            meta.get("cpuset"),
+            meta.get("colo_group"),
+            meta.get("colo_role"),
+            meta.get("colo_peers"),
+            meta.get("harness"),
+        )
+
+
+def split_segments(data: bytes, final: bool = True):
     """
-    Read .jsonl and split lines into:
-    - json_recs: those that were successfully parsed as JSON
-    - text_lines: everything else (for stress-ng metrics)
+    Split .jsonl content into one segment per metrics record.
+
+    bench.sh prints the command output first and the metrics JSON last, so a
+    segment is (measurement, extra_recs, text_lines) where extra_recs are the
+    JSON lines without "metrics" (e.g. numpy task output) and text_lines are
+    the non-JSON lines (stress-ng / ffmpeg output) seen since the previous
+    metrics record. Trailing output without a metrics record is dropped.
+
+    Only lines starting with "{" are handed to the JSON decoder; tool output
+    and blank lines are sorted out by that check, not by a decode error. A
+    "{" line that does not decode to an object is a lost record: the output
+    collected so far is dropped with it, so every measurement is paired only
+    with the lines written after the previous record.
+
+    Returns (segments, consumed): consumed is the number of bytes up to the
+    end of the last metrics record, where reading of a growing file resumes.
+    With final=False a last line without a newline is taken as still being
+    written and left for the next read.
     """
-    json_recs = []
+    segments = []
+    extra_recs = []
     text_lines = []
-    for line in path.read_text().splitlines():
-        line_strip = line.strip()
-        if not line_strip:
+    pos = consumed = 0
+    for raw in data.splitlines(keepends=True):
+        pos += len(raw)
+        if not final and pos == len(data) and not raw.endswith((b"\n", b"\r")):
+            break
+        line = raw.strip()
+        if not line:
+            continue
+        if line[:1] == b"{":
+            try:
+                rec = json_loads(line)
+            except ValueError:
+                rec = None
+            if isinstance(rec, dict):
+                if "metrics" in rec:
+                    segments.append(
+                        (Measurement.from_record(rec), extra_recs, text_lines)
+                    )
+                    extra_recs = []
+                    text_lines = []
+                    consumed = pos
+                else:
+                    extra_recs.append(rec)
+                continue
+            # A record cut short (killed run, partial upload): the output
+            # before it belongs to a measurement that is lost, not the next
+            extra_recs = []
+            text_lines = []
             continue
-        try:
-            json_recs.append(json.loads(line_strip))
-        except json.JSONDecodeError:
-            text_lines.append(line.rstrip("\n"))
-    return json_recs, text_lines
+        text_lines.append(raw.decode("utf-8", "replace").rstrip())
+    return segments, consumed
 
 
-def classify_records(json_recs):
-    """
-    In most cases we expect:
-    - ffmpeg: 1 JSON with metrics
-    - numpy: 1 JSON config + 1 JSON with metrics
-    - stress-ng: 1 JSON with metrics
-    """
-    metrics = [r for r in json_recs if "metrics" in r]
-    extra = [r for r in json_recs if "metrics" not in r]
-    return metrics, extra
+def read_segments(path: Path):
+    """Segments of a whole .jsonl file (see split_segments)."""
+    with path.open("rb") as f:
+        data = f.read()
+    return split_segments(data)[0]
+
+
+def to_float(value):
+    """Convert optional meta strings (e.g. "2", "1.5", "") to float or None."""
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
 
+@lru_cache(maxsize=1024)
 def get_task_group(task_kind: str) -> str:
     if not task_kind:
         return ""
+    if task_kind == "numpy-startup":
+        return "startup"
+    if task_kind == "numpy-latency":
+        return "latency"
     if task_kind.startswith("numpy"):
         return "numpy"
-    if task_kind == "ffmpeg":
+    if task_kind.startswith("ffmpeg"):
         return "ffmpeg"
-    if task_kind == "stress-ng":
+    if task_kind.startswith("stress-ng"):
         return "synthetic"
+    if task_kind.startswith("calibrate"):
+        return "calibration"
+    if task_kind.startswith("io"):
+        return "io"
     return "other"
 
 
 def parse_numpy_extra(extra: dict) -> dict:
     # {"task": "numpy.elemwise", "n": 1000000, "iter": 50, "seconds": ...}
-    return {
+    out = {
         "numpy_task": extra.get("task"),
         "numpy_n": extra.get("n"),
         "numpy_iter": extra.get("iter"),
         "numpy_seconds_reported": extra.get("seconds"),
     }
+    # {"task": "numpy.startup", "phase": "import_numpy", "cache": "cold", ...}
+    if extra.get("task") == "numpy.startup":
+        out.update(
+            {
+                "numpy_phase": extra.get("phase"),
+                "numpy_cache": extra.get("cache"),
+                "numpy_evict": extra.get("evict"),
+                "numpy_samples": extra.get("samples"),
+                "numpy_p50_s": extra.get("p50_s"),
+                "numpy_p90_s": extra.get("p90_s"),
+                "numpy_p99_s": extra.get("p99_s"),
+                "numpy_seconds_reported": extra.get("mean_s"),
+                "numpy_values_s": ";".join(
+                    f"{v:.9g}" for v in extra.get("values_s") or []
+                ),
+            }
+        )
+    # {"task": "numpy.fft", "case": "fft2d-1021x1021", "metric": "gflops", "value": ...}
+    if "case" in extra:
+        out.update(
+            {
+                "numpy_case": extra.get("case"),
+                "numpy_repeat": extra.get("repeat"),
+                "numpy_best_s": extra.get("best_s"),
+                "numpy_metric": extra.get("metric"),
+                "numpy_throughput": extra.get("value"),
+            }
+        )
+    # {"task": "numpy.latency", "bytes": 16384, "pages": "huge", "ns_per_access": ...}
+    if extra.get("task") == "numpy.latency":
+        out.update(
+            {
+                "numpy_bytes": extra.get("bytes"),
+                "numpy_pages": extra.get("pages"),
+                "numpy_thp": extra.get("thp"),
+                "numpy_anon_huge_kib": extra.get("anon_huge_kib"),
+                "numpy_accesses": extra.get("accesses"),
+                "numpy_ns_per_access": extra.get("ns_per_access"),
+            }
+        )
+    return out
 
 
+def parse_io_extra(extra: dict) -> dict:
+    # {"task": "io", "op": "read", "pattern": "rand", "method": "direct",
+    #  "block_kb": 4, "qd": 8, "mb_per_s": ..., "iops": ..., "lat_p99_us": ...}
+    return {
+        "io_op": extra.get("op"),
+        "io_pattern": extra.get("pattern"),
+        "io_method": extra.get("method"),
+        "io_block_kb": extra.get("block_kb"),
+        "io_qd": extra.get("qd"),
+        "io_size_mb": extra.get("size_mb"),
+        "io_cache": extra.get("cache"),
+        "io_cached_before_pct": extra.get("cached_before_pct"),
+        "io_cached_after_pct": extra.get("cached_after_pct"),
+        "io_bytes": extra.get("bytes"),
+        "io_ops": extra.get("ops"),
+        "io_seconds": extra.get("seconds"),
+        "io_mb_per_s": extra.get("mb_per_s"),
+        "io_iops": extra.get("iops"),
+        "io_lat_p50_us": extra.get("lat_p50_us"),
+        "io_lat_p95_us": extra.get("lat_p95_us"),
+        "io_lat_p99_us": extra.get("lat_p99_us"),
+        "io_lat_max_us": extra.get("lat_max_us"),
+        "io_error": extra.get("error"),
+    }
+
+
+@lru_cache(maxsize=1024)
 def parse_ffmpeg_cmd(cmd: str) -> dict:
     out = {}
     m = re.search(r"testsrc=duration=(\d+)", cmd)
@@ -71,6 +283,21 @@ def parse_ffmpeg_cmd(cmd: str) -> dict:
         out["ffmpeg_width"] = int(m.group(1))
         out["ffmpeg_height"] = int(m.group(2))
 
+    m = re.search(r"rate=(\d+)", cmd)
+    if m:
+        out["ffmpeg_rate"] = int(m.group(1))
+
+    # Pre-rendered source (bench FFMPEG_SOURCE=cache): testsrc-WxH-RATE-DUR.y4m
+    m = re.search(r"-i\s+\S*testsrc-(\d+)x(\d+)-(\d+)-(\d+)\.y4m", cmd)
+    if m:
+        out["ffmpeg_source"] = "cache"
+        out["ffmpeg_width"] = int(m.group(1))
+        out["ffmpeg_height"] = int(m.group(2))
+        out["ffmpeg_rate"] = int(m.group(3))
+        out["ffmpeg_duration_s"] = int(m.group(4))
+    elif "-f lavfi" in cmd:
+        out["ffmpeg_source"] = "lavfi"
+
     m = re.search(r"-c:v\s+(\S+)", cmd)
     if m:
         out["ffmpeg_codec"] = m.group(1)
@@ -83,9 +310,62 @@ def parse_ffmpeg_cmd(cmd: str) -> dict:
     if m:
         out["ffmpeg_crf"] = int(m.group(1))
 
+    # VP9 / AV1 speed level stands in for the x264/x265 preset name
+    m = re.search(r"-cpu-used\s+(\d+)", cmd)
+    if m:
+        out["ffmpeg_cpu_used"] = int(m.group(1))
+        out.setdefault("ffmpeg_preset", f"cpu-used-{m.group(1)}")
+
+    m = re.search(r"-threads\s+(\d+)", cmd)
+    if m:
+        out["ffmpeg_threads"] = int(m.group(1))
+
     return out
 
 
+FFMPEG_PROGRESS_RE = re.compile(
+    r"frame=\s*(\d+)\s+fps=\s*([\d.]+).*?speed=\s*([\d.]+)x"
+)
+FFMPEG_BENCH_TIME_RE = re.compile(
+    r"bench:\s+utime=([\d.]+)s\s+stime=([\d.]+)s\s+rtime=([\d.]+)s"
+)
+FFMPEG_BENCH_RSS_RE = re.compile(r"bench:\s+maxrss=(\d+)\s*(?:KiB|kB)")
+
+
+def parse_ffmpeg_text(lines) -> dict:
+    """
+    Parse what ffmpeg itself reports (run with -benchmark, stderr merged):
+    frame=  300 fps= 95 q=-1.0 Lsize=N/A time=00:00:09.96 bitrate=N/A speed=3.17x
+    bench: utime=12.345s stime=0.123s rtime=3.160s
+    bench: maxrss=123456KiB
+
+    The last progress line is the final report of the encode.
+    """
+    out = {}
+    for line in lines:
+        m = FFMPEG_PROGRESS_RE.search(line)
+        if m:
+            out["ffmpeg_frames"] = int(m.group(1))
+            out["ffmpeg_fps"] = float(m.group(2))
+            out["ffmpeg_speed_x"] = float(m.group(3))
+            continue
+        m = FFMPEG_BENCH_TIME_RE.search(line)
+        if m:
+            out["ffmpeg_utime_s"] = float(m.group(1))
+            out["ffmpeg_stime_s"] = float(m.group(2))
+            out["ffmpeg_rtime_s"] = float(m.group(3))
+            continue
+        m = FFMPEG_BENCH_RSS_RE.search(line)
+        if m:
+            out["ffmpeg_maxrss_kb"] = int(m.group(1))
+
+    # ffmpeg rounds the reported fps; frames / rtime is the precise rate
+    if out.get("ffmpeg_frames") and out.get("ffmpeg_rtime_s"):
+        out["ffmpeg_fps_bench"] = out["ffmpeg_frames"] / out["ffmpeg_rtime_s"]
+    return out
+
+
+@lru_cache(maxsize=1024)
 def parse_stress_cmd(cmd: str) -> dict:
     out = {}
     m = re.search(r"--cpu\s+(\d+)", cmd)
@@ -107,12 +387,56 @@ def parse_stress_cmd(cmd: str) -> dict:
     return out
 
 
+STRESS_METRIC_RE = re.compile(
+    r"stress-ng:\s+(?:metrc|info):\s+\[\d+\]\s+(\S+)\s+(\d+)\s+([\d.]+)\s+"
+    r"([\d.]+)\s+([\d.]+)\s+([\d.]+)\s+([\d.]+)"
+)
+
+STRESS_YAML_KEYS = {
+    "bogo-ops": ("stress_bogo_ops", int),
+    "wall-clock-time": ("stress_real_time_s", float),
+    "user-time": ("stress_usr_time_s", float),
+    "system-time": ("stress_sys_time_s", float),
+    "bogo-ops-per-second-real-time": ("stress_bogo_ops_per_s_real", float),
+    "bogo-ops-per-second-usr-sys-time": ("stress_bogo_ops_per_s_usr_sys", float),
+}
+
+
+def parse_stress_yaml(lines):
+    """
+    Fallback for the `metrics:` section of a stress-ng --yaml report:
+    metrics:
+        - stressor: cpu
+          bogo-ops: 1000
+          bogo-ops-per-second-real-time: 384.10
+    """
+    rows = []
+    in_metrics = False
+    for line in lines:
+        if not line.startswith(" "):
+            in_metrics = line.strip() == "metrics:"
+            continue
+        if not in_metrics:
+            continue
+        key, _, value = line.strip().lstrip("- ").partition(":")
+        value = value.strip()
+        if key == "stressor":
+            rows.append({"stress_stressor": value})
+        elif rows and key in STRESS_YAML_KEYS:
+            col, conv = STRESS_YAML_KEYS[key]
+            try:
+                rows[-1][col] = conv(float(value)) if conv is int else conv(value)
+            except ValueError:
+                pass
+    return rows
+
+
 def parse_stress_text(lines):
     """
-    Parse stress-ng output text lines to extract metrics:
+    Parse stress-ng output text lines to extract metrics, one dict per stressor:
     stress-ng: metrc: [17] cpu 1000 2.60 5.20 0.00 384.10 192.22
 
-    Повертає:
+    Повертає список словників з:
     - stress_stressor
     - stress_bogo_ops
     - stress_real_time_s
@@ -120,72 +444,257 @@ def parse_stress_text(lines):
     - stress_sys_time_s
     - stress_bogo_ops_per_s_real
     - stress_bogo_ops_per_s_usr_sys
+
+    If no metrics lines are found, the --yaml report (if present) is used.
     """
-    pattern = re.compile(
-        r"stress-ng:\s+metrc:\s+\[\d+\]\s+(\S+)\s+(\d+)\s+([\d.]+)\s+"
-        r"([\d.]+)\s+([\d.]+)\s+([\d.]+)\s+([\d.]+)"
-    )
+    rows = []
     for line in lines:
-        m = pattern.search(line)
+        m = STRESS_METRIC_RE.search(line)
         if m:
             stressor, bogo_ops, real, usr, sys, bogo_real, bogo_usrsys = m.groups()
-            return {
-                "stress_stressor": stressor,
-                "stress_bogo_ops": int(bogo_ops),
-                "stress_real_time_s": float(real),
-                "stress_usr_time_s": float(usr),
-                "stress_sys_time_s": float(sys),
-                "stress_bogo_ops_per_s_real": float(bogo_real),
-                "stress_bogo_ops_per_s_usr_sys": float(bogo_usrsys),
-            }
-    return {}
-
-
-def build_row(path: Path, metrics_rec: dict, extra_rec: dict | None, text_lines):
-    meta = metrics_rec.get("meta", {})
-    host = metrics_rec.get("host", {})
-    metrics = metrics_rec.get("metrics", {})
-
+            rows.append(
+                {
+                    "stress_stressor": stressor,
+                    "stress_bogo_ops": int(bogo_ops),
+                    "stress_real_time_s": float(real),
+                    "stress_usr_time_s": float(usr),
+                    "stress_sys_time_s": float(sys),
+                    "stress_bogo_ops_per_s_real": float(bogo_real),
+                    "stress_bogo_ops_per_s_usr_sys": float(bogo_usrsys),
+                }
+            )
+    return rows or parse_stress_yaml(lines)
+
+
+def stress_rows(row: dict, cmd: str, text_lines) -> list[dict]:
+    """One row per stressor reported by a stress-ng run."""
+    row.update(parse_stress_cmd(cmd))
+    stressors = parse_stress_text(text_lines)
+    if not stressors:
+        return [row]
+
+    rows = []
+    for stressor in stressors:
+        r = {**row, **stressor}
+        name = stressor["stress_stressor"]
+        m = re.search(rf"--{re.escape(name)}\s+(\d+)", cmd)
+        r["stress_workers"] = int(m.group(1)) if m else None
+        # --cpu-method only describes the cpu stressor
+        if name != "cpu":
+            r["stress_cpu_method"] = None
+        rows.append(r)
+    return rows
+
+
+BASE_COLUMNS = [
+    "file",
+    "ts_start",
+    "ts_end",
+    "run_id",
+    "task_kind",
+    "task_group",
+    "cmd",
+    "dataset",
+    "arch",
+    "cpu_model",
+    "threads",
+    "mem_kb",
+    "instance_id",
+    "instance_type",
+    "cloud_provider",
+    "cpus_limit",
+    "omp_num_threads",
+    "cpu_mode",
+    "cpuset",
+    "colo_group",
+    "colo_role",
+    "colo_peers",
+    "exit_code",
+    "wall_s",
+    "user_s",
+    "sys_s",
+    "max_rss_kb",
+    "harness",
+    "harness_overhead_s",
+    "harness_rss_floor_kb",
+    "cpu_mhz_min",
+    "cpu_mhz_mean",
+    "cpu_mhz_max",
+    "cpu_mhz_cpus",
+    "temp_c_min",
+    "temp_c_mean",
+    "temp_c_max",
+]
+
+
+def row_parts(path: Path, m: Measurement, extra_rec: dict | None, text_lines):
+    """
+    Normalized row(s) for one measured command, split in the values of
+    BASE_COLUMNS and one dict of task-specific columns per row (several
+    for multi-stressor runs).
+    """
     # task_kind: priority meta.task, then extra.task, then empty
-    task_kind = meta.get("task") or (extra_rec or {}).get("task") or ""
-    cmd = metrics_rec.get("cmd", "")
-
-    row = {
-        "file": str(path),
-        "ts_start": metrics_rec.get("ts_start"),
-        "ts_end": metrics_rec.get("ts_end"),
-        "run_id": meta.get("run_id", ""),
-        "task_kind": task_kind,
-        "task_group": get_task_group(task_kind),
-        "cmd": cmd,
-        "dataset": meta.get("dataset", ""),
-        "arch": host.get("arch"),
-        "cpu_model": host.get("cpu_model"),
-        "threads": host.get("threads"),
-        "mem_kb": host.get("mem_kb"),
-        "instance_type": host.get("instance_type") or meta.get("instance_type"),
-        "cloud_provider": host.get("cloud_provider") or meta.get("cloud_provider"),
-        "exit_code": metrics_rec.get("exit_code"),
-        "wall_s": metrics.get("wall_s"),
-        "user_s": metrics.get("user_s"),
-        "sys_s": metrics.get("sys_s"),
-        "max_rss_kb": metrics.get("max_rss_kb"),
-    }
+    task_kind = m.task or (extra_rec or {}).get("task") or ""
+    cmd = m.cmd
+
+    base = (
+        str(path),
+        m.ts_start,
+        m.ts_end,
+        m.run_id,
+        task_kind,
+        get_task_group(task_kind),
+        cmd,
+        m.dataset,
+        m.arch,
+        m.cpu_model,
+        m.threads,
+        m.mem_kb,
+        m.instance_id,
+        m.instance_type,
+        m.cloud_provider,
+        to_float(m.cpus),
+        to_float(m.omp_num_threads),
+        m.cpu_mode,
+        m.cpuset,
+        m.colo_group,
+        m.colo_role,
+        m.colo_peers,
+        m.exit_code,
+        m.wall_s,
+        m.user_s,
+        m.sys_s,
+        m.max_rss_kb,
+        m.harness or "bash",
+        m.harness_overhead_s,
+        m.harness_rss_floor_kb,
+        m.cpu_mhz_min,
+        m.cpu_mhz_mean,
+        m.cpu_mhz_max,
+        m.cpu_mhz_cpus,
+        m.temp_c_min,
+        m.temp_c_mean,
+        m.temp_c_max,
+    )
+    extra = {}
 
     # numpy-specific
     if extra_rec and (extra_rec.get("task", "").startswith("numpy")):
-        row.update(parse_numpy_extra(extra_rec))
+        extra.update(parse_numpy_extra(extra_rec))
+
+    # io_tasks.py
+    if extra_rec and extra_rec.get("task") == "io":
+        extra.update(parse_io_extra(extra_rec))
 
     # ffmpeg-specific
-    if task_kind == "ffmpeg":
-        row.update(parse_ffmpeg_cmd(cmd))
+    if task_kind.startswith("ffmpeg"):
+        extra.update(parse_ffmpeg_cmd(cmd))
+        extra.update(parse_ffmpeg_text(text_lines))
 
     # stress-ng-specific
-    if task_kind == "stress-ng":
-        row.update(parse_stress_cmd(cmd))
-        row.update(parse_stress_text(text_lines))
+    if task_kind.startswith("stress-ng"):
+        return base, stress_rows(extra, cmd, text_lines)
+
+    return base, [extra]
 
-    return row
+
+def build_rows(path: Path, m: Measurement, extra_rec: dict | None, text_lines):
+    """Normalized row dicts for one measured command."""
+    base, extras = row_parts(path, m, extra_rec, text_lines)
+    row = dict(zip(BASE_COLUMNS, base))
+    return [{**row, **extra} for extra in extras]
+
+
+def segment_rows(path: Path, segments):
+    """Row dicts of segments read from path, in file order."""
+    for m, extra_recs, text_lines in segments:
+        # Most typical cases: 1 metrics + 0/1 extra; tasks that report
+        # several results (numpy startup phases) get one row per extra
+        for extra in extra_recs or [None]:
+            yield from build_rows(path, m, extra, text_lines)
+
+
+def iter_rows(path: Path):
+    """Row dicts of one .jsonl file, in file order."""
+    return segment_rows(path, read_segments(path))
+
+
+class ColumnBuilder:
+    """
+    Collects rows straight into columns: the fixed BASE_COLUMNS as tuples,
+    task-specific columns as {row index: value}, so no per-row dict of all
+    columns is built.
+    """
+
+    def __init__(self):
+        self.base = []
+        self.sparse = {}
+
+    def __len__(self):
+        return len(self.base)
+
+    def add(self, path: Path, m: Measurement, extra_rec: dict | None, text_lines):
+        base, extras = row_parts(path, m, extra_rec, text_lines)
+        for extra in extras:
+            i = len(self.base)
+            self.base.append(base)
+            for col, value in extra.items():
+                if value is not None:
+                    self.sparse.setdefault(col, {})[i] = value
+                else:
+                    self.sparse.setdefault(col, {})
+
+    def frame(self) -> pd.DataFrame:
+        n = len(self.base)
+        base = pd.DataFrame.from_records(self.base, columns=BASE_COLUMNS)
+        sparse = pd.DataFrame(
+            {
+                col: [values.get(i) for i in range(n)]
+                for col, values in self.sparse.items()
+            },
+            index=base.index,
+        )
+        return pd.concat([base, sparse], axis=1)
+
+
+# Which null task (bench calibrate) holds the fixed cost inside each task's wall_s
+BASELINE_TASKS = {
+    "numpy": "calibrate-numpy",  # interpreter start + import numpy
+}
+DEFAULT_BASELINE_TASK = "calibrate-noop"  # process spawn (+ bash -c with bash harness)
+
+
+def add_baseline(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add baseline_s (median wall_s of the matching calibration task, measured on
+    the same instance with the same harness) and wall_s_net = wall_s - baseline_s.
+    Rows without calibration data on their instance keep NaN in both columns.
+    """
+    calib = df[df["task_group"] == "calibration"].copy()
+    if calib.empty:
+        return df
+
+    # Per instance where known, otherwise per instance type
+    calib["baseline_key"] = calib["instance_id"].fillna(calib["instance_type"])
+    baselines = (
+        calib.groupby(["baseline_key", "harness", "task_kind"], as_index=False)[
+            "wall_s"
+        ]
+        .median()
+        .rename(columns={"task_kind": "baseline_task", "wall_s": "baseline_s"})
+    )
+
+    df["baseline_key"] = df["instance_id"].fillna(df["instance_type"])
+    df["baseline_task"] = (
+        df["task_group"].map(BASELINE_TASKS).fillna(DEFAULT_BASELINE_TASK)
+    )
+    df = df.merge(
+        baselines, on=["baseline_key", "harness", "baseline_task"], how="left"
+    )
+    is_calib = df["task_group"] == "calibration"
+    df.loc[is_calib, ["baseline_task", "baseline_s"]] = None
+    df["wall_s_net"] = df["wall_s"] - df["baseline_s"]
+    return df.drop(columns=["baseline_key"])
 
 
 def main():
@@ -202,36 +711,41 @@ def main():
         default="normalized_results.csv",
         help="Path to the output CSV (default: normalized_results.csv)",
     )
+    parser.add_argument(
+        "--db",
+        help="Also append the rows to this SQLite results store (results_db.py)",
+    )
     args = parser.parse_args()
 
     root = Path(args.input_dir)
     if not root.is_dir():
         raise SystemExit(f"Input path is not a directory: {root}")
 
-    all_rows = []
+    columns = ColumnBuilder()
 
     for path in root.rglob("*.jsonl"):
-        json_recs, text_lines = read_file(path)
-        metrics_recs, extra_recs = classify_records(json_recs)
-
-        # Most typical cases: 1 metrics + 0/1 extra
-        if len(metrics_recs) == 1 and len(extra_recs) <= 1:
-            extra = extra_recs[0] if extra_recs else None
-            all_rows.append(build_row(path, metrics_recs[0], extra, text_lines))
-        else:
-            # fallback: separate row for each metrics_rec
-            for m in metrics_recs:
-                all_rows.append(build_row(path, m, None, text_lines))
-
-    if not all_rows:
+        for m, extra_recs, text_lines in read_segments(path):
+            # Most typical cases: 1 metrics + 0/1 extra; tasks that report
+            # several results (numpy startup phases) get one row per extra
+            for extra in extra_recs or [None]:
+                columns.add(path, m, extra, text_lines)
+
+    if not len(columns):
         raise SystemExit("Do not found any valid records with metrics.")
 
-    df = pd.DataFrame(all_rows)
+    df = columns.frame()
+    df = add_baseline(df)
     out_path = Path(args.output)
     out_path.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(out_path, index=False)
     print(f"Saved {len(df)} rows to {out_path}")
 
+    if args.db:
+        from results_db import store
+
+        added = store(df, args.db)
+        print(f"Added {added} new rows to {args.db}")
+
 
 if __name__ == "__main__":
     main()
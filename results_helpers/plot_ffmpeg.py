@@ -1,63 +1,71 @@
 import argparse
+
 import pandas as pd
-import matplotlib.pyplot as plt
-
-parser = argparse.ArgumentParser(description="Plot FFmpeg benchmark results.")
-parser.add_argument("--input", default="ffmpeg_aggregated.csv", help="Input CSV file")
-parser.add_argument("--output_dir", default=".", help="Output directory for plots")
-args = parser.parse_args()
-agg = pd.read_csv(args.input)
-
-arm = agg[agg["arch"] == "aarch64"].sort_values("mean_wall_s")
-amd = agg[agg["arch"] == "x86_64"].sort_values("mean_wall_s")
-
-# -----------------------------
-# Figure 1 – ARM64 (video processing time)
-# -----------------------------
-plt.figure(figsize=(10, 5))
-x_pos = range(len(arm))
-plt.bar(x_pos, arm["mean_wall_s"], color="green")
-plt.xticks(x_pos, arm["instance_type"], rotation=45, ha="right")
-plt.ylabel("Середній час обробки, с")
-plt.xlabel("Тип інстансу")
-plt.title("Час обробки відео FFmpeg для ARM64")
-plt.tight_layout()
-plt.savefig(f"{args.output_dir}/ffmpeg_arm64_time.png", dpi=200)
-
-# -----------------------------
-# Figure 2 – AMD64 (video processing time)
-# -----------------------------
-plt.figure(figsize=(10, 5))
-x_pos = range(len(amd))
-plt.bar(x_pos, amd["mean_wall_s"], color="orange")
-plt.xticks(x_pos, amd["instance_type"], rotation=45, ha="right")
-plt.ylabel("Середній час обробки, с")
-plt.xlabel("Тип інстансу")
-plt.title("Час обробки відео FFmpeg для AMD64")
-plt.tight_layout()
-plt.savefig(f"{args.output_dir}/ffmpeg_amd64_time.png", dpi=200)
-
-# -----------------------------
-# Figure 3 – Both Architectures
-# -----------------------------
-plt.figure(figsize=(10, 5))
-plt.bar(
-    arm["instance_type"], arm["mean_wall_s"], label="ARM64 (Graviton)", color="green"
-)
-plt.bar(
-    amd["instance_type"], amd["mean_wall_s"], label="AMD64 (Intel/AMD)", color="orange"
-)
-plt.ylabel("Середній час обробки, с")
-plt.xlabel("Тип інстансу")
-plt.title("Порівняння ефективності обробки відео (FFmpeg)")
-plt.legend()
-plt.xticks(rotation=45, ha="right")
-plt.tight_layout()
-plt.savefig(f"{args.output_dir}/ffmpeg_comparison.png", dpi=200)
-
-print(
-    "Graphics saved as:\n"
-    " - ffmpeg_arm64_time.png\n"
-    " - ffmpeg_amd64_time.png\n"
-    " - ffmpeg_comparison.png"
-)
+
+from plotting import figure, render_all
+
+ARCH_LABELS = {"aarch64": "ARM64 (Graviton)", "x86_64": "AMD64 (Intel/AMD)"}
+ARCH_COLORS = {"aarch64": "green", "x86_64": "orange"}
+
+
+def build_figures(agg: pd.DataFrame, output_dir: str) -> list[dict]:
+    arm = agg[agg["arch"] == "aarch64"].sort_values("mean_wall_s")
+    amd = agg[agg["arch"] == "x86_64"].sort_values("mean_wall_s")
+
+    def bars(df):
+        return pd.DataFrame(
+            {"label": df["instance_type"], "value": df["mean_wall_s"]}
+        ).reset_index(drop=True)
+
+    both = pd.concat([arm, amd])
+    return [
+        # Figure 1 – ARM64 (video processing time)
+        figure(
+            "bar",
+            f"{output_dir}/ffmpeg_arm64_time.png",
+            bars(arm),
+            color="green",
+            ylabel="Середній час обробки, с",
+            xlabel="Тип інстансу",
+            title="Час обробки відео FFmpeg для ARM64",
+        ),
+        # Figure 2 – AMD64 (video processing time)
+        figure(
+            "bar",
+            f"{output_dir}/ffmpeg_amd64_time.png",
+            bars(amd),
+            color="orange",
+            ylabel="Середній час обробки, с",
+            xlabel="Тип інстансу",
+            title="Час обробки відео FFmpeg для AMD64",
+        ),
+        # Figure 3 – Both Architectures
+        figure(
+            "overlay_bar",
+            f"{output_dir}/ffmpeg_comparison.png",
+            pd.DataFrame(
+                {
+                    "label": both["instance_type"],
+                    "value": both["mean_wall_s"],
+                    "arch": both["arch"],
+                }
+            ).reset_index(drop=True),
+            series_col="arch",
+            series_labels=ARCH_LABELS,
+            colors=ARCH_COLORS,
+            ylabel="Середній час обробки, с",
+            xlabel="Тип інстансу",
+            title="Порівняння ефективності обробки відео (FFmpeg)",
+        ),
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plot FFmpeg benchmark results.")
+    parser.add_argument(
+        "--input", default="ffmpeg_aggregated.csv", help="Input CSV file"
+    )
+    parser.add_argument("--output_dir", default=".", help="Output directory for plots")
+    args = parser.parse_args()
+
+    render_all(build_figures(pd.read_csv(args.input), args.output_dir))
@@ -1,66 +1,68 @@
 import argparse
+
 import pandas as pd
-import matplotlib.pyplot as plt
 
-parser = argparse.ArgumentParser(description="Plot NumPy benchmark results.")
-parser.add_argument("--input", default="numpy_aggregated.csv", help="Input CSV file")
-parser.add_argument("--output_dir", default=".", help="Output directory for plots")
-args = parser.parse_args()
-agg = pd.read_csv(args.input)
+from plotting import figure, render_all
+
+ARCH_LABELS = {"aarch64": "ARM64 (Graviton)", "x86_64": "AMD64 (Intel/AMD)"}
+ARCH_COLORS = {"aarch64": "green", "x86_64": "orange"}
+
 
-arm = agg[agg["arch"] == "aarch64"].sort_values(["task_kind", "mean_wall_s"])
-amd = agg[agg["arch"] == "x86_64"].sort_values(["task_kind", "mean_wall_s"])
+def build_figures(agg: pd.DataFrame, output_dir: str) -> list[dict]:
+    arm = agg[agg["arch"] == "aarch64"].sort_values(["task_kind", "mean_wall_s"])
+    amd = agg[agg["arch"] == "x86_64"].sort_values(["task_kind", "mean_wall_s"])
 
-# -----------------------------
-# Figure 1 – ARM64 (separate matmul and elem)
-# -----------------------------
-plt.figure(figsize=(10, 5))
-for task, data in arm.groupby("task_kind"):
-    plt.bar(data["instance_type"], data["mean_wall_s"], label=f"{task}")
-plt.xticks(rotation=45, ha="right")
-plt.ylabel("Середній час виконання, с")
-plt.xlabel("Тип інстансу")
-plt.title("Час виконання NumPy-операцій (ARM64)")
-plt.legend()
-plt.tight_layout()
-plt.savefig(f"{args.output_dir}/numpy_arm64.png", dpi=200)
+    def bars(df, series_col):
+        return pd.DataFrame(
+            {
+                "label": df["instance_type"],
+                "value": df["mean_wall_s"],
+                "series": df[series_col],
+            }
+        ).reset_index(drop=True)
 
-# -----------------------------
-# Figure 2 – AMD64 (separate matmul and elem)
-# -----------------------------
-plt.figure(figsize=(10, 5))
-for task, data in amd.groupby("task_kind"):
-    plt.bar(data["instance_type"], data["mean_wall_s"], label=f"{task}")
-plt.xticks(rotation=45, ha="right")
-plt.ylabel("Середній час виконання, с")
-plt.xlabel("Тип інстансу")
-plt.title("Час виконання NumPy-операцій (AMD64)")
-plt.legend()
-plt.tight_layout()
-plt.savefig(f"{args.output_dir}/numpy_amd64.png", dpi=200)
+    return [
+        # Figure 1 – ARM64 (separate matmul and elem)
+        figure(
+            "overlay_bar",
+            f"{output_dir}/numpy_arm64.png",
+            bars(arm, "task_kind"),
+            series_col="series",
+            ylabel="Середній час виконання, с",
+            xlabel="Тип інстансу",
+            title="Час виконання NumPy-операцій (ARM64)",
+        ),
+        # Figure 2 – AMD64 (separate matmul and elem)
+        figure(
+            "overlay_bar",
+            f"{output_dir}/numpy_amd64.png",
+            bars(amd, "task_kind"),
+            series_col="series",
+            ylabel="Середній час виконання, с",
+            xlabel="Тип інстансу",
+            title="Час виконання NumPy-операцій (AMD64)",
+        ),
+        # Figure 3 – Comparison of Both Architectures
+        figure(
+            "overlay_bar",
+            f"{output_dir}/numpy_comparison.png",
+            bars(pd.concat([arm, amd]), "arch"),
+            series_col="series",
+            series_labels=ARCH_LABELS,
+            colors=ARCH_COLORS,
+            ylabel="Середній час виконання, с",
+            xlabel="Тип інстансу",
+            title="Порівняння ефективності NumPy між архітектурами",
+        ),
+    ]
 
-# -----------------------------
-# Figure 3 – Comparison of Both Architectures
-# -----------------------------
-plt.figure(figsize=(10, 5))
 
-plt.bar(
-    arm["instance_type"], arm["mean_wall_s"], label="ARM64 (Graviton)", color="green"
-)
-plt.bar(
-    amd["instance_type"], amd["mean_wall_s"], label="AMD64 (Intel/AMD)", color="orange"
-)
-plt.xticks(rotation=45, ha="right")
-plt.ylabel("Середній час виконання, с")
-plt.xlabel("Тип інстансу")
-plt.title("Порівняння ефективності NumPy між архітектурами")
-plt.legend(["ARM64 (Graviton)", "AMD64 (Intel/AMD)"])
-plt.tight_layout()
-plt.savefig(f"{args.output_dir}/numpy_comparison.png", dpi=200)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plot NumPy benchmark results.")
+    parser.add_argument(
+        "--input", default="numpy_aggregated.csv", help="Input CSV file"
+    )
+    parser.add_argument("--output_dir", default=".", help="Output directory for plots")
+    args = parser.parse_args()
 
-print(
-    "Graphics saved as:\n"
-    " - numpy_arm64.png\n"
-    " - numpy_amd64.png\n"
-    " - numpy_comparison.png"
-)
+    render_all(build_figures(pd.read_csv(args.input), args.output_dir))
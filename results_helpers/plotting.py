@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+plotting.py
+
+Shared rendering engine for the benchmark plots.
+
+Figures are described as plain specs (kind + data + parameters) by the plot_*
+scripts, analyze_economy.py (bars, workload-mix Pareto scatter),
+analyze_drift.py (per-run time series) and analyze_colocation.py (slowdown
+matrix heatmaps), then rendered here:
+  - matplotlib is imported lazily, only in the process that draws, with the
+    headless Agg backend
+  - independent figures are rendered concurrently on a process pool
+  - a figure is skipped when its data, parameters and dpi hash to the same
+    value as on the previous render and the PNG still exists
+
+Usage (renders all stress-ng, FFmpeg and NumPy figures in one go):
+    python plotting.py --stressng stressng_aggregated.csv \\
+        --ffmpeg ffmpeg_aggregated.csv --numpy numpy_aggregated.csv --output_dir .
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_FILE = ".plot_cache.json"
+DEFAULT_DPI = 200
+
+RENDERERS = {}
+
+
+def renderer(kind: str):
+    """Register a drawing function for a figure kind."""
+
+    def register(func):
+        RENDERERS[kind] = func
+        return func
+
+    return register
+
+
+def figure(kind: str, out_png, data: pd.DataFrame, **params) -> dict:
+    """Describe one figure; nothing is drawn until render_all()."""
+    if kind not in RENDERERS:
+        raise ValueError(f"Unknown figure kind: {kind}")
+    return {"kind": kind, "out_png": str(out_png), "data": data, "params": params}
+
+
+def _pyplot():
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def _decorate(plt, title, xlabel, ylabel, legend=False):
+    plt.ylabel(ylabel)
+    plt.xlabel(xlabel)
+    plt.title(title)
+    if legend:
+        plt.legend()
+
+
+@renderer("bar")
+def _render_bar(
+    plt,
+    data,
+    title,
+    xlabel,
+    ylabel,
+    label_col="label",
+    value_col="value",
+    color=None,
+    color_col=None,
+    figsize=(10, 5),
+):
+    """One bar per row, labels on the x axis."""
+    plt.figure(figsize=figsize)
+    x_pos = range(len(data))
+    colors = list(data[color_col]) if color_col else color
+    plt.bar(x_pos, data[value_col], color=colors)
+    plt.xticks(x_pos, data[label_col], rotation=45, ha="right")
+    _decorate(plt, title, xlabel, ylabel)
+
+
+@renderer("overlay_bar")
+def _render_overlay_bar(
+    plt,
+    data,
+    title,
+    xlabel,
+    ylabel,
+    series_col,
+    label_col="label",
+    value_col="value",
+    series_labels=None,
+    colors=None,
+    figsize=(10, 5),
+):
+    """Several series drawn on one categorical x axis, one plt.bar per series."""
+    plt.figure(figsize=figsize)
+    series_labels = series_labels or {}
+    colors = colors or {}
+    for series, sub in data.groupby(series_col, sort=False):
+        plt.bar(
+            sub[label_col],
+            sub[value_col],
+            label=series_labels.get(series, series),
+            color=colors.get(series),
+        )
+    plt.xticks(rotation=45, ha="right")
+    _decorate(plt, title, xlabel, ylabel, legend=True)
+
+
+@renderer("pareto")
+def _render_pareto(
+    plt,
+    data,
+    title,
+    ylabel,
+    panels,
+    y_col="value",
+    label_col="label",
+    color_col="color",
+    figsize=(13, 5),
+):
+    """
+    Scatter panels side by side, one per (x_col, frontier_col, xlabel):
+    every point labelled, the points flagged in frontier_col joined by a line.
+    """
+    fig, axes = plt.subplots(1, len(panels), figsize=figsize, squeeze=False)
+    for ax, (x_col, frontier_col, xlabel) in zip(axes[0], panels):
+        sub = data.dropna(subset=[x_col, y_col])
+        ax.scatter(sub[x_col], sub[y_col], c=list(sub[color_col]))
+        for x, y, label in zip(sub[x_col], sub[y_col], sub[label_col]):
+            ax.annotate(
+                label, (x, y), xytext=(3, 3), textcoords="offset points", fontsize=8
+            )
+        front = sub[sub[frontier_col].astype(bool)].sort_values(x_col)
+        ax.plot(front[x_col], front[y_col], "--", color="gray", label="Парето-фронт")
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.legend()
+    fig.suptitle(title)
+
+
+@renderer("timeseries")
+def _render_timeseries(
+    plt,
+    data,
+    title,
+    xlabel,
+    ylabel,
+    panel_col,
+    series_col,
+    x_col,
+    y_col,
+    mark_col=None,
+    ncols=3,
+    max_legend=8,
+):
+    """
+    One line per series over x, a grid of panels (one per panel_col value);
+    points flagged in mark_col drawn as hollow red circles.
+    """
+    panels = list(dict.fromkeys(data[panel_col]))
+    ncols = min(ncols, len(panels))
+    nrows = -(-len(panels) // ncols)
+    fig, axes = plt.subplots(
+        nrows, ncols, figsize=(5 * ncols, 3.5 * nrows), squeeze=False
+    )
+    for ax, panel in zip(axes.flat, panels):
+        sub = data[data[panel_col] == panel]
+        for series, points in sub.groupby(series_col, sort=False):
+            points = points.sort_values(x_col)
+            ax.plot(points[x_col], points[y_col], marker=".", lw=1, label=series)
+            if mark_col:
+                marked = points[points[mark_col].astype(bool)]
+                ax.scatter(
+                    marked[x_col], marked[y_col], s=60, facecolors="none", color="red"
+                )
+        ax.set_title(panel, fontsize=9)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel, fontsize=8)
+        if sub[series_col].nunique() <= max_legend:
+            ax.legend(fontsize=7)
+    for ax in list(axes.flat)[len(panels) :]:
+        ax.set_visible(False)
+    fig.suptitle(title)
+
+
+@renderer("heatmap")
+def _render_heatmap(
+    plt,
+    data,
+    title,
+    xlabel,
+    ylabel,
+    row_col,
+    col_col,
+    value_col="value",
+    vmin=None,
+    cmap="Reds",
+    figsize=None,
+):
+    """row_col x col_col matrix of value_col, every cell annotated; gaps blank."""
+    matrix = data.pivot_table(index=row_col, columns=col_col, values=value_col)
+    figsize = figsize or (2 + 1.6 * len(matrix.columns), 1.5 + 0.6 * len(matrix))
+    fig, ax = plt.subplots(figsize=figsize)
+    image = ax.imshow(matrix.to_numpy(), cmap=cmap, vmin=vmin, aspect="auto")
+    for (i, j), value in np.ndenumerate(matrix.to_numpy()):
+        if not np.isnan(value):
+            color = "white" if image.norm(value) > 0.6 else "black"
+            ax.text(j, i, f"{value:.2f}", ha="center", va="center", color=color)
+    ax.set_xticks(range(len(matrix.columns)), matrix.columns, rotation=30, ha="right")
+    ax.set_yticks(range(len(matrix)), matrix.index)
+    fig.colorbar(image, ax=ax)
+    _decorate(plt, title, xlabel, ylabel)
+
+
+def figure_hash(spec: dict, dpi: int) -> str:
+    """Hash of everything that determines the PNG: kind, params, data, dpi."""
+    h = hashlib.sha256()
+    h.update(spec["kind"].encode())
+    h.update(json.dumps(spec["params"], sort_keys=True, default=str).encode())
+    h.update(str(dpi).encode())
+    data = spec["data"]
+    h.update(json.dumps(list(map(str, data.columns))).encode())
+    h.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _render_one(spec: dict, dpi: int) -> str:
+    plt = _pyplot()
+    try:
+        RENDERERS[spec["kind"]](plt, spec["data"], **spec["params"])
+        plt.tight_layout()
+        plt.savefig(spec["out_png"], dpi=dpi)
+    finally:
+        plt.close("all")
+    return spec["out_png"]
+
+
+def _load_cache(out_dir: Path) -> dict:
+    try:
+        return json.loads((out_dir / CACHE_FILE).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def render_all(
+    specs: list[dict],
+    dpi: int = DEFAULT_DPI,
+    workers: int | None = None,
+    force: bool = False,
+) -> list[str]:
+    """
+    Render figures whose inputs changed since the last run.
+    Returns the list of PNG paths that were (re)written.
+    """
+    caches = {}
+    pending = []
+    for spec in specs:
+        out = Path(spec["out_png"])
+        cache = caches.setdefault(out.parent, _load_cache(out.parent))
+        digest = figure_hash(spec, dpi)
+        if not force and out.is_file() and cache.get(out.name) == digest:
+            print(f"Unchanged, skipped plot: {out}")
+            continue
+        pending.append((spec, digest))
+
+    if not pending:
+        return []
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    if workers == 1:
+        rendered = [_render_one(spec, dpi) for spec, _ in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(
+                pool.map(_render_one, [s for s, _ in pending], [dpi] * len(pending))
+            )
+
+    for (spec, digest), out_png in zip(pending, rendered):
+        out = Path(out_png)
+        caches[out.parent][out.name] = digest
+        print(f"Saved plot: {out}")
+
+    for out_dir, cache in caches.items():
+        (out_dir / CACHE_FILE).write_text(json.dumps(cache, indent=2, sort_keys=True))
+
+    return rendered
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render all benchmark plots in one process pool."
+    )
+    parser.add_argument("--stressng", default=None, help="stressng_aggregated.csv")
+    parser.add_argument("--ffmpeg", default=None, help="ffmpeg_aggregated.csv")
+    parser.add_argument("--numpy", default=None, help="numpy_aggregated.csv")
+    parser.add_argument("--output_dir", default=".", help="Output directory for plots")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI, help="PNG resolution")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Render processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Re-render even unchanged figures"
+    )
+    args = parser.parse_args()
+
+    import plot_ffmpeg
+    import plot_numpy
+    import plot_stressng
+
+    specs = []
+    sources = [
+        (args.stressng, plot_stressng),
+        (args.ffmpeg, plot_ffmpeg),
+        (args.numpy, plot_numpy),
+    ]
+    for path, module in sources:
+        if not path:
+            continue
+        if not Path(path).is_file():
+            print(f"⚠️ Input not found, skipping: {path}")
+            continue
+        specs += module.build_figures(pd.read_csv(path), args.output_dir)
+
+    render_all(specs, dpi=args.dpi, workers=args.workers, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Append-only SQLite store for normalized benchmark rows.
+
+parse_results.py --db results.db adds every parsed row to the `results`
+table (one row per normalized_results.csv row). Rows are keyed by the
+measurement they come from, so re-parsing the same files adds nothing;
+derived columns (calibration baseline, wall_s_net) are refreshed. New
+columns from newer parser versions are added with ALTER TABLE.
+
+The connection registers SQL aggregates missing from SQLite:
+percentile(x, q) (q in 0..100, linear like pandas), median(x), stdev(x).
+
+Usage:
+    results_db.py load  --db results.db --input normalized_results.csv
+    results_db.py query --db results.db "SELECT ..." [--csv out.csv]
+
+    # p95 matmul wall time on every c7g size over the last 5 runs
+    results_db.py query --db results.db "
+        SELECT instance_type, percentile(wall_s, 95) AS p95_s, COUNT(*) AS n
+        FROM results
+        WHERE task_kind = 'numpy-matmul' AND instance_type LIKE 'c7g.%'
+          AND run_id IN (SELECT run_id FROM runs ORDER BY started DESC LIMIT 5)
+        GROUP BY instance_type"
+"""
+
+import argparse
+import hashlib
+import math
+import sqlite3
+import time
+from pathlib import Path
+
+import pandas as pd
+
+TABLE = "results"
+# Identify the measurement a row comes from; the ordinal tells apart the
+# rows of one measurement (numpy startup phases, stress-ng stressors, ...)
+KEY_COLS = [
+    "instance_id",
+    "instance_type",
+    "run_id",
+    "ts_start",
+    "ts_end",
+    "task_kind",
+    "cmd",
+]
+# Recomputed by parse_results on every run, so updated in place
+DERIVED_COLS = ["baseline_task", "baseline_s", "wall_s_net"]
+# DATASET values of the side campaigns, each with its own analyzer
+# (analyze_scaling.py, analyze_cpuset.py, analyze_colocation.py); the
+# reference analyses leave these rows out
+SIDE_DATASETS = ("scaling", "cpumode", "colocation")
+
+BASE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {TABLE} (
+    row_key TEXT PRIMARY KEY,
+    loaded_at INTEGER,
+    ts_start INTEGER,
+    ts_end INTEGER,
+    run_id TEXT,
+    task_kind TEXT,
+    instance_type TEXT,
+    arch TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_{TABLE}_lookup
+    ON {TABLE} (task_kind, instance_type, arch, run_id, ts_start);
+CREATE VIEW IF NOT EXISTS runs AS
+    SELECT run_id, MIN(ts_start) AS started, MAX(ts_end) AS ended,
+           COUNT(*) AS rows, COUNT(DISTINCT instance_type) AS instance_types
+    FROM {TABLE} GROUP BY run_id;
+"""
+
+
+class Percentile:
+    def __init__(self):
+        self.values = []
+        self.q = None
+
+    def step(self, value, q):
+        if value is not None:
+            self.values.append(float(value))
+            self.q = float(q)
+
+    def finalize(self):
+        if not self.values:
+            return None
+        vals = sorted(self.values)
+        pos = (len(vals) - 1) * self.q / 100
+        lo = math.floor(pos)
+        hi = min(lo + 1, len(vals) - 1)
+        return vals[lo] + (vals[hi] - vals[lo]) * (pos - lo)
+
+
+class Median(Percentile):
+    def step(self, value):
+        super().step(value, 50)
+
+
+class Stdev:
+    """Sample standard deviation (ddof=1, as pandas .std())."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def step(self, value):
+        if value is None:
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def finalize(self):
+        if self.n < 2:
+            return None
+        return math.sqrt(self.m2 / (self.n - 1))
+
+
+def connect(path) -> sqlite3.Connection:
+    con = sqlite3.connect(str(path))
+    con.create_aggregate("percentile", 2, Percentile)
+    con.create_aggregate("median", 1, Median)
+    con.create_aggregate("stdev", 1, Stdev)
+    return con
+
+
+def sql_type(dtype) -> str:
+    if dtype.kind == "f":
+        return "REAL"
+    if dtype.kind in "iub":
+        return "INTEGER"
+    return "TEXT"
+
+
+def ensure_columns(con: sqlite3.Connection, df: pd.DataFrame) -> None:
+    existing = {row[1] for row in con.execute(f"PRAGMA table_info({TABLE})")}
+    for col in df.columns:
+        if col not in existing:
+            con.execute(
+                f'ALTER TABLE {TABLE} ADD COLUMN "{col}" {sql_type(df[col].dtype)}'
+            )
+
+
+def row_keys(df: pd.DataFrame) -> list[str]:
+    # Same key whether the rows come straight from the parser or from the CSV
+    ident = df.reindex(columns=KEY_COLS).astype(object)
+    ident = ident.where(ident.notna(), "").astype(str)
+    ordinal = ident.groupby(KEY_COLS, sort=False).cumcount().astype(str)
+    joined = ident.apply("|".join, axis=1) + "|" + ordinal
+    return [hashlib.sha1(k.encode()).hexdigest() for k in joined]
+
+
+def store(df: pd.DataFrame, path) -> int:
+    """Add rows to the database at path; returns the number of new rows."""
+    con = connect(path)
+    try:
+        with con:
+            con.executescript(BASE_SCHEMA)
+            ensure_columns(con, df)
+            before = con.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+
+            cols = list(df.columns)
+            names = ", ".join(f'"{c}"' for c in ["row_key", "loaded_at"] + cols)
+            marks = ", ".join("?" * (len(cols) + 2))
+            derived = [c for c in DERIVED_COLS if c in cols]
+            if derived:
+                conflict = "DO UPDATE SET " + ", ".join(
+                    f'"{c}" = excluded."{c}"' for c in derived
+                )
+            else:
+                conflict = "DO NOTHING"
+
+            values = df.astype(object).where(df.notna(), None)
+            loaded_at = int(time.time())
+            con.executemany(
+                f"INSERT INTO {TABLE} ({names}) VALUES ({marks}) "
+                f"ON CONFLICT(row_key) {conflict}",
+                (
+                    (key, loaded_at, *row)
+                    for key, row in zip(
+                        row_keys(df), values.itertuples(index=False, name=None)
+                    )
+                ),
+            )
+            after = con.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+    finally:
+        con.close()
+    return after - before
+
+
+def open_results(csv_path=None, db_path=None) -> sqlite3.Connection:
+    """
+    Connection with a `results` table: the database when db_path is given,
+    otherwise csv_path (normalized_results.csv) loaded into memory, so the
+    analyzers run the same SQL on either source.
+    """
+    if db_path:
+        if not Path(db_path).is_file():
+            raise SystemExit(f"Database not found: {db_path}")
+        return connect(db_path)
+    con = connect(":memory:")
+    pd.read_csv(csv_path).to_sql(TABLE, con, index=False)
+    return con
+
+
+def reference_sql(column: str = "dataset") -> str:
+    """WHERE condition keeping the reference rows (no SIDE_DATASETS)."""
+    side = ", ".join(f"'{d}'" for d in SIDE_DATASETS)
+    return f"COALESCE({column}, '') NOT IN ({side})"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite store for benchmark rows.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    load = sub.add_parser("load", help="Append normalized_results.csv rows")
+    load.add_argument("--db", default="results.db", help="SQLite database file")
+    load.add_argument(
+        "--input", default="normalized_results.csv", help="Input CSV file"
+    )
+
+    query = sub.add_parser("query", help="Run a SQL query and print the result")
+    query.add_argument("--db", default="results.db", help="SQLite database file")
+    query.add_argument("sql", help="SQL query (table `results`, view `runs`)")
+    query.add_argument("--csv", help="Also save the result to this CSV file")
+
+    args = parser.parse_args()
+
+    if args.command == "load":
+        added = store(pd.read_csv(args.input), args.db)
+        print(f"Added {added} new rows to {args.db}")
+        return
+
+    con = open_results(db_path=args.db)
+    try:
+        result = pd.read_sql_query(args.sql, con)
+    finally:
+        con.close()
+    print(result.to_string(index=False))
+    if args.csv:
+        result.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,39 +8,154 @@ Usage:
     python run_pipeline.py my-benchmark-bucket
 
 This script:
-  1. Synchronizes benchmark results from an S3 bucket
-  2. Runs parse_results.py
+  1. Fetches completed runs (prefixes with DONE) from an S3 bucket
+  2. Runs parse_results.py (also appending to results/results.db), the
+     incremental online aggregation (online_aggregated.csv) and the
+     warm-up / drift analysis (with --steady-state the analyzers below read
+     the results without warm-up runs)
   3. Runs get_aws_prices.py
-  4. Runs analyze-* scripts
-  5. Runs plot-* scripts
+  4. Runs analyze-* scripts (incl. the scaling model fit)
+  5. Renders all plots (plotting.py, one process pool)
   6. Runs economy-* scripts
 """
 
 import argparse
+import json
+import os
+import platform
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 
-def run_step(name: str, cmd: list[str]) -> None:
-    """Run a command as a separate process with logging and exit code check."""
-    print(f"\n=== [{name}] ===")
-    print(f"$ {' '.join(cmd)}")
-    try:
-        result = subprocess.run(
-            cmd,
-            check=False,
-            text=True,
+def count_rows(path: Path) -> int:
+    """Data rows of a CSV, lines of a JSONL file, or of all JSONL files in a dir."""
+    if path.is_dir():
+        return sum(count_rows(p) for p in path.rglob("*.jsonl"))
+    with path.open("rb") as f:
+        lines = sum(1 for _ in f)
+    return max(lines - 1, 0) if path.suffix == ".csv" else lines
+
+
+def data_paths(cmd: list[str]) -> tuple[dict, dict]:
+    """
+    Data files named on the command line and the CSVs inside directory
+    arguments, with their mtimes (None if missing), before or after a step.
+    """
+    files = {}
+    dir_csvs = {}
+    for arg in cmd[1:]:
+        path = Path(arg)
+        if path.suffix in (".csv", ".jsonl"):
+            files[path] = path.stat().st_mtime if path.is_file() else None
+        elif path.is_dir():
+            files[path] = path.stat().st_mtime
+            for csv in path.glob("*.csv"):
+                dir_csvs[csv] = csv.stat().st_mtime
+    return files, dir_csvs
+
+
+class PipelineRunner:
+    """
+    Runs pipeline steps as separate processes and accounts for each one:
+    wall time, CPU time and peak RSS of the step process (os.wait4), rows
+    read from its input files and written to its output CSVs, and with
+    profile_dir a cProfile dump per Python step. The summary is written to
+    pipeline_stats.json and appended to pipeline_history.jsonl in stats_dir.
+    """
+
+    def __init__(self, stats_dir: Path, profile_dir: Path | None = None):
+        self.stats_dir = stats_dir
+        self.profile_dir = profile_dir
+        self.steps = []
+        self.started = time.time()
+
+    def __call__(self, name: str, cmd: list[str]) -> dict:
+        """Run a command as a separate process with logging and exit code check."""
+        print(f"\n=== [{name}] ===")
+        print(f"$ {' '.join(cmd)}")
+
+        profile = None
+        run_cmd = cmd
+        if self.profile_dir and cmd[0] == "python" and cmd[1].endswith(".py"):
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            stem = Path(cmd[1]).stem
+            profile = self.profile_dir / f"{len(self.steps) + 1:02d}-{stem}.prof"
+            run_cmd = [cmd[0], "-m", "cProfile", "-o", str(profile)] + cmd[1:]
+
+        files_before, csvs_before = data_paths(cmd)
+        t0 = time.perf_counter()
+        try:
+            proc = subprocess.Popen(run_cmd, text=True)
+        except FileNotFoundError as e:
+            print(f"[ERROR] Command not found: {cmd[0]} ({e})")
+            self.finish("failed")
+            sys.exit(1)
+        _, status, rusage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        wall_s = time.perf_counter() - t0
+        files_after, csvs_after = data_paths(cmd)
+
+        # Inputs: data files left unchanged, raw JSONL trees (dirs without CSVs)
+        inputs = {}
+        for path, mtime in files_before.items():
+            if path.is_dir():
+                if not any(csv.parent == path for csv in csvs_before):
+                    inputs[path] = count_rows(path)
+            elif mtime is not None and files_after.get(path) == mtime:
+                inputs[path] = count_rows(path)
+        # Outputs: CSVs created or rewritten by the step
+        before = {**files_before, **csvs_before}
+        outputs = {
+            path: count_rows(path)
+            for path, mtime in {**files_after, **csvs_after}.items()
+            if path.suffix == ".csv" and mtime is not None and mtime != before.get(path)
+        }
+        stats = {
+            "name": name,
+            "cmd": cmd,
+            "exit_code": proc.returncode,
+            "wall_s": round(wall_s, 3),
+            "cpu_user_s": round(rusage.ru_utime, 3),
+            "cpu_sys_s": round(rusage.ru_stime, 3),
+            "peak_rss_kb": rusage.ru_maxrss,
+            "rows_in": sum(inputs.values()),
+            "rows_out": sum(outputs.values()),
+            "inputs": {str(p): n for p, n in inputs.items()},
+            "outputs": {str(p): n for p, n in outputs.items()},
+            "profile": str(profile) if profile else None,
+        }
+        self.steps.append(stats)
+        print(
+            f"[STATS] wall {stats['wall_s']:.2f}s, "
+            f"cpu {stats['cpu_user_s'] + stats['cpu_sys_s']:.2f}s, "
+            f"peak RSS {stats['peak_rss_kb'] / 1024:.0f} MiB, "
+            f"rows {stats['rows_in']} → {stats['rows_out']}"
         )
-    except FileNotFoundError as e:
-        print(f"[ERROR] Command not found: {cmd[0]} ({e})")
-        sys.exit(1)
-
-    if result.returncode != 0:
-        print(f"[ERROR] Step '{name}' exited with code {result.returncode}")
-        sys.exit(result.returncode)
-    else:
+
+        if proc.returncode != 0:
+            print(f"[ERROR] Step '{name}' exited with code {proc.returncode}")
+            self.finish("failed")
+            sys.exit(proc.returncode)
         print(f"[OK] Step '{name}' completed successfully.")
+        return stats
+
+    def finish(self, status: str = "ok") -> dict:
+        summary = {
+            "started": int(self.started),
+            "status": status,
+            "total_wall_s": round(time.time() - self.started, 3),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "steps": self.steps,
+        }
+        self.stats_dir.mkdir(parents=True, exist_ok=True)
+        with (self.stats_dir / "pipeline_stats.json").open("w") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        with (self.stats_dir / "pipeline_history.jsonl").open("a") as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        return summary
 
 
 def main() -> None:
@@ -51,6 +166,21 @@ def main() -> None:
         "s3_bucket",
         help="S3 bucket name without the s3:// prefix (e.g., my-bench-bucket)",
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Dump a cProfile per Python step to results/profiles/",
+    )
+    parser.add_argument(
+        "--endpoint-url",
+        default=None,
+        help="S3-compatible endpoint for the fetch step (MinIO, moto server)",
+    )
+    parser.add_argument(
+        "--steady-state",
+        action="store_true",
+        help="Aggregate only steady-state runs (drop warm-up runs per instance)",
+    )
     args = parser.parse_args()
 
     bucket = args.s3_bucket
@@ -59,13 +189,22 @@ def main() -> None:
     data_dir = root_dir / "data"
     results_dir = root_dir / "results"
     results_dir.mkdir(exist_ok=True)
+    run_step = PipelineRunner(
+        results_dir, results_dir / "profiles" if args.profile else None
+    )
 
-    # 1. Sync results from S3
+    # 1. Fetch completed runs from S3
     data_dir.mkdir(exist_ok=True)
-    run_step(
-        "Sync S3 → ./data",
-        ["aws", "s3", "sync", f"s3://{bucket}", str(data_dir)],
-    )
+    fetch_cmd = [
+        "python",
+        str(scripts_dir / "fetch_s3.py"),
+        bucket,
+        "--output_dir",
+        str(data_dir),
+    ]
+    if args.endpoint_url:
+        fetch_cmd += ["--endpoint-url", args.endpoint_url]
+    run_step("Fetch S3 → ./data", fetch_cmd)
 
     # 2. Parse JSONL → normalized CSV
     run_step(
@@ -77,9 +216,47 @@ def main() -> None:
             str(data_dir),
             "--output",
             str(results_dir / "normalized_results.csv"),
+            "--db",
+            str(results_dir / "results.db"),
         ],
     )
 
+    # Quantile summaries per group, folded in incrementally: the state in
+    # results/ carries over, so a re-run only reads what the fetch brought in
+    run_step(
+        "Aggregate online (incremental)",
+        [
+            "python",
+            str(scripts_dir / "analyze_online.py"),
+            "--input_dir",
+            str(data_dir),
+            "--once",
+            "--state",
+            str(results_dir / "online_state.json"),
+            "--output",
+            str(results_dir / "online_aggregated.csv"),
+        ],
+    )
+
+    run_step(
+        "Analyze warm-up and drift",
+        [
+            "python",
+            str(scripts_dir / "analyze_drift.py"),
+            "--input",
+            str(results_dir / "normalized_results.csv"),
+            "--output",
+            str(results_dir / "drift_summary.csv"),
+            "--steady-output",
+            str(results_dir / "normalized_steady.csv"),
+            "--plot-dir",
+            str(results_dir),
+        ],
+    )
+    analysis_input = results_dir / (
+        "normalized_steady.csv" if args.steady_state else "normalized_results.csv"
+    )
+
     # 3. Fetch AWS prices and merge with results
     run_step(
         "Fetch AWS prices",
@@ -102,9 +279,15 @@ def main() -> None:
             "python",
             str(scripts_dir / "analyze_stressng.py"),
             "--input",
-            str(results_dir / "normalized_results.csv"),
+            str(analysis_input),
             "--output",
             str(results_dir / "stressng_aggregated.csv"),
+            "--stressors-output",
+            str(results_dir / "stressng_stressors_aggregated.csv"),
+            "--winners-output",
+            str(results_dir / "stressng_arch_winners.csv"),
+            "--frequency-output",
+            str(results_dir / "stressng_frequency.csv"),
         ],
     )
     run_step(
@@ -113,9 +296,11 @@ def main() -> None:
             "python",
             str(scripts_dir / "analyze_ffmpeg.py"),
             "--input",
-            str(results_dir / "normalized_results.csv"),
+            str(analysis_input),
             "--output",
             str(results_dir / "ffmpeg_aggregated.csv"),
+            "--matrix-output",
+            str(results_dir / "ffmpeg_matrix_aggregated.csv"),
         ],
     )
     run_step(
@@ -124,41 +309,111 @@ def main() -> None:
             "python",
             str(scripts_dir / "analyze_numpy.py"),
             "--input",
-            str(results_dir / "normalized_results.csv"),
+            str(analysis_input),
             "--output",
             str(results_dir / "numpy_aggregated.csv"),
+            "--kernels-output",
+            str(results_dir / "numpy_kernels_aggregated.csv"),
         ],
     )
 
-    # 5. Plot results
     run_step(
-        "Plot stress-ng",
+        "Analyze calibration",
         [
             "python",
-            str(scripts_dir / "plot_stressng.py"),
+            str(scripts_dir / "analyze_calibration.py"),
             "--input",
-            str(results_dir / "normalized_results.csv"),
-            "--output_dir",
-            str(results_dir),
+            str(analysis_input),
+            "--output",
+            str(results_dir / "calibration_aggregated.csv"),
         ],
     )
     run_step(
-        "Plot ffmpeg",
+        "Analyze startup latency",
         [
             "python",
-            str(scripts_dir / "plot_ffmpeg.py"),
+            str(scripts_dir / "analyze_startup.py"),
             "--input",
-            str(results_dir / "ffmpeg_aggregated.csv"),
-            "--output_dir",
+            str(analysis_input),
+            "--output",
+            str(results_dir / "startup_aggregated.csv"),
+        ],
+    )
+    run_step(
+        "Analyze memory latency",
+        [
+            "python",
+            str(scripts_dir / "analyze_latency.py"),
+            "--input",
+            str(analysis_input),
+            "--output",
+            str(results_dir / "latency_aggregated.csv"),
+            "--arch-output",
+            str(results_dir / "latency_arch_compare.csv"),
+        ],
+    )
+    run_step(
+        "Analyze storage I/O",
+        [
+            "python",
+            str(scripts_dir / "analyze_io.py"),
+            "--input",
+            str(analysis_input),
+            "--output",
+            str(results_dir / "io_aggregated.csv"),
+        ],
+    )
+    run_step(
+        "Analyze CPU modes",
+        [
+            "python",
+            str(scripts_dir / "analyze_cpuset.py"),
+            "--input",
+            str(analysis_input),
+            "--output",
+            str(results_dir / "cpuset_modes.csv"),
+        ],
+    )
+    run_step(
+        "Analyze co-location",
+        [
+            "python",
+            str(scripts_dir / "analyze_colocation.py"),
+            "--input",
+            str(analysis_input),
+            "--output",
+            str(results_dir / "colocation_slowdown.csv"),
+            "--summary-output",
+            str(results_dir / "colocation_by_instance.csv"),
+            "--plot-dir",
             str(results_dir),
         ],
     )
     run_step(
-        "Plot numpy",
+        "Analyze scaling",
         [
             "python",
-            str(scripts_dir / "plot_numpy.py"),
+            str(scripts_dir / "analyze_scaling.py"),
             "--input",
+            str(analysis_input),
+            "--prices",
+            str(results_dir / "aws_instance_prices.csv"),
+            "--output",
+            str(results_dir / "scaling_model.csv"),
+        ],
+    )
+
+    # 5. Plot results
+    run_step(
+        "Plot results",
+        [
+            "python",
+            str(scripts_dir / "plotting.py"),
+            "--stressng",
+            str(results_dir / "stressng_aggregated.csv"),
+            "--ffmpeg",
+            str(results_dir / "ffmpeg_aggregated.csv"),
+            "--numpy",
             str(results_dir / "numpy_aggregated.csv"),
             "--output_dir",
             str(results_dir),
@@ -178,6 +433,11 @@ def main() -> None:
         ],
     )
 
+    summary = run_step.finish()
+    print(f"\nPipeline stats: {results_dir / 'pipeline_stats.json'}")
+    for step in sorted(summary["steps"], key=lambda st: -st["wall_s"])[:5]:
+        rss_mib = step["peak_rss_kb"] / 1024
+        print(f"  {step['wall_s']:8.2f}s  {rss_mib:7.0f} MiB  {step['name']}")
     print("\n=== Done. All pipeline steps completed successfully. ===")
 
 
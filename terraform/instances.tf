@@ -7,10 +7,17 @@ locals {
 # Рендеримо cloud-init через templatefile()
 locals {
   user_data_rendered = templatefile("${path.module}/user_data.tpl", {
-    run_id       = random_uuid.run.result
-    bucket       = aws_s3_bucket.bench.bucket
-    image        = var.bench_image
-    cloud_region = var.aws_region
+    run_id           = random_uuid.run.result
+    bucket           = aws_s3_bucket.bench.bucket
+    image            = var.bench_image
+    cloud_region     = var.aws_region
+    suite_repeats    = var.suite_repeats
+    matrix_repeats   = var.matrix_repeats
+    ffmpeg_source    = var.ffmpeg_source
+    scaling_cpus     = join(" ", [for c in var.scaling_cpus : tostring(c)])
+    cpu_mode_repeats = var.cpu_mode_repeats
+    colo_repeats     = var.colo_repeats
+    colo_sets        = join(" ", var.colo_sets)
   })
 }
 
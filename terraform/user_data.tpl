@@ -10,11 +10,19 @@ write_files:
     content: |
       #!/usr/bin/env bash
       set -euo pipefail
+      export PATH="/snap/bin:$${PATH}"  # aws-cli snap, not on systemd's PATH
       CLOUD_REGION="${cloud_region}"
       RUN_ID="$RUN_ID"
       BUCKET="$BUCKET"
       IMAGE="$IMAGE"
       REPEATS="$${REPEATS:-20}"
+      SUITE_REPEATS="${suite_repeats}"
+      MATRIX_REPEATS="${matrix_repeats}"
+      FFMPEG_SOURCE="${ffmpeg_source}"
+      SCALING_CPUS="${scaling_cpus}"
+      CPU_MODE_REPEATS="${cpu_mode_repeats}"
+      COLO_REPEATS="${colo_repeats}"
+      COLO_SETS="${colo_sets}"
 
       systemctl enable --now docker
       docker pull "$IMAGE"
@@ -33,66 +41,50 @@ write_files:
 
       docker pull "$IMAGE"
 
-      for i in $(seq 1 "$REPEATS"); do
-        echo "Starting benchmark run #$${i}/$${REPEATS}"
-
-        docker run --rm --cpus=2 \
-          -e RUN_ID="$RUN_ID" \
-          -e TASK="stress-ng" \
-          -e DATASET="default" \
-          -e INSTANCE_ID="$IID" \
-          -e INSTANCE_TYPE="$ITYPE" \
-          -e CLOUD_PROVIDER="AWS" \
-          -e CLOUD_REGION="$CLOUD_REGION" \
-          "$IMAGE" stress-ng --cpu 2 --cpu-method all --metrics-brief --cpu-ops 1000 --timeout 20s \
-          | tee -a /var/log/bench/stressng.jsonl
-        docker run --rm --cpus=2 \
-          -e RUN_ID="$RUN_ID" \
-          -e TASK="numpy-matmul" \
-          -e DATASET="default" \
-          -e INSTANCE_ID="$IID" \
-          -e INSTANCE_TYPE="$ITYPE" \
-          -e CLOUD_PROVIDER="AWS" \
-          -e CLOUD_REGION="$CLOUD_REGION" \
-          "$IMAGE" numpy matmul 2000 \
-          | tee -a /var/log/bench/numpy-matmul.jsonl
-        docker run --rm --cpus=2 \
-          -e RUN_ID="$RUN_ID" \
-          -e TASK="numpy-elem" \
-          -e DATASET="default" \
-          -e INSTANCE_ID="$IID" \
-          -e INSTANCE_TYPE="$ITYPE" \
-          -e CLOUD_PROVIDER="AWS" \
-          -e CLOUD_REGION="$CLOUD_REGION" \
-          "$IMAGE" numpy elem 1000000 50 \
-          | tee -a /var/log/bench/numpy-elem.jsonl
-        docker run --rm --cpus=2 \
-          -e RUN_ID="$RUN_ID" \
-          -e TASK="ffmpeg" \
-          -e DATASET="default" \
-          -e INSTANCE_ID="$IID" \
-          -e INSTANCE_TYPE="$ITYPE" \
-          -e CLOUD_PROVIDER="AWS" \
-          -e CLOUD_REGION="$CLOUD_REGION" \
-          "$IMAGE" ffmpeg \
-            -f lavfi \
-            -i testsrc=duration=10:size=1920x1080:rate=30 \
-            -c:v libx264 \
-            -preset medium \
-            -crf 28 \
-            -an \
-            -f null - \
-          | tee -a /var/log/bench/ffmpeg.jsonl
-      done
-      aws s3 cp /var/log/bench/stressng.jsonl   "s3://$${BUCKET}/$${PREFIX}/stressng.jsonl"
-      aws s3 cp /var/log/bench/numpy-matmul.jsonl "s3://$${BUCKET}/$${PREFIX}/numpy-matmul.jsonl"
-      aws s3 cp /var/log/bench/numpy-elem.jsonl "s3://$${BUCKET}/$${PREFIX}/numpy-elem.jsonl"
-      aws s3 cp /var/log/bench/ffmpeg.jsonl     "s3://$${BUCKET}/$${PREFIX}/ffmpeg.jsonl"
-      touch DONE && aws s3 cp DONE "s3://$${BUCKET}/$${PREFIX}/DONE"
+      # The campaign runs in campaign_agent.py (shipped in the image): every
+      # step is checkpointed in /var/log/bench and committed output goes to
+      # S3 in batches as it runs. Started again by bench-campaign.service
+      # after a reboot or crash, it resumes where the checkpoint left off.
+      docker run --rm --entrypoint cat "$IMAGE" /opt/bench/harness.py > /opt/bench/harness.py
+      docker run --rm --entrypoint cat "$IMAGE" /opt/bench/campaign_agent.py > /opt/bench/campaign_agent.py
+      python3 /opt/bench/campaign_agent.py \
+        --image "$IMAGE" \
+        --run-id "$RUN_ID" \
+        --dest "s3://$${BUCKET}/$${PREFIX}" \
+        --instance-id "$IID" \
+        --instance-type "$ITYPE" \
+        --region "$CLOUD_REGION" \
+        --repeats "$REPEATS" \
+        --suite-repeats "$SUITE_REPEATS" \
+        --matrix-repeats "$MATRIX_REPEATS" \
+        --ffmpeg-source "$FFMPEG_SOURCE" \
+        --scaling-cpus "$SCALING_CPUS" \
+        --cpu-mode-repeats "$CPU_MODE_REPEATS" \
+        --colo-repeats "$COLO_REPEATS" \
+        --colo-sets "$COLO_SETS" \
+        --state-dir /var/log/bench
 
       shutdown -h now || true
 
+  - path: /etc/systemd/system/bench-campaign.service
+    content: |
+      [Unit]
+      Description=Benchmark campaign (resumes from /var/log/bench/checkpoint.json)
+      Wants=network-online.target
+      After=network-online.target docker.service
+
+      [Service]
+      Type=simple
+      Environment="RUN_ID=${run_id}" "BUCKET=${bucket}" "IMAGE=${image}"
+      ExecStart=/bin/bash /opt/bench/run-and-upload.sh
+      Restart=on-failure
+      RestartSec=30
+
+      [Install]
+      WantedBy=multi-user.target
+
 runcmd:
   - snap install aws-cli --classic
   - aws --version
-  - RUN_ID='${run_id}' BUCKET='${bucket}' IMAGE='${image}' bash /opt/bench/run-and-upload.sh
+  - systemctl daemon-reload
+  - systemctl enable --now bench-campaign.service
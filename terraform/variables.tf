@@ -39,3 +39,45 @@ variable "bucket_prefix" {
   type        = string
   default     = "arm-vs-amd64-results"
 }
+
+variable "suite_repeats" {
+  description = "Runs of the stress-ng suite, one whole suite each (0 = disabled)"
+  type        = number
+  default     = 0
+}
+
+variable "matrix_repeats" {
+  description = "Runs of the ffmpeg encoder matrix, one whole matrix each (0 = disabled)"
+  type        = number
+  default     = 0
+}
+
+variable "ffmpeg_source" {
+  description = "Encoder matrix input: lavfi (generated per encode) or cache (pre-rendered y4m)"
+  type        = string
+  default     = "lavfi"
+}
+
+variable "scaling_cpus" {
+  description = "Extra docker --cpus levels for the scaling sweep (empty = disabled)"
+  type        = list(number)
+  default     = []
+}
+
+variable "cpu_mode_repeats" {
+  description = "Repeats of the quota vs cpuset pinning comparison (0 = disabled)"
+  type        = number
+  default     = 0
+}
+
+variable "colo_repeats" {
+  description = "Repeats of the co-location interference runs (0 = disabled)"
+  type        = number
+  default     = 0
+}
+
+variable "colo_sets" {
+  description = "Tasks run together, one set per entry, joined by \"+\""
+  type        = list(string)
+  default     = ["ffmpeg+numpy-elem", "stress-ng-cache+numpy-elem", "stress-ng-cache+ffmpeg"]
+}